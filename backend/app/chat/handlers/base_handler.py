@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.chat.models.chat_session import ChatSession
@@ -30,6 +31,26 @@ class BaseChatHandler(ABC):
         """
         pass
     
+    async def ahandle(self, parameters: Dict[str, Any], session: ChatSession) -> Dict[str, Any]:
+        """
+        Versão assíncrona de handle
+        
+        Padrão: executa handle numa thread. Handlers que chamam o LLM sobrescrevem
+        para aguardar llm_client.achat sem ocupar uma thread durante a geração.
+        """
+        return await asyncio.to_thread(self.handle, parameters, session)
+    
+    def stream(self, parameters: Dict[str, Any], session: ChatSession) -> Tuple[Dict[str, Any], Optional[Iterator[str]]]:
+        """
+        Versão streaming de handle
+        
+        Returns:
+            (resposta, tokens): se tokens não for None, o texto da resposta vem
+            desse iterador (tokens do LLM) e 'response' deve ser ignorado.
+            Por padrão não há streaming: devolve o resultado de handle.
+        """
+        return self.handle(parameters, session), None
+    
     def _create_response(
         self, 
         response: str, 
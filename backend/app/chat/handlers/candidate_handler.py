@@ -1,8 +1,10 @@
 from typing import Dict, Any, Optional
+import asyncio
 
 from app.chat.handlers.base_handler import BaseChatHandler
 from app.chat.models.chat_session import ChatSession
 from app.llm.factory import get_llm_client
+from app.llm.rate_limiter import llm_call_site, iterate_with_call_site
 from app.models.processed_applicant import ProcessedApplicant
 from app.core.logging import log_info, log_error
 
@@ -10,9 +12,9 @@ from app.core.logging import log_info, log_error
 class CandidateQuestionHandler(BaseChatHandler):
     """Handler para perguntas sobre candidatos específicos"""
     
-    def __init__(self, db):
+    def __init__(self, db, llm_client=None):
         super().__init__(db)
-        self.llm_client = get_llm_client()
+        self.llm_client = llm_client or get_llm_client()
     
     def handle(self, parameters: Dict[str, Any], session: ChatSession) -> Dict[str, Any]:
         """
@@ -35,26 +37,90 @@ class CandidateQuestionHandler(BaseChatHandler):
                 "Desculpe, ocorreu um erro ao buscar informações sobre candidatos."
             )
     
+    async def ahandle(self, parameters: Dict[str, Any], session: ChatSession) -> Dict[str, Any]:
+        """Como handle, aguardando o LLM de forma assíncrona"""
+        candidate_id = parameters.get('candidate_id')
+        if not candidate_id:
+            return self._handle_generic_candidate_question(parameters.get('question'))
+        try:
+            # Consulta do candidato é síncrona: fora do event loop
+            result, prompt = await asyncio.to_thread(self._prepare_candidate_prompt, candidate_id, parameters.get('question'))
+            if prompt is None:
+                return result
+            
+            with llm_call_site("chat"):
+                response = await self.llm_client.achat(prompt)
+            return self._create_response(response)
+            
+        except Exception as e:
+            log_error(f"Error handling specific candidate: {str(e)}")
+            return self._create_response(
+                "Erro ao buscar informações do candidato."
+            )
+    
+    def stream(self, parameters: Dict[str, Any], session: ChatSession):
+        """Como handle, mas devolve os tokens do LLM para streaming"""
+        candidate_id = parameters.get('candidate_id')
+        if not candidate_id:
+            return self._handle_generic_candidate_question(parameters.get('question')), None
+        try:
+            result, prompt = self._prepare_candidate_prompt(candidate_id, parameters.get('question'))
+            if prompt is None:
+                return result, None
+            return self._create_response(None), iterate_with_call_site("chat", self.llm_client.chat_stream(prompt))
+        except Exception as e:
+            log_error(f"Error in CandidateQuestionHandler: {str(e)}")
+            return self._create_response(
+                "Desculpe, ocorreu um erro ao buscar informações sobre candidatos."
+            ), None
+    
     def _handle_specific_candidate(self, candidate_id: str, question: str) -> Dict[str, Any]:
         """
         Responde sobre um candidato específico
         """
         try:
-            # Busca o candidato
-            candidate = self.db.query(ProcessedApplicant).filter(
-                ProcessedApplicant.id == int(candidate_id)
-            ).first()
-            
-            if not candidate:
-                return self._create_response(
-                    f"Candidato com ID {candidate_id} não encontrado."
-                )
+            result, prompt = self._prepare_candidate_prompt(candidate_id, question)
+            if prompt is None:
+                return result
             
-            # Prepara contexto do candidato
-            context = self._build_candidate_context(candidate)
+            with llm_call_site("chat"):
+                response = self.llm_client.chat(prompt)
+            return self._create_response(response)
             
-            # Gera resposta usando LLM
-            prompt = f"""
+        except Exception as e:
+            log_error(f"Error handling specific candidate: {str(e)}")
+            return self._create_response(
+                "Erro ao buscar informações do candidato."
+            )
+    
+    def _prepare_candidate_prompt(self, candidate_id: str, question: str):
+        """
+        Monta o prompt da pergunta sobre o candidato
+        
+        Returns:
+            (resposta, prompt): prompt é None quando a resposta já está pronta
+        """
+        try:
+            candidate_pk = int(candidate_id)
+        except ValueError:
+            return self._create_response(
+                "ID do candidato deve ser um número válido."
+            ), None
+        
+        # Busca o candidato
+        candidate = self.db.query(ProcessedApplicant).filter(
+            ProcessedApplicant.id == candidate_pk
+        ).first()
+        
+        if not candidate:
+            return self._create_response(
+                f"Candidato com ID {candidate_id} não encontrado."
+            ), None
+        
+        # Prepara contexto do candidato
+        context = self._build_candidate_context(candidate)
+        
+        prompt = f"""
 Você é um assistente especializado in recrutamento. Responda à pergunta do usuário sobre o candidato usando apenas as informações fornecidas.
 
 INFORMAÇÕES DO CANDIDATO:
@@ -64,19 +130,7 @@ PERGUNTA DO USUÁRIO: {question}
 
 Responda de forma clara e objetiva, focando apenas nas informações disponíveis sobre o candidato.
 """
-            
-            response = self.llm_client.chat(prompt)
-            return self._create_response(response)
-            
-        except ValueError:
-            return self._create_response(
-                "ID do candidato deve ser um número válido."
-            )
-        except Exception as e:
-            log_error(f"Error handling specific candidate: {str(e)}")
-            return self._create_response(
-                "Erro ao buscar informações do candidato."
-            )
+        return None, prompt
     
     def _handle_generic_candidate_question(self, question: str) -> Dict[str, Any]:
         """
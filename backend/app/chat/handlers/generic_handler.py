@@ -19,24 +19,19 @@ class GenericConversationHandler(BaseChatHandler):
         try:
             log_info(f"GenericHandler.handle called with parameters: {parameters}")
             
-            message = parameters.get('message', '').lower().strip()
+            message = parameters.get('message', '')
             log_info(f"Processing generic message: '{message}'")
             
-            # Remove punctuation for analysis
-            clean_message = message.strip('.,!?;:')
+            # Tipo já identificado pelo IntentClassifier (greeting, thanks, confirmation, farewell)
+            generic_type = parameters.get('generic_type')
             
-            greetings = ['olá', 'ola', 'oi', 'hey', 'hello', 'hi', 'bom dia', 'boa tarde', 'boa noite']
-            thanks = ['obrigado', 'obrigada', 'valeu', 'thanks']
-            confirmations = ['ok', 'certo', 'entendi', 'beleza']
-            farewells = ['tchau', 'até mais', 'bye', 'até logo']
-            
-            if any(greeting in clean_message for greeting in greetings):
+            if generic_type == 'greeting':
                 response = self._get_greeting_response()
-            elif any(thank in clean_message for thank in thanks):
+            elif generic_type == 'thanks':
                 response = self._get_thanks_response()
-            elif any(conf in clean_message for conf in confirmations):
+            elif generic_type == 'confirmation':
                 response = self._get_confirmation_response()
-            elif any(farewell in clean_message for farewell in farewells):
+            elif generic_type == 'farewell':
                 response = self._get_farewell_response()
             else:
                 response = self._get_help_response()
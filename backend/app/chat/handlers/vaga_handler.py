@@ -1,10 +1,15 @@
 from typing import Dict, Any, Optional
+import asyncio
 import uuid
-import re
 
 from app.chat.handlers.base_handler import BaseChatHandler
 from app.chat.models.chat_session import ChatSession
 from app.llm.factory import get_llm_client
+from app.llm.rate_limiter import llm_call_site, iterate_with_call_site
+from app.llm.json_parser import JSONParseError, parse_llm_json
+from app.schemas.llm_outputs import SearchCriteriaOutput
+from pydantic import ValidationError
+from app.services.criteria_extraction_service import CRITERIA_SCOPE_VAGA_FILTER, get_criteria_extractor
 from app.repositories.workbook_repository import WorkbookRepository
 from app.repositories.vaga_repository import get_vaga_by_id
 from app.core.logging import log_info, log_error
@@ -13,9 +18,9 @@ from app.core.logging import log_info, log_error
 class VagaQuestionHandler(BaseChatHandler):
     """Handler para perguntas sobre a vaga"""
     
-    def __init__(self, db):
+    def __init__(self, db, llm_client=None):
         super().__init__(db)
-        self.llm_client = get_llm_client()
+        self.llm_client = llm_client or get_llm_client()
         self.workbook_repository = WorkbookRepository(db)
     
     def handle(self, parameters: Dict[str, Any], session: ChatSession) -> Dict[str, Any]:
@@ -24,33 +29,87 @@ class VagaQuestionHandler(BaseChatHandler):
         Também detecta e processa comandos de filtro
         """
         try:
-            workbook_id = parameters.get('workbook_id') or session.context.workbook_id
-            question = parameters.get('question')
+            result, prompt = self._prepare(parameters, session)
+            if prompt is None:
+                return result
             
-            if not workbook_id:
-                return self._create_response(
-                    "Para responder sobre a vaga, preciso do contexto do workbook."
-                )
-            
-            # Verifica se é um comando especial de filtro
-            if self._is_filter_command(question):
-                return self._handle_filter_command(question, workbook_id)
-            
-            # Busca dados da vaga através do workbook
-            vaga_data = self._get_vaga_context(workbook_id)
-            if not vaga_data:
-                return self._create_response(
-                    "Não consegui encontrar informações da vaga para este workbook."
-                )
+            with llm_call_site("chat"):
+                response = self.llm_client.chat(prompt)
+            return self._create_response(response)
             
-            # Prepara contexto para o LLM
-            context = self._build_vaga_context(vaga_data)
+        except Exception as e:
+            log_error(f"Error in VagaQuestionHandler: {str(e)}")
+            return self._create_response(
+                "Desculpe, ocorreu um erro ao buscar informações da vaga."
+            )
+    
+    async def ahandle(self, parameters: Dict[str, Any], session: ChatSession) -> Dict[str, Any]:
+        """Como handle, aguardando o LLM de forma assíncrona"""
+        try:
+            # Consultas do SQLAlchemy (e a extração de filtros) são síncronas: fora do event loop
+            result, prompt = await asyncio.to_thread(self._prepare, parameters, session)
+            if prompt is None:
+                return result
             
-            # Verifica se há filtros aplicados para adicionar ao contexto
-            filters_context = self._get_filters_context(workbook_id)
+            with llm_call_site("chat"):
+                response = await self.llm_client.achat(prompt)
+            return self._create_response(response)
             
-            # Gera resposta usando LLM
-            prompt = f"""
+        except Exception as e:
+            log_error(f"Error in VagaQuestionHandler: {str(e)}")
+            return self._create_response(
+                "Desculpe, ocorreu um erro ao buscar informações da vaga."
+            )
+    
+    def stream(self, parameters: Dict[str, Any], session: ChatSession):
+        """Como handle, mas devolve os tokens do LLM para streaming"""
+        try:
+            result, prompt = self._prepare(parameters, session)
+            if prompt is None:
+                return result, None
+            return self._create_response(None), iterate_with_call_site("chat", self.llm_client.chat_stream(prompt))
+        except Exception as e:
+            log_error(f"Error in VagaQuestionHandler: {str(e)}")
+            return self._create_response(
+                "Desculpe, ocorreu um erro ao buscar informações da vaga."
+            ), None
+    
+    def _prepare(self, parameters: Dict[str, Any], session: ChatSession):
+        """
+        Monta o prompt da pergunta sobre a vaga
+        
+        Returns:
+            (resposta, prompt): prompt é None quando a resposta já está pronta
+            (sem workbook, vaga não encontrada ou comando de filtro)
+        """
+        workbook_id = parameters.get('workbook_id') or session.context.workbook_id
+        question = parameters.get('question')
+        
+        if not workbook_id:
+            return self._create_response(
+                "Para responder sobre a vaga, preciso do contexto do workbook."
+            ), None
+        
+        # Verifica se é um comando especial de filtro
+        if self._is_filter_command(question):
+            filter_response = self._handle_filter_command(question, workbook_id)
+            if filter_response is not None:
+                return filter_response, None
+        
+        # Busca dados da vaga através do workbook
+        vaga_data = self._get_vaga_context(workbook_id)
+        if not vaga_data:
+            return self._create_response(
+                "Não consegui encontrar informações da vaga para este workbook."
+            ), None
+        
+        # Prepara contexto para o LLM
+        context = self._build_vaga_context(vaga_data)
+        
+        # Verifica se há filtros aplicados para adicionar ao contexto
+        filters_context = self._get_filters_context(workbook_id)
+        
+        prompt = f"""
 Você é um assistente especializado in recrutamento. Responda à pergunta do usuário sobre a vaga usando apenas as informações fornecidas.
 
 INFORMAÇÕES DA VAGA:
@@ -62,19 +121,11 @@ PERGUNTA DO USUÁRIO: {question}
 
 Responda de forma clara e objetiva, focando apenas nas informações disponíveis sobre a vaga.
 """
-            
-            response = self.llm_client.chat(prompt)
-            
-            # Atualiza contexto da sessão
-            session.update_context(vaga_id=vaga_data.get('id'))
-            
-            return self._create_response(response)
-            
-        except Exception as e:
-            log_error(f"Error in VagaQuestionHandler: {str(e)}")
-            return self._create_response(
-                "Desculpe, ocorreu um erro ao buscar informações da vaga."
-            )
+        
+        # Atualiza contexto da sessão
+        session.update_context(vaga_id=vaga_data.get('id'))
+        
+        return None, prompt
     
     def _get_vaga_context(self, workbook_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -235,10 +286,16 @@ Responda de forma clara e objetiva, focando apenas nas informações disponívei
     
     def _extract_filter_criteria_with_llm(self, filter_text: str) -> Dict[str, Any]:
         """
-        Usa LLM para extrair critérios estruturados do texto de filtro
+        Extrai critérios estruturados do texto de filtro (cache/regras antes do LLM)
         """
         try:
-            prompt = f"""
+            return get_criteria_extractor(CRITERIA_SCOPE_VAGA_FILTER).extract(filter_text, self._extract_filter_criteria_llm_call)
+        except Exception as e:
+            log_error(f"Erro ao extrair critérios com LLM: {str(e)}")
+            return None
+    
+    def _extract_filter_criteria_llm_call(self, filter_text: str) -> Optional[Dict[str, Any]]:
+        prompt = f"""
 Analise o seguinte critério de filtro e extraia informações estruturadas:
 
 CRITÉRIO: {filter_text}
@@ -253,18 +310,14 @@ Exinplo:
 
 JSON:"""
 
+        with llm_call_site("criteria_extraction"):
             response = self.llm_client.chat(prompt)
-            
-            # Extrai JSON da resposta
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                import json
-                return json.loads(json_match.group())
-            
-            return None
-            
-        except Exception as e:
-            log_error(f"Erro ao extrair critérios com LLM: {str(e)}")
+        
+        # Extrai JSON da resposta (com reparo local) e normaliza os campos; None não entra no cache
+        try:
+            return SearchCriteriaOutput.model_validate(parse_llm_json(response)).model_dump()
+        except (JSONParseError, ValidationError) as e:
+            log_error(f"LLM não retornou JSON válido ({e}): {response}")
             return None
     
     def _get_current_candidates_count(self, workbook_id: str) -> int:
@@ -1,8 +1,12 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import os
 import uuid
 
+# Janela de mensagens mantida por sessão (as mais antigas são descartadas)
+CHAT_MAX_MESSAGES = int(os.getenv("CHAT_MAX_MESSAGES", 50))
+
 
 @dataclass
 class ChatMessage:
@@ -12,6 +16,10 @@ class ChatMessage:
     sender: str = "user"  
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChatMessage":
+        return cls(**{**data, 'timestamp': datetime.fromisoformat(data['timestamp'])})
 
 
 @dataclass
@@ -42,6 +50,8 @@ class ChatSession:
             metadata=metadata or {}
         )
         self.messages.append(message)
+        if len(self.messages) > CHAT_MAX_MESSAGES:
+            del self.messages[:-CHAT_MAX_MESSAGES]
         self.updated_at = datetime.now()
         return message
     
@@ -53,9 +63,28 @@ class ChatSession:
     
     def update_context(self, **kwargs) -> None:
         """Atualiza o contexto da sessão"""
-        for key, value in kwargs.ihass():
+        for key, value in kwargs.items():
             if hasattr(self.context, key):
                 setattr(self.context, key, value)
             else:
                 self.context.additional_context[key] = value
         self.updated_at = datetime.now()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação JSON da sessão (usada pelos session stores compartilhados)"""
+        data = asdict(self)
+        data['created_at'] = self.created_at.isoformat()
+        data['updated_at'] = self.updated_at.isoformat()
+        for message in data['messages']:
+            message['timestamp'] = message['timestamp'].isoformat()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChatSession":
+        return cls(
+            id=data['id'],
+            context=ChatContext(**data.get('context', {})),
+            messages=[ChatMessage.from_dict(m) for m in data.get('messages', [])],
+            created_at=datetime.fromisoformat(data['created_at']),
+            updated_at=datetime.fromisoformat(data['updated_at'])
+        )
@@ -1,4 +1,5 @@
-from typing import Dict, Any, Optional
+import asyncio
+from typing import Dict, Any, Iterator, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.chat.models.chat_session import ChatSession, ChatContext
@@ -7,19 +8,38 @@ from app.chat.handlers.vaga_handler import VagaQuestionHandler
 from app.chat.handlers.candidate_handler import CandidateQuestionHandler
 from app.chat.handlers.generic_handler import GenericConversationHandler
 from app.chat.services.semantic_candidate_service import SemanticCandidateService
+from app.chat.services.session_store import get_session_store
+from app.llm.factory import get_llm_client
 from app.core.logging import log_info, log_error
 
 
+class RequestHandlers:
+    """
+    Handlers de uma requisição, ligados à sessão do banco dela
+
+    Criados a cada mensagem (objetos leves): conversas simultâneas nunca
+    compartilham a mesma Session do SQLAlchemy.
+    """
+
+    def __init__(self, db: Session, llm_client):
+        self.vaga_handler = VagaQuestionHandler(db, llm_client)
+        self.candidate_handler = CandidateQuestionHandler(db, llm_client)
+        self.semantic_service = SemanticCandidateService(db, llm_client)
+
+
 class ChatOrchestrator:
     """
     Orquestra as conversas do chat, direcionando para os handlers apropriados
-    Implementa padrão Singleton para manter sessões entre requisições
+    Implementa padrão Singleton; as sessões ficam no SessionStore configurado
+
+    O singleton guarda apenas componentes sem estado de requisição (classificador,
+    cliente LLM, store de sessões). A Session do banco chega em cada chamada.
     """
     
     _instance = None
     _lock = None
     
-    def __new__(cls, db: Session):
+    def __new__(cls):
         if cls._instance is None:
             import threading
             if cls._lock is None:
@@ -31,28 +51,27 @@ class ChatOrchestrator:
                     cls._instance._initialized = False
         return cls._instance
     
-    def __init__(self, db: Session):
+    def __init__(self):
         # Evita re-inicialização do singleton
         if self._initialized:
             return
             
-        self.db = db
         self.intent_classifier = IntentClassifier()
-        
-        # Inicializa handlers
-        self.vaga_handler = VagaQuestionHandler(db)
-        self.candidate_handler = CandidateQuestionHandler(db)
-        self.semantic_service = SemanticCandidateService(db)  # Service direto
+        self.llm_client = get_llm_client()
         self.generic_handler = GenericConversationHandler()
         
-        # Cache de sessões ativas (in produção, usar Redis ou similar)
-        self._active_sessions: Dict[str, ChatSession] = {}
+        # Sessões ativas: LRU+TTL em memória ou tabela compartilhada entre workers
+        self.session_store = get_session_store()
         
         self._initialized = True
     
+    def _handlers_for(self, db: Session) -> RequestHandlers:
+        return RequestHandlers(db, self.llm_client)
+    
     async def process_message(
         self, 
         message: str, 
+        db: Session,
         session_id: Optional[str] = None,
         workbook_id: Optional[str] = None,
         context: Optional[str] = None
@@ -60,6 +79,9 @@ class ChatOrchestrator:
         """
         Processa uma mensagem do usuário
         
+        Args:
+            db: Session do banco da requisição, usada pelos handlers
+        
         Returns:
             Dict contendo:
             - response: str - resposta do assistente
@@ -79,12 +101,12 @@ class ChatOrchestrator:
             session.add_message(message, sender="user")
             
             # Classifica intenção
-            intent_result = self.intent_classifier.classify(message, workbook_id)
+            intent_result = await self.intent_classifier.aclassify(message, workbook_id)
             
             log_info(f"Classified intent: {intent_result.intent.value} (confidence: {intent_result.confidence:.2f})")
             
             # Direciona para o handler apropriado
-            response_data = await self._route_to_handler(intent_result, session)
+            response_data = await self._route_to_handler(intent_result, session, self._handlers_for(db))
             
             # Adiciona resposta do assistente à sessão
             filtered_candidates = response_data.get('filtered_candidates') or []
@@ -98,8 +120,8 @@ class ChatOrchestrator:
                 }
             )
             
-            # Atualiza cache da sessão
-            self._active_sessions[session.id] = session
+            # Grava a sessão (renova o TTL)
+            self.session_store.save(session)
             
             return {
                 **response_data,
@@ -121,10 +143,8 @@ class ChatOrchestrator:
     
     def _get_or_create_session(self, session_id: Optional[str], workbook_id: Optional[str]) -> ChatSession:
         """Obtém sessão existente ou cria nova"""
-        log_info(f"Session managinent - session_id: {session_id}, existing sessions: {list(self._active_sessions.keys())}")
-        
-        if session_id and session_id in self._active_sessions:
-            session = self._active_sessions[session_id]
+        session = self.session_store.get(session_id) if session_id else None
+        if session:
             log_info(f"Using existing session: {session_id} (workbook: {session.context.workbook_id})")
             # Atualiza contexto se workbook_id foi fornecido
             if workbook_id and workbook_id != session.context.workbook_id:
@@ -135,26 +155,126 @@ class ChatOrchestrator:
         # Cria nova sessão
         context = ChatContext(workbook_id=workbook_id)
         session = ChatSession(context=context)
-        self._active_sessions[session.id] = session
         log_info(f"Created new session: {session.id} (workbook: {workbook_id})")
         
         return session
     
-    async def _route_to_handler(self, intent_result, session: ChatSession) -> Dict[str, Any]:
+    def stream_message(
+        self, 
+        message: str, 
+        db: Session,
+        session_id: Optional[str] = None,
+        workbook_id: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Versão streaming de process_message
+        
+        db precisa continuar aberta até o gerador terminar (tokens são lidos depois
+        do retorno do endpoint).
+        
+        Gera eventos (nome, dados) na ordem:
+            - meta: session_id, intent, confidence
+            - candidates: filtered_candidates, total_candidates (só no filtro de candidatos)
+            - token: trecho da resposta ({'text': ...}), um ou mais
+            - error: mensagem de erro, se o LLM falhar no meio da resposta
+            - done: resposta completa, session_id, total_candidates
+        """
+        log_info(f"Processing message (stream): {message[:100]}...")
+        
+        session = self._get_or_create_session(session_id, workbook_id)
+        session.add_message(message, sender="user")
+        
+        intent_result = self.intent_classifier.classify(message, workbook_id)
+        log_info(f"Classified intent: {intent_result.intent.value} (confidence: {intent_result.confidence:.2f})")
+        
+        yield "meta", {
+            'session_id': session.id,
+            'intent': intent_result.intent.value,
+            'confidence': intent_result.confidence
+        }
+        
+        response_data: Dict[str, Any] = {}
+        parts = []
+        try:
+            response_data, tokens = self._route_stream(intent_result, session, self._handlers_for(db))
+            
+            # Lista de candidatos vai num evento próprio, antes do texto
+            if response_data.get('filtered_candidates'):
+                yield "candidates", {
+                    'filtered_candidates': response_data['filtered_candidates'],
+                    'total_candidates': response_data.get('total_candidates')
+                }
+            
+            if tokens is None:
+                parts.append(response_data.get('response') or "")
+                yield "token", {'text': parts[0]}
+            else:
+                for token in tokens:
+                    parts.append(token)
+                    yield "token", {'text': token}
+        except Exception as e:
+            log_error(f"Error streaming message: {str(e)}")
+            error_message = "Desculpe, ocorreu um erro interno. Tente novamente em alguns instantes."
+            parts.append(("\n\n" if parts else "") + error_message)
+            yield "error", {'response': error_message}
+        
+        response = "".join(parts)
+        filtered_candidates = response_data.get('filtered_candidates') or []
+        session.add_message(
+            response,
+            sender="assistant",
+            metadata={
+                'intent': intent_result.intent.value,
+                'confidence': intent_result.confidence,
+                'filtered_candidates_count': len(filtered_candidates)
+            }
+        )
+        self.session_store.save(session)
+        
+        yield "done", {
+            'response': response,
+            'session_id': session.id,
+            'total_candidates': response_data.get('total_candidates')
+        }
+    
+    def _route_stream(self, intent_result, session: ChatSession, handlers: RequestHandlers) -> Tuple[Dict[str, Any], Optional[Iterator[str]]]:
+        """Como _route, mas perguntas sobre vaga/candidato devolvem os tokens do LLM"""
+        if intent_result.intent == ChatIntent.VAGA_QUESTION:
+            return handlers.vaga_handler.stream(intent_result.parameters, session)
+        
+        if intent_result.intent == ChatIntent.CANDIDATE_QUESTION:
+            return handlers.candidate_handler.stream(intent_result.parameters, session)
+        
+        return self._route(intent_result, session, handlers), None
+    
+    async def _route_to_handler(self, intent_result, session: ChatSession, handlers: RequestHandlers) -> Dict[str, Any]:
         """Direciona para o handler apropriado baseado na intenção"""
+        # Perguntas sobre vaga/candidato aguardam o LLM no event loop (achat)
+        if intent_result.intent == ChatIntent.VAGA_QUESTION:
+            return await handlers.vaga_handler.ahandle(intent_result.parameters, session)
+        
+        if intent_result.intent == ChatIntent.CANDIDATE_QUESTION:
+            return await handlers.candidate_handler.ahandle(intent_result.parameters, session)
+        
+        # Demais intenções são síncronas (filtro semântico faz I/O bloqueante): rodam numa thread
+        return await asyncio.to_thread(self._route, intent_result, session, handlers)
+    
+    def _route(self, intent_result, session: ChatSession, handlers: RequestHandlers) -> Dict[str, Any]:
+        """Executa o handler da intenção e devolve a resposta completa"""
         
         if intent_result.intent == ChatIntent.VAGA_QUESTION:
-            return self.vaga_handler.handle(intent_result.parameters, session)
+            return handlers.vaga_handler.handle(intent_result.parameters, session)
         
         elif intent_result.intent == ChatIntent.CANDIDATE_QUESTION:
-            return self.candidate_handler.handle(intent_result.parameters, session)
+            return handlers.candidate_handler.handle(intent_result.parameters, session)
         
         elif intent_result.intent == ChatIntent.SEMANTIC_CANDIDATE_FILTER:
             # Chama service diretamente sin handler
             workbook_id = intent_result.parameters.get('workbook_id') or session.context.workbook_id
             user_input = intent_result.parameters.get('filter_criteria') or intent_result.parameters.get('message')
             
-            service_response = self.semantic_service.filter_candidates_complete(workbook_id, user_input)
+            service_response = handlers.semantic_service.filter_candidates_complete(workbook_id, user_input)
             
             # CONVERTE para formato esperado pelo front-end
             candidates = service_response.get('data', {}).get('candidates', [])
@@ -218,11 +338,8 @@ Tente uma dessas opções! 🚀"""
     
     def get_session(self, session_id: str) -> Optional[ChatSession]:
         """Retorna uma sessão específica"""
-        return self._active_sessions.get(session_id)
+        return self.session_store.get(session_id)
     
     def clear_session(self, session_id: str) -> bool:
-        """Rinove uma sessão do cache"""
-        if session_id in self._active_sessions:
-            del self._active_sessions[session_id]
-            return True
-        return False
+        """Remove uma sessão do store"""
+        return self.session_store.delete(session_id)
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, Tuple
 from sqlalchemy.orm import Session
 
 from app.chat.services.chat_orchestrator import ChatOrchestrator
@@ -13,7 +13,7 @@ class ChatService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.orchestrator = ChatOrchestrator(db)
+        self.orchestrator = ChatOrchestrator()
     
     async def chat_with_context(
         self, 
@@ -45,6 +45,7 @@ class ChatService:
             
             result = await self.orchestrator.process_message(
                 message=message,
+                db=self.db,
                 session_id=session_id,
                 workbook_id=workbook_id,
                 context=context
@@ -71,6 +72,33 @@ class ChatService:
                 'confidence': 0.0
             }
     
+    def stream_chat(
+        self, 
+        message: str, 
+        workbook_id: Optional[str] = None, 
+        context: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Versão streaming de chat_with_context
+        
+        Gera eventos (nome, dados): meta, candidates, token, error e done.
+        Ver ChatOrchestrator.stream_message.
+        """
+        try:
+            yield from self.orchestrator.stream_message(
+                message=message,
+                db=self.db,
+                session_id=session_id,
+                workbook_id=workbook_id,
+                context=context
+            )
+        except Exception as e:
+            log_error(f"Error in ChatService stream: {str(e)}")
+            error_message = "Desculpe, ocorreu um erro interno. Tente novamente em alguns instantes."
+            yield "error", {'response': error_message}
+            yield "done", {'response': error_message, 'session_id': session_id, 'total_candidates': None}
+    
     def get_session_history(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Retorna o histórico de uma sessão específica
@@ -0,0 +1,238 @@
+"""
+Classificação de intenção por similaridade com centroides de embeddings.
+
+Cada intenção tem frases de exemplo rotuladas (INTENT_EXAMPLES). Os embeddings
+dos exemplos são gerados numa única chamada, a média de cada intenção é
+normalizada e o conjunto vira uma matriz (intenções x dimensões) float32, salva
+em temp_cache/intent_centroids.npz. O arquivo é reaproveitado enquanto o modelo
+de embedding e os exemplos não mudarem.
+
+Classificar uma mensagem custa um embedding e um produto matriz-vetor. O
+IntentClassifier só recorre a isto quando as palavras-chave são ambíguas
+(ver IntentClassifier.needs_embedding); ative com INTENT_EMBEDDING_CLASSIFIER=true.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.chat.services.intent_classifier import ChatIntent
+from app.core.logging import log_info, log_error, log_warning
+from app.llm.embedding_client import get_embedding_client
+
+# Similaridade de cosseno mínima com o centroide vencedor
+INTENT_EMBEDDING_MIN_SIMILARITY = float(os.getenv("INTENT_EMBEDDING_MIN_SIMILARITY", 0.35))
+# Diferença mínima entre o 1º e o 2º centroide; abaixo disso a mensagem é ambígua também aqui
+INTENT_EMBEDDING_MIN_MARGIN = float(os.getenv("INTENT_EMBEDDING_MIN_MARGIN", 0.03))
+INTENT_CENTROIDS_PATH = Path(os.getenv("INTENT_CENTROIDS_PATH", "temp_cache/intent_centroids.npz"))
+# Espera antes de tentar gerar o índice de novo depois de uma falha do backend de embedding
+INTENT_INDEX_RETRY_SECONDS = int(os.getenv("INTENT_INDEX_RETRY_SECONDS", 300))
+
+# Exemplos rotulados por intenção; qualquer alteração muda o fingerprint e regera o índice
+INTENT_EXAMPLES: Dict[ChatIntent, List[str]] = {
+    ChatIntent.VAGA_QUESTION: [
+        "quais são os requisitos da vaga?",
+        "me fale sobre essa vaga",
+        "qual é o salário oferecido?",
+        "a vaga é remota ou presencial?",
+        "quais as principais atividades do cargo?",
+        "qual o nível de inglês exigido para a posição?",
+        "para qual cliente é essa oportunidade?",
+        "qual o regime de contratação, CLT ou PJ?",
+        "descreva as responsabilidades da função",
+        "quais competências técnicas a vaga pede?",
+    ],
+    ChatIntent.CANDIDATE_QUESTION: [
+        "me conte sobre o candidato 123",
+        "qual a experiência desse candidato?",
+        "onde o candidato 45 trabalhou por último?",
+        "qual a formação dele?",
+        "esse profissional fala inglês?",
+        "resuma o currículo do candidato 987",
+        "quais as habilidades do candidato id 302?",
+        "ele já trabalhou com SAP?",
+    ],
+    ChatIntent.SEMANTIC_CANDIDATE_FILTER: [
+        "encontre 10 desenvolvedores Python",
+        "quero candidatos com inglês avançado",
+        "mostre os melhores perfis para esta vaga",
+        "busque analistas SAP em São Paulo",
+        "traga pessoas com experiência em Java e Spring",
+        "quais profissionais combinam com essa oportunidade?",
+        "liste 5 candidatas com formação em computação",
+        "preciso de gente sênior em dados que more no Rio",
+        "tem alguém que saiba React?",
+        "indique perfis parecidos com o da vaga",
+    ],
+    ChatIntent.FILTER_RESET: [
+        "limpar os filtros",
+        "começar uma nova busca do zero",
+        "resetar a pesquisa",
+        "esqueça os critérios anteriores",
+        "desfaça os filtros",
+    ],
+    ChatIntent.FILTER_HISTORY: [
+        "quais filtros eu já apliquei?",
+        "mostre o histórico de filtros",
+        "o que eu pesquisei antes?",
+        "lembre os critérios da última busca",
+    ],
+    ChatIntent.GENERIC_CONVERSATION: [
+        "olá, tudo bem?",
+        "bom dia!",
+        "obrigado pela ajuda",
+        "valeu, até mais",
+        "ok, entendi",
+        "tchau",
+        "o que você consegue fazer?",
+    ],
+}
+
+
+class IntentCentroidIndex:
+    """Matriz de centroides normalizados (uma linha por intenção)"""
+
+    def __init__(self, intents: List[ChatIntent], centroids: np.ndarray):
+        self.intents = intents
+        self.centroids = centroids
+
+    @classmethod
+    def build(cls, embeddings: Dict[ChatIntent, List[np.ndarray]]) -> "IntentCentroidIndex":
+        intents = []
+        rows = []
+        for intent, vectors in embeddings.items():
+            vectors = [v for v in vectors if v is not None]
+            if not vectors:
+                continue
+            # Média dos exemplos normalizados, normalizada de novo
+            matrix = _normalize(np.vstack(vectors).astype(np.float32))
+            intents.append(intent)
+            rows.append(matrix.mean(axis=0))
+        return cls(intents, _normalize(np.vstack(rows)))
+
+    def nearest(self, vector: np.ndarray) -> Tuple[ChatIntent, float, float]:
+        """(intenção, similaridade de cosseno, margem para a 2ª colocada)"""
+        similarities = self.centroids @ _normalize(np.asarray(vector, dtype=np.float32))
+        order = np.argsort(similarities)[::-1]
+        best = float(similarities[order[0]])
+        second = float(similarities[order[1]]) if len(order) > 1 else -1.0
+        return self.intents[order[0]], best, best - second
+
+    def save(self, path: Path, fingerprint: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            centroids=self.centroids,
+            intents=np.array([intent.value for intent in self.intents]),
+            fingerprint=np.array(fingerprint)
+        )
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str) -> Optional["IntentCentroidIndex"]:
+        """Índice salvo, se existir e tiver sido gerado com o mesmo modelo e exemplos"""
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            if str(data["fingerprint"]) != fingerprint:
+                return None
+            intents = [ChatIntent(value) for value in data["intents"]]
+            return cls(intents, data["centroids"].astype(np.float32))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def examples_fingerprint(model: str, examples: Dict[ChatIntent, List[str]] = INTENT_EXAMPLES) -> str:
+    payload = json.dumps(
+        {"model": model, "examples": {intent.value: texts for intent, texts in examples.items()}},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EmbeddingIntentClassifier:
+    """
+    Intenção mais próxima por centroides de embeddings
+
+    O índice é carregado (ou gerado) na primeira mensagem. Se o backend de
+    embedding falhar, classify devolve None e o IntentClassifier mantém o
+    resultado das palavras-chave.
+    """
+
+    def __init__(self, embedding_client=None, index_path: Path = INTENT_CENTROIDS_PATH):
+        self._embedding_client = embedding_client
+        self.index_path = index_path
+        self._index: Optional[IntentCentroidIndex] = None
+        self._failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def embedding_client(self):
+        if self._embedding_client is None:
+            self._embedding_client = get_embedding_client()
+        return self._embedding_client
+
+    def _get_index(self) -> Optional[IntentCentroidIndex]:
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is None:
+                if self._failed_at is not None and time.monotonic() - self._failed_at < INTENT_INDEX_RETRY_SECONDS:
+                    return None
+                self._index = self._load_or_build()
+                self._failed_at = None if self._index is not None else time.monotonic()
+        return self._index
+
+    def _load_or_build(self) -> Optional[IntentCentroidIndex]:
+        fingerprint = examples_fingerprint(getattr(self.embedding_client, "model", ""))
+        try:
+            index = IntentCentroidIndex.load(self.index_path, fingerprint)
+            if index is not None:
+                log_info(f"[IntentEmbedding] Centroides carregados de {self.index_path}")
+                return index
+        except Exception as e:
+            log_warning(f"[IntentEmbedding] Centroides salvos inválidos, gerando de novo: {e}")
+
+        texts = [text for examples in INTENT_EXAMPLES.values() for text in examples]
+        vectors = self.embedding_client.generate_embeddings(texts, label="intent_examples")
+        if not any(v is not None for v in vectors):
+            log_error("[IntentEmbedding] Não foi possível gerar os embeddings dos exemplos")
+            return None
+
+        embeddings: Dict[ChatIntent, List[np.ndarray]] = {}
+        position = 0
+        for intent, examples in INTENT_EXAMPLES.items():
+            embeddings[intent] = vectors[position:position + len(examples)]
+            position += len(examples)
+        index = IntentCentroidIndex.build(embeddings)
+
+        try:
+            index.save(self.index_path, fingerprint)
+        except Exception as e:
+            log_warning(f"[IntentEmbedding] Falha ao salvar centroides: {e}")
+        log_info(f"[IntentEmbedding] Índice gerado: {len(index.intents)} intenções, {len(texts)} exemplos")
+        return index
+
+    def classify(self, message: str) -> Optional[Tuple[ChatIntent, float]]:
+        """(intenção, similaridade) ou None se o índice/embedding falhar ou a mensagem for ambígua"""
+        index = self._get_index()
+        if index is None:
+            return None
+        vector = self.embedding_client.generate_embedding(message, label="intent")
+        if vector is None:
+            return None
+
+        intent, similarity, margin = index.nearest(vector)
+        if similarity < INTENT_EMBEDDING_MIN_SIMILARITY or margin < INTENT_EMBEDDING_MIN_MARGIN:
+            log_info(f"[IntentEmbedding] Ambíguo: {intent.value} (sim {similarity:.2f}, margem {margin:.2f})")
+            return None
+        return intent, similarity
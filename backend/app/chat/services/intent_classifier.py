@@ -1,8 +1,11 @@
 from enum import Enum
 from dataclasses import dataclass
 from typing import Dict, Any, Optional, List
+import asyncio
+import os
 import re
-from app.core.logging import log_info
+from app.core.keyword_automaton import KeywordAutomaton
+from app.core.logging import log_info, log_error
 
 
 class ChatIntent(Enum):
@@ -25,70 +28,165 @@ class IntentClassificationResult:
     reasoning: Optional[str] = None
 
 
+# Palavras-chave por categoria, compiladas num único autômato (app.core.keyword_automaton):
+# casam palavras inteiras, sem diferenciar acentos, por isso plurais são listados à parte.
+#
+# Mudança de comportamento em relação às listas anteriores (casamento por substring),
+# além da fronteira de palavra: 'inpresa'/'possuin' corrigidos para 'empresa'/'possuem';
+# acrescentados 'vagas', 'requisito', 'candidata(s)', 'candidatos', 'currículos',
+# 'experiências' e 'reiniciar'; removidos 'so', 'semantico', 'compativeis' e 'historico'
+# (duplicatas sem acento). Os scores são acertos / tamanho da lista, então vaga (14 -> 16),
+# candidate (9 -> 14), filter (43 -> 42), semantic (18 -> 16), reset (10 -> 11) e
+# history (7 -> 6) mudaram de denominador e as confianças derivadas mudam junto.
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    'vaga': [
+        'vaga', 'vagas', 'posição', 'cargo', 'trabalho', 'empresa', 'salário',
+        'benefícios', 'requisitos', 'requisito', 'responsabilidades', 'atividades',
+        'local de trabalho', 'horário', 'contratação', 'descrição'
+    ],
+    'candidate': [
+        'candidato', 'candidata', 'candidatos', 'candidatas', 'pessoa', 'currículo',
+        'currículos', 'cv', 'experiência', 'experiências', 'formação', 'habilidades',
+        'competências', 'perfil'
+    ],
+    'filter': [
+        'filtrar', 'filtre', 'buscar', 'busque', 'encontrar', 'encontre',
+        'mostrar', 'mostre', 'listar', 'liste', 'procurar', 'procure',
+        'trazer', 'traga', 'selecionar', 'selecione', 'candidatos', 'pessoas',
+        'recomende', 'recomenda', 'sugira', 'sugere', 'ranking', 'top',
+        'quero', 'quais', 'que', 'apenas', 'somente', 'só',
+        'aqueles', 'aquelas', 'com', 'que tenham', 'que possuem', 'possuem',
+        'adicione', 'adicionar', 'inclua', 'incluir', 'acrescente', 'acrescentar'
+    ],
+    # Palavras-chave específicas de busca semântica
+    'semantic': [
+        'semântico', 'similares', 'compatíveis', 'parecidos', 'relacionados',
+        'semantic', 'matching', 'score', 'embedding', 'vetores', 'machine learning',
+        'inteligência artificial', 'ai', 'mais relevantes', 'melhor match', 'combinam com'
+    ],
+    'ranking': ['melhores', 'mais relevantes', 'compatíveis', 'similares'],
+    'reset': [
+        'reset', 'resetar', 'limpar', 'limpe', 'começar novamente',
+        'recomeçar', 'zerar', 'iniciar', 'reiniciar', 'novo filtro', 'nova busca'
+    ],
+    'history': [
+        'histórico', 'filtros anteriores', 'filtros aplicados',
+        'o que filtrei', 'quais filtros', 'histórico de filtros'
+    ],
+    'question': ['fale', 'conte', 'descreva', 'explique', 'sobre', 'qual', 'como', 'quais'],
+    'location': ['são paulo', 'sp', 'rio', 'rio de janeiro', 'rj', 'belo horizonte'],
+    'skill': ['python', 'java', 'javascript', 'react', 'angular'],
+    'language': [
+        'inglês', 'english', 'espanhol', 'francês', 'básico',
+        'intermediário', 'avançado', 'fluente'
+    ],
+    'greeting': ['olá', 'oi', 'hey', 'hello', 'hi', 'bom dia', 'boa tarde', 'boa noite'],
+    'thanks': ['obrigado', 'obrigada', 'valeu', 'thanks'],
+    'confirmation': ['ok', 'certo', 'entendi', 'beleza'],
+    'farewell': ['tchau', 'até mais', 'bye', 'até logo'],
+}
+
+INTENT_KEYWORD_AUTOMATON = KeywordAutomaton(INTENT_KEYWORDS)
+
+# Em ordem de prioridade; a primeira encontrada vai em parameters['generic_type']
+GENERIC_CATEGORIES = ('greeting', 'thanks', 'confirmation', 'farewell')
+
+# Desempate por centroides de embeddings (ver embedding_intent_classifier)
+INTENT_EMBEDDING_CLASSIFIER = os.getenv("INTENT_EMBEDDING_CLASSIFIER", "false").lower() == "true"
+
+_NUMBER_PATTERN = re.compile(r'\d')
+_CANDIDATE_ID_PATTERN = re.compile(r'candidato\s+(\d+)|id\s*:?\s*(\d+)')
+
+
 class IntentClassifier:
     """
     Classifica a intenção do usuário no chat
     """
     
-    def __init__(self):
-        # Palavras-chave para diferentes intenções
-        self.vaga_keywords = [
-            'vaga', 'posição', 'cargo', 'trabalho', 'inpresa', 'salário', 
-            'benefícios', 'requisitos', 'responsabilidades', 'atividades',
-            'local de trabalho', 'horário', 'contratação', 'descrição'
-        ]
-        
-        self.candidate_keywords = [
-            'candidato', 'pessoa', 'currículo', 'cv', 'experiência', 
-            'formação', 'habilidades', 'competências', 'perfil'
-        ]
-        
-        self.filter_keywords = [
-            'filtrar', 'filtre', 'buscar', 'busque', 'encontrar', 'encontre', 
-            'mostrar', 'mostre', 'listar', 'liste', 'procurar', 'procure',
-            'trazer', 'traga', 'selecionar', 'selecione', 'candidatos', 'pessoas',
-            'recomende', 'recomenda', 'sugira', 'sugere', 'ranking', 'top',
-            'quero', 'quais', 'que', 'apenas', 'somente', 'só', 'so', 
-            'aqueles', 'aquelas', 'com', 'que tenham', 'que possuin', 'possuin',
-            'adicione', 'adicionar', 'inclua', 'incluir', 'acrescente', 'acrescentar'
-        ]
-        
-        # Palavras-chave específicas for semantic search
-        self.semantic_filter_keywords = [
-            'semântico', 'semantico', 'similares', 'compatíveis', 'compativeis',
-            'parecidos', 'relacionados', 'semantic', 'matching', 'score',
-            'embedding', 'vetores', 'machine learning', 'inteligência artificial',
-            'ai', 'mais relevantes', 'melhor match', 'combinam com'
-        ]
-        
-        self.reset_keywords = [
-            'reset', 'resetar', 'limpar', 'limpe', 'começar novamente',
-            'recomeçar', 'zerar', 'iniciar', 'novo filtro', 'nova busca'
-        ]
-        
-        self.history_keywords = [
-            'histórico', 'historico', 'filtros anteriores', 'filtros aplicados',
-            'o que filtrei', 'quais filtros', 'histórico de filtros'
-        ]
-        
-        self.greetings = [
-            'olá', 'ola', 'oi', 'hey', 'hello', 'hi', 'bom dia', 'boa tarde', 'boa noite'
-        ]
-        
-        self.thanks = ['obrigado', 'obrigada', 'valeu', 'thanks']
-        
-        self.confirmations = ['ok', 'certo', 'entendi', 'beleza']
-        
-        self.farewells = ['tchau', 'até mais', 'bye', 'até logo']
+    def __init__(self, embedding_classifier=None):
+        self.automaton = INTENT_KEYWORD_AUTOMATON
+        
+        self.embedding_classifier = embedding_classifier
+        if self.embedding_classifier is None and INTENT_EMBEDDING_CLASSIFIER:
+            from app.chat.services.embedding_intent_classifier import EmbeddingIntentClassifier
+            self.embedding_classifier = EmbeddingIntentClassifier()
     
     def classify(self, message: str, workbook_id: Optional[str] = None) -> IntentClassificationResult:
         """
         Classifica a intenção do usuário
+        
+        Palavras-chave resolvem os casos óbvios; os ambíguos passam pelos centroides
+        de embeddings quando INTENT_EMBEDDING_CLASSIFIER está ativo.
+        """
+        result = self.classify_keywords(message, workbook_id)
+        if self.embedding_classifier is None or not self.needs_embedding(result):
+            return result
+        return self._refine_with_embedding(result, message, workbook_id)
+    
+    async def aclassify(self, message: str, workbook_id: Optional[str] = None) -> IntentClassificationResult:
+        """Versão assíncrona de classify: só a chamada de embedding vai para uma thread"""
+        result = self.classify_keywords(message, workbook_id)
+        if self.embedding_classifier is None or not self.needs_embedding(result):
+            return result
+        return await asyncio.to_thread(self._refine_with_embedding, result, message, workbook_id)
+    
+    def needs_embedding(self, result: IntentClassificationResult) -> bool:
+        """Resultados das palavras-chave que não são evidentes e justificam um embedding"""
+        params = result.parameters
+        if result.intent == ChatIntent.UNKNOWN:
+            return True
+        if result.intent == ChatIntent.SEMANTIC_CANDIDATE_FILTER:
+            # Sem quantidade, local, skill ou idioma, o filtro veio só de palavras genéricas
+            return not any(params.get(key) for key in ('has_quantity', 'has_location', 'has_skills', 'has_languages'))
+        if result.intent == ChatIntent.CANDIDATE_QUESTION:
+            return not params.get('candidate_id')
+        if result.intent == ChatIntent.VAGA_QUESTION:
+            # 0.9 = pergunta explícita sobre a vaga; abaixo disso é o fallback por palavra-chave
+            return result.confidence < 0.9
+        return False
+    
+    def _refine_with_embedding(
+        self,
+        result: IntentClassificationResult,
+        message: str,
+        workbook_id: Optional[str]
+    ) -> IntentClassificationResult:
+        try:
+            match = self.embedding_classifier.classify(message)
+        except Exception as e:
+            log_error(f"[IntentEmbedding] Falha na classificação por embedding: {e}")
+            return result
+        if match is None:
+            return result
+        
+        intent, similarity = match
+        if intent == result.intent:
+            result.confidence = max(result.confidence, 0.9)
+            result.reasoning = f"{result.reasoning} (confirmado por embedding, sim {similarity:.2f})"
+            return result
+        
+        log_info(f"[IntentEmbedding] {result.intent.value} -> {intent.value} (sim {similarity:.2f})")
+        # Parâmetros cobrem o que qualquer handler lê (question/message/workbook_id)
+        parameters = {**result.parameters, 'message': message, 'question': message, 'workbook_id': workbook_id}
+        if intent == ChatIntent.SEMANTIC_CANDIDATE_FILTER:
+            parameters['use_semantic'] = True
+        return IntentClassificationResult(
+            intent=intent,
+            confidence=round(min(0.5 + similarity / 2, 0.95), 2),
+            parameters=parameters,
+            reasoning=f"Classificado por embedding (palavras-chave: {result.intent.value}, sim {similarity:.2f})"
+        )
+    
+    def classify_keywords(self, message: str, workbook_id: Optional[str] = None) -> IntentClassificationResult:
+        """
+        Classifica a intenção do usuário só por palavras-chave
         """
         message_lower = message.lower()
+        # Uma única passada pelo texto calcula o score de todas as categorias
+        scores = self.automaton.scores(message)
         
         # 1. Verifica reset de filtros
-        if self._matches_keywords(message_lower, self.reset_keywords):
+        if scores['reset'] > 0:
             return IntentClassificationResult(
                 intent=ChatIntent.FILTER_RESET,
                 confidence=0.9,
@@ -97,7 +195,7 @@ class IntentClassifier:
             )
         
         # 2. Verifica histórico de filtros
-        if self._matches_keywords(message_lower, self.history_keywords):
+        if scores['history'] > 0:
             return IntentClassificationResult(
                 intent=ChatIntent.FILTER_HISTORY,
                 confidence=0.9,
@@ -106,11 +204,8 @@ class IntentClassifier:
             )
         
         # 3. Verifica pergunta sobre vaga (PRIORIDADE sobre filtros)
-        vaga_score = self._score_keywords(message_lower, self.vaga_keywords)
-        is_question_about_vaga = (
-            vaga_score > 0 and 
-            any(word in message_lower for word in ['fale', 'conte', 'descreva', 'explique', 'sobre', 'qual', 'como', 'quais'])
-        )
+        vaga_score = scores['vaga']
+        is_question_about_vaga = vaga_score > 0 and scores['question'] > 0
         
         if is_question_about_vaga:
             return IntentClassificationResult(
@@ -124,22 +219,21 @@ class IntentClassifier:
             )
 
         # 4. Verifica filtro/busca de candidatos
-        filter_score = self._score_keywords(message_lower, self.filter_keywords)
-        candidate_score = self._score_keywords(message_lower, self.candidate_keywords)
-        semantic_score = self._score_keywords(message_lower, self.semantic_filter_keywords)
+        filter_score = scores['filter']
+        candidate_score = scores['candidate']
+        semantic_score = scores['semantic']
         
         # Padrões específicos de filtro
-        has_numbers = bool(re.search(r'\d+', message))
-        has_location = any(loc in message_lower for loc in ['são paulo', 'sp', 'rio', 'rj', 'belo horizonte'])
-        has_skills = any(skill in message_lower for skill in ['python', 'java', 'javascript', 'react', 'angular'])
-        has_languages = any(lang in message_lower for lang in ['inglês', 'ingles', 'english', 'espanhol', 'francês', 'básico', 'basico', 'intermediário', 'intermediario', 'avançado', 'avancado', 'fluente'])
+        has_numbers = _NUMBER_PATTERN.search(message) is not None
+        has_location = scores['location'] > 0
+        has_skills = scores['skill'] > 0
+        has_languages = scores['language'] > 0
         
         use_semantic = (
             semantic_score > 0 or  # Palavras-chave explícitas de semântica
             filter_score > 0 or  # QUALQUER filtro deve usar sinântica por padrão
             candidate_score > 0 or  # QUALQUER busca de candidatos usa sinântica
-            'melhores' in message_lower or 'mais relevantes' in message_lower or
-            'compatíveis' in message_lower or 'similares' in message_lower or
+            scores['ranking'] > 0 or
             has_numbers or has_location or has_skills or has_languages
         )
         
@@ -165,8 +259,7 @@ class IntentClassifier:
             )
         
         # 5. Verifica pergunta sobre candidato específico
-        candidate_id_pattern = r'candidato\s+(\d+)|id\s*:?\s*(\d+)'
-        candidate_id_match = re.search(candidate_id_pattern, message_lower)
+        candidate_id_match = _CANDIDATE_ID_PATTERN.search(message_lower)
         
         if candidate_id_match or (candidate_score > 0 and not filter_score):
             candidate_id = None
@@ -185,7 +278,6 @@ class IntentClassifier:
             )
         
         # 6. Verifica pergunta sobre vaga (fallback)
-        vaga_score = self._score_keywords(message_lower, self.vaga_keywords)
         if vaga_score > 0:
             return IntentClassificationResult(
                 intent=ChatIntent.VAGA_QUESTION,
@@ -198,11 +290,12 @@ class IntentClassifier:
             )
         
         # 7. Verifica conversação genérica
-        if self._is_generic_conversation(message_lower):
+        generic_type = next((category for category in GENERIC_CATEGORIES if scores[category] > 0), None)
+        if generic_type:
             return IntentClassificationResult(
                 intent=ChatIntent.GENERIC_CONVERSATION,
                 confidence=0.9,
-                parameters={'message': message},
+                parameters={'message': message, 'generic_type': generic_type},
                 reasoning="Conversação genérica (saudação, agradecimento, etc.)"
             )
         
@@ -213,23 +306,3 @@ class IntentClassifier:
             parameters={'message': message, 'workbook_id': workbook_id},
             reasoning="Não foi possível classificar a intenção"
         )
-    
-    def _matches_keywords(self, text: str, keywords: List[str]) -> bool:
-        """Verifica se o texto contém alguma das palavras-chave"""
-        return any(keyword in text for keyword in keywords)
-    
-    def _score_keywords(self, text: str, keywords: List[str]) -> float:
-        """Calcula um score baseado na presença de palavras-chave"""
-        matches = sum(1 for keyword in keywords if keyword in text)
-        return min(matches / len(keywords), 1.0)
-    
-    def _is_generic_conversation(self, text: str) -> bool:
-        """Verifica se é uma conversação genérica"""
-        clean_text = text.strip('.,!?;:')
-        
-        return (
-            any(greeting in clean_text for greeting in self.greetings) or
-            any(thank in clean_text for thank in self.thanks) or
-            any(conf in clean_text for conf in self.confirmations) or
-            any(farewell in clean_text for farewell in self.farewells)
-        )
@@ -1,12 +1,23 @@
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Iterable, List, Optional
 from urllib import response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.llm.factory import get_llm_client
-from app.core.logging import log_info, log_error
+from app.llm.rate_limiter import llm_call_site
+from app.llm.json_parser import JSONParseError, parse_llm_json
+from app.schemas.llm_outputs import SearchCriteriaOutput
+from app.services.criteria_extraction_service import CRITERIA_SCOPE_CANDIDATES, extract_limit, get_criteria_extractor
+from app.services.candidate_pool_cache import CandidatePool, get_candidate_pool_cache, narrows
+from app.services.candidate_feature_store import CANDIDATE_FEATURE_STORE, EDUCATION_RANK, FeatureColumns, get_candidate_feature_store
+from app.core.logging import log_info, log_error, llm_log
+from app.core.skill_taxonomy import canonicalize_skills, skill_matches
+from app.repositories.applicant_skill_repository import ApplicantSkillRepository
+from pydantic import ValidationError
 import json
 import re
 
+import numpy as np
+
 
 class SemanticCandidateService:
     """
@@ -19,9 +30,9 @@ class SemanticCandidateService:
     No duplications: Removed obsolete SQL methods.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, llm_client=None):
         self.db = db
-        self.llm_client = get_llm_client()
+        self.llm_client = llm_client or get_llm_client()
     
     def filter_candidates_complete(self, workbook_id: str, user_input: str) -> Dict[str, Any]:
         """
@@ -88,63 +99,46 @@ class SemanticCandidateService:
     
     def extract_criteria_with_llm(self, filter_text: str) -> Dict[str, Any]:
         """
-        Use LLM to extract specific filter criteria from natural text
-        Simplified version: No historical context
+        Extract specific filter criteria from natural text
+        Cache, rule-based extractor and near-duplicate lookup first (criteria_extraction_service);
+        the LLM is only called for messages they cannot resolve
         """
-        prompt = self._build_extraction_prompt(filter_text)
-        
         try:
-            response = self.llm_client.extract_text(prompt)
-            print("===== LLM response =====")
-            print(response)
-            print("=============================")
-            criteria = self._parse_llm_response(response)
-            
-            # Fallback: If LLM didn't extract limit but there's a number in text, force extraction
-            if criteria.get('limite') is None:
-                extracted_limit = self._extract_limit_fallback(filter_text)
-                if extracted_limit:
-                    criteria['limite'] = extracted_limit
-                    log_info(f"FALLBACK: Extracted limit {extracted_limit} via regex from '{filter_text}'")
-            
-            return criteria
-            
+            criteria = get_criteria_extractor(CRITERIA_SCOPE_CANDIDATES).extract(filter_text, self._extract_criteria_llm_call)
         except Exception as e:
             log_error(f"Error extracting criteria with LLM: {str(e)}")
+            criteria = None
+        
+        if criteria is None:
             # Try fallback even on error
-            fallback_limit = self._extract_limit_fallback(filter_text)
             return {
                 "usar_similaridade": True, 
-                "limite": fallback_limit,
+                "limite": self._extract_limit_fallback(filter_text),
                 "filtros": {}
             }
+        
+        # Fallback: If LLM didn't extract limit but there's a number in text, force extraction
+        if criteria.get('limite') is None:
+            extracted_limit = self._extract_limit_fallback(filter_text)
+            if extracted_limit:
+                criteria['limite'] = extracted_limit
+                log_info(f"FALLBACK: Extracted limit {extracted_limit} via regex from '{filter_text}'")
+        
+        return criteria
+    
+    def _extract_criteria_llm_call(self, filter_text: str) -> Optional[Dict[str, Any]]:
+        """LLM call for criteria; None when the response is not valid JSON (not cached)"""
+        prompt = self._build_extraction_prompt(filter_text)
+        with llm_call_site("criteria_extraction"):
+            response = self.llm_client.extract_text(prompt)
+        llm_log(f"Criteria extraction response: {response}")
+        return self._parse_llm_response(response)
     
     def _extract_limit_fallback(self, text: str) -> Optional[int]:
         """
         Extract limit by regex as fallback when LLM fails
         """
-        import re
-        
-        # Patterns to extract candidate numbers
-        patterns = [
-            r'\b(?:me\s+)?(?:traga|busque|filtre|quero|encontre)\s+(\d+)\s*candidatos?\b',
-            r'\b(\d+)\s*candidatos?\b',
-            r'\btraga\s+(\d+)\b',
-            r'\bbusque\s+(\d+)\b'
-        ]
-        
-        text_lower = text.lower()
-        for pattern in patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                try:
-                    limit = int(match.group(1))
-                    if 1 <= limit <= 100:  # Reasonable limit
-                        return limit
-                except (ValueError, IndexError):
-                    continue
-        
-        return None
+        return extract_limit(text)
     
     def semantic_filter_candidates(
         self, 
@@ -187,40 +181,16 @@ class SemanticCandidateService:
             
             log_info(f"Using job_id: {vaga_id} for semantic search")
             
-            # STEP 0: Busca candidatos já nos match prospects para referência
-            existing_prospect_ids = self._get_existing_prospect_ids(workbook_id)
-            selected_prospect_ids = self._get_selected_prospect_ids(workbook_id)
-            log_info(f"Candidatos já nos prospects: {len(existing_prospect_ids)}")
+            # STEP 0: Estado dos match prospects (ids + seleção) numa única consulta
+            prospect_states = self._get_prospect_states(workbook_id)
+            selected_prospect_ids = {pid for pid, selected in prospect_states.items() if selected}
+            log_info(f"Candidatos já nos prospects: {len(prospect_states)}")
             log_info(f"Candidatos selecionados (sinpre mostrar): {len(selected_prospect_ids)}")
             
-            # STEP 1: Busca um POOL GRANDE excluindo apenas prospects NÃO selecionados
-            # Candidatos selecionados sinpre aparecin, mas exclui outros já nos prospects
-            non_selected_prospects = [pid for pid in existing_prospect_ids if pid not in selected_prospect_ids]
+            # STEP 1-2: Pool ranqueado e decodificado, do cache do workbook se os prospects não mudaram
             pool_size = max(1000, limit * 10)  # Garante pool suficiente
-            log_info(f"Excluding {len(non_selected_prospects)} non-selected prospects from search")
-            log_info(f"Searching pool of {pool_size} candidates for filtering")
-            
-            base_query, base_params = self._build_base_semantic_query(vaga_id, pool_size, non_selected_prospects)
-            
-            log_info(f"Executando busca do pool: {base_query}")
-            log_info(f"Parameters: {base_params}")
-            
-            result = self.db.execute(text(base_query), base_params)
-            candidates_raw = result.fetchall()
-            
-            log_info(f"Pool inicial: {len(candidates_raw)} candidatos")
-            
-            # STEP 2: Processa candidatos in Python
-            all_candidates = []
-            for candidate in candidates_raw:
-                try:
-                    candidate_dict = self._process_candidate_row(candidate)
-                    all_candidates.append(candidate_dict)
-                except Exception as e:
-                    log_error(f"Erro ao processar candidato {candidate.id}: {str(e)}")
-                    continue
-            
-            log_info(f"Candidatos processados: {len(all_candidates)}")
+            pool = self._get_candidate_pool(workbook_id, vaga_id, pool_size, prospect_states)
+            all_candidates = pool.candidates
             
             # STEP 3: Separa candidatos selecionados ANTES dos filtros
             selected_candidates = []
@@ -244,8 +214,17 @@ class SemanticCandidateService:
             log_info(f"Candidatos selecionados (sem filtros, ordenados por relevância): {len(selected_candidates)}")
             log_info(f"Non-selected candidates for filtering: {len(non_selected_candidates)}")
             
-            # STEP 4: Aplica filtros APENAS nos candidatos não selecionados
+            # STEP 4: Aplica filtros APENAS nos candidatos não selecionados.
+            # Se o filtro só restringe o anterior, parte de quem já tinha passado nele
+            filters = criteria.get('filtros') or {}
+            pool_cache = get_candidate_pool_cache()
+            last_filter = pool_cache.last_filter(pool)
+            if last_filter is not None and narrows(last_filter[0], filters):
+                passed_ids = last_filter[1]
+                non_selected_candidates = [c for c in non_selected_candidates if c['id'] in passed_ids]
+                log_info(f"Filtro incremental sobre o resultado anterior: {len(non_selected_candidates)} candidatos")
             filtered_new_candidates = self._apply_python_filters(non_selected_candidates, criteria)
+            pool_cache.record_filter(pool, filters, (c['id'] for c in filtered_new_candidates))
             
             # Ordena candidatos novos por score sinântico DESC (maiores scores primeiro)
             filtered_new_candidates.sort(key=lambda x: x.get('score_semantico', 0.0), reverse=True)
@@ -260,7 +239,8 @@ class SemanticCandidateService:
             
             # STEP 5: Candidatos selecionados sempre aparecem + novos até o limite solicitado
             # Selected ones DON'T count in limit - they are EXTRAS
-            final_result = selected_candidates + filtered_new_candidates[:limit]
+            # Cópias rasas: os dicts do pool ficam no cache
+            final_result = [dict(c) for c in selected_candidates + filtered_new_candidates[:limit]]
                 
             log_info(f"Resultado final: {len(selected_candidates)} selecionados (extras) + {len(filtered_new_candidates[:limit])} novos (limite) = {len(final_result)} total")
             
@@ -323,32 +303,17 @@ ATENÇÃO: Se a solicitação contém um número de candidatos, o "limite" DEVE
 
 JSON:"""
     
-    def _parse_llm_response(self, response: str) -> Dict[str, Any]:
+    def _parse_llm_response(self, response: str) -> Optional[Dict[str, Any]]:
         """Extrai e valida JSON da resposta do LLM"""
-        # Extrai apenas o JSON da resposta
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            criteria = json.loads(json_str)
-            
-            # Corrige o formato do limite se necessário
-            if 'limite' in criteria:
-                limite = criteria['limite']
-                if isinstance(limite, list) and limite:
-                    # Se é uma lista, pega o primeiro elinento
-                    criteria['limite'] = int(limite[0]) if str(limite[0]).isdigit() else None
-                elif isinstance(limite, str) and limite.isdigit():
-                    # If it's numeric string, convert to int
-                    criteria['limite'] = int(limite)
-                elif not isinstance(limite, (int, type(None))):
-                    # Se não é int nin None, define como None
-                    criteria['limite'] = None
-            
-            log_info(f"LLM extraiu critérios: {criteria}")
-            return criteria
-        else:
-            log_error(f"LLM did not return valid JSON: {response}")
-            return {"usar_similaridade": True, "filtros": {}}
+        try:
+            # Reparo local de JSON + SearchCriteriaOutput normaliza limite/vaga_id ("7", [7], "dez")
+            criteria = SearchCriteriaOutput.model_validate(parse_llm_json(response)).model_dump()
+        except (JSONParseError, ValidationError) as e:
+            log_error(f"LLM did not return valid JSON ({e}): {response}")
+            return None
+        
+        log_info(f"LLM extraiu critérios: {criteria}")
+        return criteria
     
     def _build_base_semantic_query(self, vaga_id: int, pool_size: int, exclude_prospect_ids: List[int] = None) -> tuple:
         """Constrói consulta SQL base APENAS com similaridade sinântica (sin filtros específicos)"""
@@ -375,57 +340,90 @@ WHERE v.id = :vaga_id
         
         return query, params
 
-    def _get_existing_prospect_ids(self, workbook_id: str) -> List[int]:
-        """Busca IDs dos candidatos que já estão nos match prospects"""
+    def _get_prospect_states(self, workbook_id: str) -> Dict[int, bool]:
+        """applicant_id -> selecionado de todos os match prospects do workbook"""
         try:
             from app.models.match_prospect import MatchProspect
             
-            prospects = self.db.query(MatchProspect.applicant_id).filter(
+            rows = self.db.query(MatchProspect.applicant_id, MatchProspect.selecionado).filter(
                 MatchProspect.workbook_id == workbook_id
             ).all()
-            
-            prospect_ids = [prospect.applicant_id for prospect in prospects]
-            log_info(f"Found {len(prospect_ids)} candidatos já nos prospects: {prospect_ids}")
-            return prospect_ids
+            return {row.applicant_id: bool(row.selecionado) for row in rows}
             
         except Exception as e:
             log_error(f"Erro ao buscar prospects existentes: {str(e)}")
-            return []
+            return {}
 
-    def _get_selected_prospect_ids(self, workbook_id: str) -> List[int]:
-        """Busca IDs dos candidatos que estão selecionados nos match prospects"""
-        try:
-            from app.models.match_prospect import MatchProspect
-            
-            prospects = self.db.query(MatchProspect.applicant_id).filter(
-                MatchProspect.workbook_id == workbook_id,
-                MatchProspect.selecionado == True
-            ).all()
-            
-            prospect_ids = [prospect.applicant_id for prospect in prospects]
-            log_info(f"Found {len(prospect_ids)} candidatos selecionados: {prospect_ids}")
-            return prospect_ids
-            
-        except Exception as e:
-            log_error(f"Erro ao buscar prospects selecionados: {str(e)}")
-            return []
+    def _get_candidate_pool(self, workbook_id: str, vaga_id: int, pool_size: int, prospect_states: Dict[int, bool]) -> CandidatePool:
+        """Pool do cache do workbook ou nova busca semântica (prospects não selecionados excluídos)"""
+        cache = get_candidate_pool_cache()
+        version = frozenset(prospect_states.items())
+        pool = cache.get(workbook_id, vaga_id, pool_size, version)
+        if pool is not None:
+            log_info(f"Pool do cache: {len(pool.candidates)} candidatos (workbook {workbook_id})")
+            return pool
+        
+        # Busca um POOL GRANDE excluindo apenas prospects NÃO selecionados
+        # Candidatos selecionados sempre aparecem, mas exclui outros já nos prospects
+        non_selected_prospects = [pid for pid, selected in prospect_states.items() if not selected]
+        log_info(f"Excluding {len(non_selected_prospects)} non-selected prospects from search")
+        log_info(f"Searching pool of {pool_size} candidates for filtering")
+        
+        base_query, base_params = self._build_base_semantic_query(vaga_id, pool_size, non_selected_prospects)
+        
+        log_info(f"Executando busca do pool: {base_query}")
+        log_info(f"Parameters: {base_params}")
+        
+        result = self.db.execute(text(base_query), base_params)
+        candidates_raw = result.fetchall()
+        
+        log_info(f"Pool inicial: {len(candidates_raw)} candidatos")
+        
+        # Processa candidatos em Python
+        candidates = []
+        for candidate in candidates_raw:
+            try:
+                candidates.append(self._process_candidate_row(candidate))
+            except Exception as e:
+                log_error(f"Erro ao processar candidato {candidate.id}: {str(e)}")
+                continue
+        
+        log_info(f"Candidatos processados: {len(candidates)}")
+        
+        pool = CandidatePool(vaga_id=vaga_id, pool_size=pool_size, prospects_version=version, candidates=candidates)
+        cache.put(workbook_id, pool)
+        return pool
 
     def _apply_python_filters(self, candidates: List[Dict], criteria: Dict[str, Any]) -> List[Dict]:
         """Aplica filtros específicos in Python sobre a lista de candidatos"""
         filtros = criteria.get('filtros', {})
         filtered = candidates.copy()
+        columns = self._feature_columns() if (filtros.get('idiomas') or filtros.get('habilidades') or filtros.get('formacao')) else None
         
         # Filtra por idiomas
         if filtros.get('idiomas'):
-            filtered = self._filter_by_languages(filtered, filtros['idiomas'])
+            mask = columns.language_mask(filtros['idiomas']) if columns is not None else None
+            filtered = self._filter_with_mask(
+                filtered, columns, mask, lambda rest: self._filter_by_languages(rest, filtros['idiomas'])
+            )
             
         # Filtra por habilidades
         if filtros.get('habilidades'):
-            filtered = self._filter_by_skills(filtered, filtros['habilidades'])
+            mask = columns.skill_mask(filtros['habilidades']) if columns is not None else None
+            filtered = self._filter_with_mask(
+                filtered, columns, mask, lambda rest: self._filter_by_skills(
+                    rest, filtros['habilidades'], columns.skills if columns is not None else None
+                )
+            )
             
         # Filtra por formação
         if filtros.get('formacao'):
-            filtered = self._filter_by_education(filtered, filtros['formacao'])
+            formacao = filtros['formacao']
+            nivel = formacao.get('nivel') if isinstance(formacao, dict) else None
+            mask = columns.education_mask(nivel) if columns is not None and nivel else None
+            filtered = self._filter_with_mask(
+                filtered, columns, mask, lambda rest: self._filter_by_education(rest, formacao)
+            )
             
         # Filtra por localização
         if filtros.get('localizacao'):
@@ -437,6 +435,37 @@ WHERE v.id = :vaga_id
         
         return filtered
 
+    def _feature_columns(self) -> Optional[FeatureColumns]:
+        """Colunas de features da base (None se o store estiver desativado ou ainda sem carga)"""
+        if not CANDIDATE_FEATURE_STORE:
+            return None
+        return get_candidate_feature_store().refresh(self.db)
+
+    def _filter_with_mask(
+        self,
+        candidates: List[Dict],
+        columns: Optional[FeatureColumns],
+        mask: Optional[np.ndarray],
+        python_filter: Callable[[List[Dict]], List[Dict]]
+    ) -> List[Dict]:
+        """
+        Mantém os candidatos aprovados pela máscara do store (mesma ordem)
+        
+        Candidatos que ainda não estão no store (gravados depois do último
+        refresh) e filtros sem máscara passam pelo filtro em Python.
+        """
+        if columns is None or mask is None:
+            return python_filter(candidates)
+        
+        rows, known = columns.positions([c['id'] for c in candidates])
+        passed = known & mask[rows]
+        unknown = [c for c, is_known in zip(candidates, known) if not is_known]
+        unknown_passed = {id(c) for c in python_filter(unknown)} if unknown else set()
+        return [
+            c for c, ok, is_known in zip(candidates, passed, known)
+            if ok or (not is_known and id(c) in unknown_passed)
+        ]
+
     def _filter_by_languages(self, candidates: List[Dict], language_filters: List) -> List[Dict]:
         """Filtra candidatos por idiomas in Python"""
         if not language_filters:
@@ -539,43 +568,53 @@ WHERE v.id = :vaga_id
         log_info(f"Filter de idiomas: {len(candidates)} candidatos -> {len(filtered)} filtrados")
         return filtered
 
-    def _filter_by_skills(self, candidates: List[Dict], skills: List[str]) -> List[Dict]:
-        """Filtra candidatos por habilidades in Python"""
+    def _filter_by_skills(self, candidates: List[Dict], skills: List[str], vocabulary: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Filtra candidatos por habilidades pelo índice applicant_skills (formas canônicas; vocabulary: skills do store)"""
         if not skills:
             return candidates
         
         # Filtra apenas strings válidas
-        valid_skills = [skill for skill in skills if isinstance(skill, str) and skill.strip()]
+        valid_skills = canonicalize_skills(skill for skill in skills if isinstance(skill, str))
         
-        if not valid_skills:
+        if not valid_skills or not candidates:
             return candidates
-            
-        filtered = []
         
+        try:
+            matching_ids = ApplicantSkillRepository(self.db).applicant_ids_with_any(
+                valid_skills, [c['id'] for c in candidates], vocabulary=vocabulary
+            )
+            return [c for c in candidates if c['id'] in matching_ids]
+        except Exception as e:
+            log_error(f"Erro ao consultar índice de habilidades, filtrando pelo CV: {str(e)}")
+            self.db.rollback()
+        
+        filtered = []
         for candidate in candidates:
             cv_data = candidate.get('cv_pt', {})
-            candidate_skills = cv_data.get('habilidades', [])
-            candidate_skills_text = ' '.join(str(skill) for skill in candidate_skills if skill).lower()
+            candidate_skills = canonicalize_skills(cv_data.get('habilidades', []))
             
             # Verifica se has PELO MENOS UMA das habilidades
-            has_skill = False
-            for required_skill in valid_skills:
-                if required_skill.lower() in candidate_skills_text:
-                    has_skill = True
-                    break
-            
-            if has_skill:
+            if any(skill_matches(required, skill) for required in valid_skills for skill in candidate_skills):
                 filtered.append(candidate)
         
         return filtered
 
     def _filter_by_education(self, candidates: List[Dict], education: Dict) -> List[Dict]:
-        """Filtra candidatos por formação in Python"""
-        if not education:
+        """Filtra candidatos por formação máxima >= nível pedido (mesma regra de FeatureColumns.education_mask)"""
+        if not education or not isinstance(education, dict):
             return candidates
-            
-        # Implementar se necessário
-        return candidates
+        
+        minimum_rank = EDUCATION_RANK.get(str(education.get('nivel') or '').strip().lower())
+        if minimum_rank is None:
+            # Nível desconhecido: sem filtro, como no store
+            return candidates
+        
+        filtered = [
+            c for c in candidates
+            if EDUCATION_RANK.get(str(c.get('nivel_maximo_formacao') or '').strip().lower(), -1) >= minimum_rank
+        ]
+        log_info(f"Filter de formação: {len(candidates)} candidatos -> {len(filtered)} filtrados")
+        return filtered
 
     def _filter_by_location(self, candidates: List[Dict], location: str) -> List[Dict]:
         """Filtra candidatos por localização in Python"""
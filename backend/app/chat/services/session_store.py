@@ -0,0 +1,171 @@
+"""
+Armazenamento das sessões de chat.
+
+- InMemorySessionStore: LRU com TTL e limite de sessões; memória constante, mas
+  cada worker do uvicorn tem as suas sessões.
+- SqlSessionStore: tabela chat_sessions no Postgres, compartilhada entre workers.
+
+Escolha com CHAT_SESSION_STORE=memory|sql. Limites: CHAT_SESSION_TTL (segundos sem
+atividade), CHAT_MAX_SESSIONS (memory) e CHAT_MAX_MESSAGES (janela por sessão,
+ver app.chat.models.chat_session).
+"""
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.chat.models.chat_session import ChatSession
+from app.core.database import SessionLocal
+from app.core.logging import log_info, log_error
+from app.models.chat_session_record import ChatSessionRecord
+
+CHAT_SESSION_STORE = os.getenv("CHAT_SESSION_STORE", "memory").lower()
+CHAT_SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", 3600))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", 1000))
+# A cada N gravações o SqlSessionStore apaga as sessões expiradas
+CHAT_SESSION_PURGE_EVERY = int(os.getenv("CHAT_SESSION_PURGE_EVERY", 100))
+
+
+class SessionStore(ABC):
+    """Interface dos stores de sessão de chat"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Sessão ativa (não expirada) ou None"""
+
+    @abstractmethod
+    def save(self, session: ChatSession) -> None:
+        """Grava a sessão e renova o TTL"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Remove a sessão; False se não existia"""
+
+
+class InMemorySessionStore(SessionStore):
+    """LRU + TTL em memória: acima de max_sessions descarta a sessão usada há mais tempo"""
+
+    def __init__(self, max_sessions: int = CHAT_MAX_SESSIONS, ttl_seconds: int = CHAT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # session_id -> (sessão, instante de expiração), da menos para a mais recente
+        self._sessions: "OrderedDict[str, Tuple[ChatSession, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now: float) -> None:
+        # Ordem LRU = ordem de expiração (TTL fixo), então basta olhar o início
+        while self._sessions:
+            session_id, (_, expires_at) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[session_id]
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (entry[0], now + self.ttl_seconds)
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def save(self, session: ChatSession) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._sessions[session.id] = (session, now + self.ttl_seconds)
+            self._sessions.move_to_end(session.id)
+            self._evict_expired(now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+class SqlSessionStore(SessionStore):
+    """Sessões na tabela chat_sessions (JSONB), visíveis para todos os workers"""
+
+    def __init__(self, session_factory=SessionLocal, ttl_seconds: int = CHAT_SESSION_TTL):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self._saves = 0
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        with self.session_factory() as db:
+            data = db.query(ChatSessionRecord.data).filter(
+                ChatSessionRecord.id == session_id,
+                ChatSessionRecord.expires_at > datetime.utcnow()
+            ).scalar()
+        return ChatSession.from_dict(data) if data else None
+
+    def save(self, session: ChatSession) -> None:
+        now = datetime.utcnow()
+        values = {
+            "id": session.id,
+            "data": session.to_dict(),
+            "updated_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl_seconds)
+        }
+        stmt = pg_insert(ChatSessionRecord).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ChatSessionRecord.id],
+            set_={k: stmt.excluded[k] for k in ("data", "updated_at", "expires_at")}
+        )
+        with self.session_factory() as db:
+            db.execute(stmt)
+            db.commit()
+
+        with self._lock:
+            self._saves += 1
+            purge = self._saves % CHAT_SESSION_PURGE_EVERY == 0
+        if purge:
+            self.purge_expired()
+
+    def delete(self, session_id: str) -> bool:
+        with self.session_factory() as db:
+            deleted = db.query(ChatSessionRecord).filter(ChatSessionRecord.id == session_id).delete(synchronize_session=False)
+            db.commit()
+        return deleted > 0
+
+    def purge_expired(self) -> int:
+        try:
+            with self.session_factory() as db:
+                deleted = db.query(ChatSessionRecord).filter(
+                    ChatSessionRecord.expires_at <= datetime.utcnow()
+                ).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            log_error(f"[SessionStore] Falha ao remover sessões expiradas: {e}")
+            return 0
+        if deleted:
+            log_info(f"[SessionStore] {deleted} sessões expiradas removidas")
+        return deleted
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Store configurado em CHAT_SESSION_STORE (um por processo)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SqlSessionStore() if CHAT_SESSION_STORE == "sql" else InMemorySessionStore()
+                log_info(f"[SessionStore] Usando {type(_store).__name__}")
+    return _store
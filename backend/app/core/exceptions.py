@@ -12,6 +12,13 @@ class APIExceptions:
             detail=message
         )
     
+    @staticmethod
+    def bad_request(message: str = "Bad request"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=message
+        )
+    
     @staticmethod
     def conflict(message: str = "Resource conflict"):
         raise HTTPException(
@@ -0,0 +1,129 @@
+"""
+Autômato Aho-Corasick para casar várias listas de palavras-chave de uma vez.
+
+As palavras-chave de todas as categorias são compiladas num único autômato no
+import; match() percorre o texto uma vez (um lookup de dict por caractere) e
+devolve as palavras encontradas em cada categoria.
+
+- Acentos e caixa são ignorados: "Inglês", "ingles" e "INGLES" casam igual.
+- Só casam palavras inteiras: "sp" não casa em "espanhol" nem "rio" em "salário".
+  Texto e palavras-chave são normalizados para [a-z0-9] separados por um espaço e
+  cada padrão é envolvido em espaços, então a fronteira de palavra faz parte do
+  próprio padrão.
+"""
+
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Tuple
+
+# Marcas diacríticas separadas pela decomposição NFKD ("ê" -> "e" + U+0302)
+_COMBINING_MARKS = re.compile("[\u0300-\u036f]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def fold_text(text: str) -> str:
+    """Minúsculas, sem acentos, palavras separadas por um espaço e espaço nas pontas"""
+    folded = _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", text.lower()))
+    return f" {_NON_WORD.sub(' ', folded).strip()} "
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick sobre o texto normalizado por fold_text
+
+    A função de transição é completa (falhas resolvidas na construção), então a
+    busca não volta atrás: cada caractere custa um lookup.
+    """
+
+    def __init__(self, categories: Mapping[str, Iterable[str]]):
+        # padrão normalizado -> [(categoria, palavra-chave original)]; variantes que só
+        # diferem em acento/caixa ("só" e "so") contam uma vez por categoria
+        patterns: Dict[str, List[Tuple[str, str]]] = {}
+        self.keyword_counts: Dict[str, int] = {}
+        for category, keywords in categories.items():
+            seen = set()
+            for keyword in keywords:
+                folded = fold_text(keyword)
+                if not folded.strip() or folded in seen:
+                    continue
+                seen.add(folded)
+                patterns.setdefault(folded, []).append((category, keyword))
+            self.keyword_counts[category] = len(seen)
+
+        self.categories: Tuple[str, ...] = tuple(categories)
+        # id do padrão -> [(categoria, palavra-chave original)]
+        self._owners: List[List[Tuple[str, str]]] = list(patterns.values())
+        self._delta, self._output = self._build(list(patterns))
+
+    @staticmethod
+    def _build(patterns: List[str]):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+
+        # Trie; a saída de cada estado são os ids dos padrões que terminam nele
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(pattern_id)
+
+        alphabet = {char for pattern in patterns for char in pattern}
+
+        # Links de falha em BFS, já transformando o trie na função de transição completa
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+        for char in alphabet:
+            delta[0][char] = goto[0].get(char, 0)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char in alphabet:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    delta[state][char] = delta[fail[state]][char]
+                    continue
+                delta[state][char] = nxt
+                fail[nxt] = delta[fail[state]][char]
+                output[nxt].extend(output[fail[nxt]])
+                queue.append(nxt)
+
+        return tuple(delta), tuple(tuple(ids) for ids in output)
+
+    def _scan(self, text: str) -> set:
+        """Ids dos padrões encontrados numa passada pelo texto"""
+        delta = self._delta
+        output = self._output
+        found = set()
+        state = 0
+        for char in fold_text(text):
+            # Caracteres fora do alfabeto dos padrões voltam à raiz
+            state = delta[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def match(self, text: str) -> Dict[str, FrozenSet[str]]:
+        """Palavras-chave encontradas no texto, por categoria (todas as categorias presentes)"""
+        found: Dict[str, set] = {category: set() for category in self.categories}
+        for pattern_id in self._scan(text):
+            for category, keyword in self._owners[pattern_id]:
+                found[category].add(keyword)
+        return {category: frozenset(keywords) for category, keywords in found.items()}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Fração das palavras-chave de cada categoria presentes no texto"""
+        counts = dict.fromkeys(self.categories, 0)
+        for pattern_id in self._scan(text):
+            for category, _ in self._owners[pattern_id]:
+                counts[category] += 1
+        return {
+            category: min(count / self.keyword_counts[category], 1.0) if count else 0.0
+            for category, count in counts.items()
+        }
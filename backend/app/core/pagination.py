@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination utilities.
+
+Listings are ordered by (updated_at DESC, id DESC). The cursor is an opaque
+base64 token carrying the sort key of the last row returned, so each page is an
+index range scan instead of an OFFSET that reads and discards every earlier row.
+NULL updated_at values sort last via COALESCE(updated_at, '-infinity').
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import DateTime, func, literal_column, text, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.core.exceptions import APIExceptions
+
+# Rendered inline (not as a bind parameter) so the sort expression matches the index expression
+NEG_INFINITY = literal_column("'-infinity'::timestamp", type_=DateTime)
+
+
+def keyset_sort_key(updated_at_column):
+    """Sort expression matching the (COALESCE(updated_at, '-infinity'), id) indexes."""
+    return func.coalesce(updated_at_column, NEG_INFINITY)
+
+
+def encode_cursor(updated_at: Optional[datetime], entity_id: Any) -> str:
+    """Build an opaque cursor from the sort key of the last row of a page."""
+    payload = {"u": updated_at.isoformat() if updated_at else None, "i": entity_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], Any]:
+    """Parse a cursor produced by encode_cursor; invalid cursors are a 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        updated_at = datetime.fromisoformat(payload["u"]) if payload.get("u") else None
+        return updated_at, payload["i"]
+    except Exception:
+        APIExceptions.bad_request("Invalid pagination cursor")
+
+
+def paginate_keyset(query: Query, model, limit: int, cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Apply keyset pagination on (updated_at DESC, id DESC) to an ORM query.
+
+    Returns the rows of the page and the cursor for the next page (None on the last page).
+    """
+    sort_key = keyset_sort_key(model.updated_at)
+    if cursor:
+        updated_at, last_id = decode_cursor(cursor)
+        last_key = updated_at if updated_at is not None else NEG_INFINITY
+        query = query.filter(tuple_(sort_key, model.id) < tuple_(last_key, last_id))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(sort_key.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.updated_at, last.id)
+    return rows, next_cursor
+
+
+def estimate_table_rows(db: Session, table_name: str) -> Optional[int]:
+    """Row estimate from pg_class.reltuples (constant cost, refreshed by ANALYZE/autovacuum)."""
+    result = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name}
+    ).scalar()
+    # reltuples is -1 (PG14+) for tables never analyzed
+    if result is None or result < 0:
+        return None
+    return int(result)
+
+
+def estimate_query_rows(db: Session, query: Query) -> Optional[int]:
+    """Planner row estimate for a filtered query via EXPLAIN, without executing it."""
+    statement = query.statement
+    compiled = statement.compile(dialect=db.get_bind().dialect)
+    plan = db.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def count_rows(db: Session, query: Query, mode: str, table_name: Optional[str] = None) -> Tuple[Optional[int], bool]:
+    """
+    Total for a listing according to the requested count mode.
+
+    Returns (total, is_estimate). 'estimated' uses reltuples for unfiltered listings
+    (table_name given) and the planner estimate otherwise, falling back to an exact count.
+    """
+    if mode == "none":
+        return None, False
+    if mode == "estimated":
+        estimate = estimate_table_rows(db, table_name) if table_name else estimate_query_rows(db, query)
+        if estimate is not None:
+            return estimate, True
+    return query.order_by(None).count(), False
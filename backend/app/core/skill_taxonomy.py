@@ -0,0 +1,139 @@
+"""
+Forma canônica das habilidades extraídas dos CVs e pedidas nos filtros.
+
+O LLM devolve a mesma habilidade de vários jeitos ("ReactJS", "React.js",
+"react"; "SAP ABAP", "ABAP"). canonical_skill() reduz cada variação a uma
+chave (minúsculas, sem acentos, espaços colapsados) e troca os apelidos
+conhecidos (SKILL_ALIASES) pelo nome canônico. Habilidades fora do dicionário
+ficam só com a chave normalizada, preservando símbolos como em "c#" e "c++".
+
+As chaves canônicas ficam só na tabela applicant_skills, no feature store e
+nos filtros do chat, então os dois lados casam por igualdade. O cv_pt_json
+guarda os nomes como o LLM os escreveu (exibição do CV e texto do embedding),
+sem repetições por chave canônica (dedupe_skills).
+
+Habilidades de um fornecedor levam o prefixo no nome canônico ("abap" ->
+"sap abap", "fico" -> "sap fi"), para que o filtro "SAP" encontre a família
+toda por palavra inteira (skill_matches).
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List
+
+_COMBINING_MARKS = re.compile("[\u0300-\u036f]")
+_WHITESPACE = re.compile(r"\s+")
+# Pontuação solta nas pontas ("Python,", "- Java", "SQL;"); '.', '#' e '+' fazem parte de nomes
+_EDGE_PUNCTUATION = " \t\r\n,;:!?*-•·\"'()[]{}"
+
+# nome canônico -> apelidos (comparados já normalizados por skill_key)
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "react": ["reactjs", "react.js", "react js"],
+    "react native": ["react-native", "reactnative"],
+    "angular": ["angularjs", "angular.js", "angular js"],
+    "vue": ["vuejs", "vue.js", "vue js"],
+    "node.js": ["node", "nodejs", "node js"],
+    "next.js": ["nextjs", "next js"],
+    "javascript": ["js", "java script", "ecmascript"],
+    "typescript": ["ts", "type script"],
+    "python": ["python3", "python 3", "py"],
+    "java": ["java se", "java ee", "j2ee", "jee"],
+    "spring boot": ["springboot", "spring-boot"],
+    "c#": ["csharp", "c sharp"],
+    ".net": ["dotnet", "dot net", ".net framework", "asp.net", ".net core", "net core"],
+    "c++": ["cpp", "cplusplus"],
+    "go": ["golang"],
+    "sap abap": ["abap", "abap/4", "abap oo"],
+    "sap fi": ["sap fico", "sap fi/co", "fi/co", "fico"],
+    "sap mm": ["sap materials management"],
+    "sap sd": ["sap sales and distribution"],
+    "sql": ["linguagem sql", "sql ansi"],
+    "sql server": ["mssql", "ms sql", "ms sql server", "microsoft sql server"],
+    "postgresql": ["postgres", "postgre", "postgre sql"],
+    "mysql": ["my sql"],
+    "oracle": ["oracle database", "oracle db", "banco oracle"],
+    "pl/sql": ["plsql", "pl sql"],
+    "mongodb": ["mongo", "mongo db"],
+    "aws": ["amazon web services"],
+    "azure": ["microsoft azure", "ms azure"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "docker": ["docker compose", "docker-compose"],
+    "kubernetes": ["k8s"],
+    "git": ["github", "gitlab", "controle de versão git"],
+    "ci/cd": ["cicd", "ci cd", "integração contínua"],
+    "power bi": ["powerbi", "power-bi", "microsoft power bi"],
+    "excel": ["ms excel", "microsoft excel", "excel avançado"],
+    "machine learning": ["ml", "aprendizado de máquina"],
+    "scrum": ["metodologia scrum", "scrum master"],
+    "agile": ["metodologias ágeis", "metodologia ágil", "ágil"],
+    "html": ["html5"],
+    "css": ["css3"],
+}
+
+
+def skill_key(skill: str) -> str:
+    """Minúsculas, sem acentos, espaços colapsados e sem pontuação solta nas pontas"""
+    folded = _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", str(skill).lower()))
+    return _WHITESPACE.sub(" ", folded).strip(_EDGE_PUNCTUATION)
+
+
+_CANONICAL: Dict[str, str] = {}
+for _canonical, _aliases in SKILL_ALIASES.items():
+    for _alias in [_canonical, *_aliases]:
+        _CANONICAL[skill_key(_alias)] = skill_key(_canonical)
+
+
+def canonical_skill(skill) -> str:
+    """Nome canônico da habilidade ("" para valores vazios ou que não são texto)"""
+    if not isinstance(skill, str):
+        return ""
+    key = skill_key(skill)
+    return _CANONICAL.get(key, key)
+
+
+def canonicalize_skills(skills: Iterable) -> List[str]:
+    """Habilidades canônicas, sem vazios nem repetições, na ordem em que apareceram"""
+    seen = set()
+    result = []
+    for skill in skills or []:
+        canonical = canonical_skill(skill)
+        if canonical and canonical not in seen:
+            seen.add(canonical)
+            result.append(canonical)
+    return result
+
+
+def dedupe_skills(skills: Iterable) -> List[str]:
+    """Nomes originais (espaços colapsados), um por chave canônica, na ordem em que apareceram"""
+    seen = set()
+    result = []
+    for skill in skills or []:
+        canonical = canonical_skill(skill)
+        if canonical and canonical not in seen:
+            seen.add(canonical)
+            result.append(_WHITESPACE.sub(" ", skill).strip(_EDGE_PUNCTUATION))
+    return result
+
+
+def skill_matches(required: str, skill: str) -> bool:
+    """
+    True se a habilidade canônica atende ao termo canônico pedido
+
+    Igualdade ou o termo como palavra(s) inteira(s) de uma habilidade composta:
+    "spring" atende "spring boot", mas "java" não atende "javascript".
+    """
+    return required == skill or f" {required} " in f" {skill} "
+
+
+def expand_skill_terms(required: Iterable[str], vocabulary: Iterable[str]) -> List[str]:
+    """
+    Termos pedidos + skills do vocabulário que os atendem (skill_matches)
+
+    Permite buscar por igualdade (skill IN (...)) em vez de LIKE por palavra.
+    """
+    terms = [term for term in dict.fromkeys(required) if term]
+    expanded = dict.fromkeys(terms)
+    for skill in vocabulary:
+        if skill not in expanded and any(skill_matches(term, skill) for term in terms):
+            expanded[skill] = None
+    return list(expanded)
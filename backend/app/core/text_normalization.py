@@ -0,0 +1,74 @@
+"""
+Normalização de texto de CVs e de respostas dos LLMs.
+
+Padrões compilados uma vez no import. Cada tipo de ruído tem o seu re.sub, do
+jeito que o motor de regex roda mais rápido:
+
+- sequências ANSI só quando o texto tem ESC (teste "in", quase de graça; as
+  APIs HTTP não mandam ESC);
+- spinner e caracteres de controle como uma classe de um caractere, sem "+":
+  o re usa a busca por charset, bem mais rápida que uma alternância;
+- whitespace com split/join.
+
+Benchmark: benchmark_text_normalization.py.
+"""
+
+import re
+
+# Sequências ANSI com ESC (CSI e de 2 bytes)
+_ANSI = r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])"
+
+# Restos sem ESC que o CLI do Ollama deixa na saída ([?25l, ?25h, [2K, [1G).
+# Exigem dígitos para não apagar JSON como ["Go"] ou [{"curso": ...}]; cada
+# alternativa começa por um literal para o re descartar posições rapidamente.
+_ORPHAN_CODES = re.compile(r"\[\?\d+[hl]|\?\d+[hl]|\[\d+[GK]")
+
+# Spinner do Ollama (bloco Braille U+2800-U+28FF)
+_SPINNER = "⠀-⣿"
+
+# Caracteres de controle que não são whitespace (\t\n\v\f\r, \x1c-\x1f e \x85 são
+# tratados como espaço pelo split/join)
+_CONTROL = "\x00-\x08\x0e-\x1a\x7f-\x84\x86-\x9f"
+
+_TERMINAL_CODES = re.compile(_ANSI)
+# ESC solto (fora de uma sequência válida) também é removido
+_ESCAPES = re.compile(rf"{_ANSI}|\x1b")
+_SPINNER_CHARS = re.compile(f"[{_SPINNER}]")
+_NOISE_CHARS = re.compile(f"[{_SPINNER}{_CONTROL}]")
+
+_LETTER = "[A-Za-zÀ-ÿ]"
+_SPACE = r"[^\S\r\n]"
+# Letras espaçadas (ex: "C U R R Í C U L O") numa mesma linha: 3+ pares letra+espaço e
+# uma letra final. As três primeiras repetições desenroladas evitam o backtracking de {3,}.
+_LETTER_SPACING = re.compile(
+    f"{_LETTER}{_SPACE}{_LETTER}{_SPACE}{_LETTER}{_SPACE}(?:{_LETTER}{_SPACE})*{_LETTER}"
+)
+
+
+def _join_letters(match: re.Match) -> str:
+    return match.group(0).replace(" ", "")
+
+
+def strip_terminal_codes(text: str) -> str:
+    """Remove códigos ANSI e spinner, preservando quebras de linha"""
+    if "\x1b" in text:
+        text = _TERMINAL_CODES.sub("", text)
+    return _SPINNER_CHARS.sub("", text)
+
+
+def collapse_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+
+def clean_llm_output(text: str) -> str:
+    """Resposta do LLM numa linha: sem códigos de terminal, spinner, controles e espaços repetidos"""
+    if "\x1b" in text:
+        text = _ESCAPES.sub("", text)
+    text = _ORPHAN_CODES.sub("", text)
+    text = _NOISE_CHARS.sub("", text)
+    return " ".join(text.split())
+
+
+def fix_letter_spacing(text: str) -> str:
+    """Junta letras separadas por espaço (ex: "P y t h o n" -> "Python"), linha a linha"""
+    return _LETTER_SPACING.sub(_join_letters, text)
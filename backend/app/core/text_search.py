@@ -0,0 +1,44 @@
+"""
+Accent-insensitive fuzzy text search backed by pg_trgm.
+
+Expressions here mirror the GIN indexes in database_schema.sql, which are built on
+lower(immutable_unaccent(column)). Filters must use exactly that expression for
+the planner to pick the trigram index instead of a sequential scan.
+"""
+
+from sqlalchemy import Float, func, literal, or_
+
+
+def normalize_expr(expression):
+    """lower(immutable_unaccent(expr)) - same expression as the trigram indexes"""
+    return func.lower(func.immutable_unaccent(expression))
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def text_equals(column, term: str):
+    """Accent/case-insensitive equality (btree expression indexes on normalize_expr)"""
+    return normalize_expr(column) == normalize_expr(literal(term.strip()))
+
+
+def text_matches(column, term: str):
+    """
+    Accent/case-insensitive match: substring (LIKE) or fuzzy word similarity (<%).
+
+    Both operators are served by the same gin_trgm_ops index (BitmapOr). The fuzzy
+    cut-off is pg_trgm.word_similarity_threshold (default 0.6).
+    """
+    normalized_column = normalize_expr(column)
+    normalized_term = normalize_expr(literal(term.strip()))
+    pattern = normalize_expr(literal(f"%{_escape_like(term.strip())}%"))
+    return or_(
+        normalized_column.like(pattern, escape="\\"),
+        normalized_term.op("<%")(normalized_column)
+    )
+
+
+def text_similarity(column, term: str):
+    """Ranking score in [0, 1]: how well the term matches a word sequence of the column"""
+    return func.word_similarity(normalize_expr(literal(term.strip())), normalize_expr(column), type_=Float)
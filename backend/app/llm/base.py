@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 
 class LLMClient(ABC):
     @abstractmethod
@@ -19,3 +20,29 @@ class LLMClient(ABC):
             str: Resposta do LLM
         """
         pass
+
+    def extract_raw(self, prompt: str) -> str:
+        """
+        Resposta bruta do LLM para um prompt de extração estruturada
+
+        Sem parse nem prompt de correção: o chamador decide como reparar/repetir
+        (ver app.services.extraction_retry).
+        """
+        return self.extract_text(prompt)
+
+    def chat_stream(self, message: str, context: str = None) -> Iterator[str]:
+        """
+        Versão streaming de chat: gera os trechos da resposta à medida que chegam
+
+        Clientes sem suporte a streaming devolvem a resposta completa num único trecho.
+        """
+        yield self.chat(message, context)
+
+    async def achat(self, message: str, context: str = None) -> str:
+        """
+        Versão assíncrona de chat
+
+        Implementação padrão executa chat numa thread; os clientes HTTP
+        sobrescrevem com chamadas nativas (httpx / AsyncOpenAI).
+        """
+        return await asyncio.to_thread(self.chat, message, context)
@@ -1,8 +1,17 @@
 import os
-import re
 import json
-import requests
+from typing import Iterator
 from .base import LLMClient
+from .json_parser import parse_llm_json
+from app.core.text_normalization import clean_llm_output
+from .http_clients import (
+    get_sync_client,
+    get_async_client,
+    request_with_retry,
+    arequest_with_retry,
+    concurrency_slot
+)
+from .rate_limiter import rate_limited, arate_limited
 
 class DeepSeekClient(LLMClient):
     def __init__(self, api_key=None):
@@ -11,9 +20,7 @@ class DeepSeekClient(LLMClient):
         self.console_log = os.getenv("LLM_CONSOLE_LOG", "false").lower() == "true"
 
     def _clean_ansi_codes(self, text: str) -> str:
-        ansi = re.compile(r'(?:\x1B[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        cleaned = ansi.sub('', text)
-        return re.sub(r'\s+', ' ', cleaned).strip()
+        return clean_llm_output(text)
 
     def _call_api(self, prompt: str, system_prompt: str = None, model: str = None) -> str:
         payload = {
@@ -26,25 +33,31 @@ class DeepSeekClient(LLMClient):
         }
         if self.console_log:
             print(f"[DeepSeekClient] Calling API with prompt size {len(prompt)} chars")
-        resp = requests.post(
-            f"{self.base_url}/chat/completions",
-            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
-            json=payload,
-            timeout=90
-        )
-        if resp.status_code != 200:
-            raise ValueError(f"API error: {resp.status_code} - {resp.text}")
-        return resp.json()["choices"][0]["message"]["content"]
+        with rate_limited("deepseek", payload["model"], payload["messages"][0]["content"] + prompt) as call:
+            resp = request_with_retry(
+                "deepseek",
+                get_sync_client("deepseek", self.base_url, read_timeout=90),
+                "POST",
+                "/chat/completions",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                json=payload
+            )
+            if resp.status_code != 200:
+                raise ValueError(f"API error: {resp.status_code} - {resp.text}")
+            return self._content_with_usage(resp.json(), call)
+
+    def _content_with_usage(self, data: dict, call) -> str:
+        content = data["choices"][0]["message"]["content"]
+        usage = data.get("usage") or {}
+        call.done(content, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return content
 
     def extract_section(self, section_name, prompt_base):
         if not self.api_key:
             return {"error": "API key do DeepSeek não configurada."}
         try:
             content = self._call_api(prompt_base)
-            raw = re.search(r"\{.*\}", content, re.DOTALL)
-            if not raw:
-                raise ValueError("JSON não encontrado")
-            parsed = json.loads(raw.group())
+            parsed = parse_llm_json(content)
         except Exception as e:
             fix_prompt = (
                 f"{prompt_base}\n"
@@ -54,16 +67,18 @@ class DeepSeekClient(LLMClient):
             )
             try:
                 content = self._call_api(fix_prompt)
-                raw = re.search(r"\{.*\}", content, re.DOTALL)
-                if not raw:
-                    raise ValueError("JSON não encontrado após fix")
-                parsed = json.loads(raw.group())
+                parsed = parse_llm_json(content)
             except Exception as e2:
                 return {"error": f"Falha após prompt_fix: {e2}"}
         if isinstance(parsed, list):
             parsed = {section_name: parsed}
         return parsed
 
+    def extract_raw(self, prompt: str) -> str:
+        if not self.api_key:
+            raise ValueError("API key do DeepSeek não configurada.")
+        return self._call_api(prompt)
+
     def extract_text(self, prompt: str) -> str:
         if not self.api_key:
             return "Erro: API key do DeepSeek não configurada."
@@ -80,3 +95,85 @@ class DeepSeekClient(LLMClient):
             model="deepseek-chat"
         )
         return self._clean_ansi_codes(content)
+
+    def chat_stream(self, message: str, context: str = None) -> Iterator[str]:
+        if not self.api_key:
+            yield "Erro: API key do DeepSeek não configurada."
+            return
+        sys_msg = context or "Você é um assistente de recrutamento especialista em JSON, precisa entender o contextoe  retornar o JSON VÁLIDO no schema solicitado. "
+        payload = {
+            "model": "deepseek-chat",
+            "messages": [
+                {"role": "system", "content": sys_msg},
+                {"role": "user", "content": message}
+            ],
+            "temperature": 0,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        if self.console_log:
+            print(f"[DeepSeekClient] Streaming chat with prompt size {len(message)} chars")
+        client = get_sync_client("deepseek", self.base_url, read_timeout=90)
+        with rate_limited("deepseek", "deepseek-chat", sys_msg + message) as call, \
+                concurrency_slot("deepseek"), \
+                client.stream(
+                    "POST",
+                    "/chat/completions",
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    json=payload
+                ) as resp:
+            if resp.status_code != 200:
+                resp.read()
+                raise ValueError(f"API error: {resp.status_code} - {resp.text}")
+            parts = []
+            usage = {}
+            # Server-Sent Events no formato da OpenAI: "data: {...}" ... "data: [DONE]"
+            for line in resp.iter_lines():
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                # O chunk final (include_usage) traz o uso e choices vazio
+                usage = chunk.get("usage") or usage
+                delta = chunk["choices"][0].get("delta", {}) if chunk.get("choices") else {}
+                if delta.get("content"):
+                    parts.append(delta["content"])
+                    yield delta["content"]
+            call.done("".join(parts), usage.get("prompt_tokens"), usage.get("completion_tokens"))
+
+    async def _acall_api(self, prompt: str, system_prompt: str = None, model: str = None) -> str:
+        payload = {
+            "model": model or "deepseek-chat",
+            "messages": [
+                {"role": "system", "content": system_prompt or "Você é um especialista em extração de dados de CVs."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0
+        }
+        if self.console_log:
+            print(f"[DeepSeekClient] (async) Calling API with prompt size {len(prompt)} chars")
+        async with arate_limited("deepseek", payload["model"], payload["messages"][0]["content"] + prompt) as call:
+            resp = await arequest_with_retry(
+                "deepseek",
+                get_async_client("deepseek", self.base_url, read_timeout=90),
+                "POST",
+                "/chat/completions",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                json=payload
+            )
+            if resp.status_code != 200:
+                raise ValueError(f"API error: {resp.status_code} - {resp.text}")
+            return self._content_with_usage(resp.json(), call)
+
+    async def achat(self, message: str, context: str = None) -> str:
+        if not self.api_key:
+            return "Erro: API key do DeepSeek não configurada."
+        sys_msg = context or "Você é um assistente de recrutamento especialista em JSON, precisa entender o contextoe  retornar o JSON VÁLIDO no schema solicitado. "
+        content = await self._acall_api(
+            message,
+            system_prompt=sys_msg,
+            model="deepseek-chat"
+        )
+        return self._clean_ansi_codes(content)
@@ -1,22 +1,34 @@
 import os
 import openai
 import numpy as np
+from .http_clients import get_sync_client, LLM_HTTP_RETRIES
+from .rate_limiter import rate_limited
 
 class EmbeddingClient:
     def generate_embedding(self, text, label=""):
         raise NotImplinentedError
 
+    def generate_embeddings(self, texts, label=""):
+        """Embeddings de vários textos (None nas posições que falharem)"""
+        return [self.generate_embedding(text, label) for text in texts]
+
 class OpenAIEmbeddingClient(EmbeddingClient):
     def __init__(self, api_key=None, model=None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model or os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
-        self.client = openai.OpenAI(api_key=self.api_key)
+        self.client = openai.OpenAI(
+            api_key=self.api_key,
+            http_client=get_sync_client("openai"),
+            max_retries=LLM_HTTP_RETRIES
+        )
 
     def generate_embedding(self, text, label=""):
         import time
         try:
             start = time.time()
-            response = self.client.embeddings.create(input=[text], model=self.model)
+            with rate_limited("openai", self.model, text) as call:
+                response = self.client.embeddings.create(input=[text], model=self.model)
+                call.done(prompt_tokens=response.usage.prompt_tokens, completion_tokens=0)
             elapsed = time.time() - start
             print(f"[Embedding] Time to generate embedding ({label}): {elapsed:.2f}s")
             return np.array(response.data[0].embedding, dtype=np.float32)
@@ -24,6 +36,25 @@ class OpenAIEmbeddingClient(EmbeddingClient):
             print(f"[Embedding] Error generating embedding ({label}): {e}")
             return None
 
+    def generate_embeddings(self, texts, label=""):
+        """Vários textos numa única requisição à API"""
+        import time
+        texts = list(texts)
+        if not texts:
+            return []
+        try:
+            start = time.time()
+            with rate_limited("openai", self.model, "\n".join(texts)) as call:
+                response = self.client.embeddings.create(input=texts, model=self.model)
+                call.done(prompt_tokens=response.usage.prompt_tokens, completion_tokens=0)
+            elapsed = time.time() - start
+            print(f"[Embedding] Time to generate {len(texts)} embeddings ({label}): {elapsed:.2f}s")
+            by_index = {item.index: item.embedding for item in response.data}
+            return [np.array(by_index[i], dtype=np.float32) if i in by_index else None for i in range(len(texts))]
+        except Exception as e:
+            print(f"[Embedding] Error generating embeddings ({label}): {e}")
+            return [None] * len(texts)
+
 def get_embedding_client():
     backend = os.getenv("EMBEDDING_BACKEND", "openai").lower()
     if backend == "openai":
@@ -0,0 +1,183 @@
+"""
+Clientes HTTP compartilhados pelos backends de LLM.
+
+Um único httpx.Client/AsyncClient por backend mantém o pool de conexões
+(keep-alive/TLS, HTTP/2 quando o pacote h2 está instalado) entre chamadas, em vez
+de abrir uma conexão nova a cada requisição. Também concentra o retry com backoff
+exponencial + jitter para 429/5xx e o limite de chamadas simultâneas por backend.
+"""
+
+import asyncio
+import importlib.util
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.logging import log_warning
+
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 10))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", 300))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+LLM_HTTP_RETRIES = int(os.getenv("LLM_HTTP_RETRIES", 3))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 0.5))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", 20))
+# Chamadas simultâneas por backend; sobrescreva com LLM_CONCURRENCY_<BACKEND> (ex: LLM_CONCURRENCY_OPENAI=16)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 4))
+
+# HTTP/2 exige o pacote opcional h2 (pip install "httpx[http2]")
+HTTP2_ENABLED = (
+    os.getenv("LLM_HTTP2", "true").lower() == "true"
+    and importlib.util.find_spec("h2") is not None
+)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Falhas antes de o servidor começar a gerar; ReadTimeout não é repetido (a geração pode ter levado minutos)
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+
+_sync_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+_sync_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_async_semaphores: Dict[str, asyncio.Semaphore] = {}
+_lock = threading.Lock()
+
+
+def default_timeout(read: Optional[float] = None) -> httpx.Timeout:
+    return httpx.Timeout(read or LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS
+    )
+
+
+def get_sync_client(name: str, base_url: str = "", read_timeout: Optional[float] = None) -> httpx.Client:
+    """Retorna o httpx.Client do backend `name`, criando-o na primeira chamada"""
+    client = _sync_clients.get(name)
+    if client is None or client.is_closed:
+        with _lock:
+            client = _sync_clients.get(name)
+            if client is None or client.is_closed:
+                client = httpx.Client(
+                    base_url=base_url,
+                    timeout=default_timeout(read_timeout),
+                    limits=_limits(),
+                    http2=HTTP2_ENABLED
+                )
+                _sync_clients[name] = client
+    return client
+
+
+def get_async_client(name: str, base_url: str = "", read_timeout: Optional[float] = None) -> httpx.AsyncClient:
+    """Retorna o AsyncClient do backend `name`, criando-o na primeira chamada"""
+    client = _async_clients.get(name)
+    if client is None or client.is_closed:
+        with _lock:
+            client = _async_clients.get(name)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    base_url=base_url,
+                    timeout=default_timeout(read_timeout),
+                    limits=_limits(),
+                    http2=HTTP2_ENABLED
+                )
+                _async_clients[name] = client
+    return client
+
+
+def _concurrency(name: str) -> int:
+    return int(os.getenv(f"LLM_CONCURRENCY_{name.upper()}", LLM_CONCURRENCY))
+
+
+@contextmanager
+def concurrency_slot(name: str):
+    """Limita as chamadas simultâneas (threads) ao backend `name`"""
+    semaphore = _sync_semaphores.get(name)
+    if semaphore is None:
+        with _lock:
+            semaphore = _sync_semaphores.setdefault(name, threading.BoundedSemaphore(_concurrency(name)))
+    with semaphore:
+        yield
+
+
+@asynccontextmanager
+async def async_concurrency_slot(name: str):
+    """Limita as chamadas simultâneas (corrotinas) ao backend `name`"""
+    semaphore = _async_semaphores.get(name)
+    if semaphore is None:
+        with _lock:
+            semaphore = _async_semaphores.setdefault(name, asyncio.Semaphore(_concurrency(name)))
+    async with semaphore:
+        yield
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Backoff exponencial com full jitter; respeita Retry-After (segundos) quando presente"""
+    if retry_after:
+        try:
+            return min(float(retry_after), LLM_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+def request_with_retry(name: str, client: httpx.Client, method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Requisição com retry em 429/5xx e falhas de conexão
+
+    Devolve a última resposta (mesmo com status de erro) para o chamador tratar;
+    relança a exceção de conexão se todas as tentativas falharem.
+    """
+    for attempt in range(LLM_HTTP_RETRIES + 1):
+        try:
+            with concurrency_slot(name):
+                response = client.request(method, url, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt >= LLM_HTTP_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            log_warning(f"[{name}] {type(e).__name__}: {e}; nova tentativa em {delay:.1f}s")
+        else:
+            if response.status_code not in RETRYABLE_STATUS or attempt >= LLM_HTTP_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response.headers.get("retry-after"))
+            log_warning(f"[{name}] HTTP {response.status_code}; nova tentativa em {delay:.1f}s")
+        time.sleep(delay)
+
+
+async def arequest_with_retry(name: str, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Versão assíncrona de request_with_retry"""
+    for attempt in range(LLM_HTTP_RETRIES + 1):
+        try:
+            async with async_concurrency_slot(name):
+                response = await client.request(method, url, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt >= LLM_HTTP_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            log_warning(f"[{name}] {type(e).__name__}: {e}; nova tentativa em {delay:.1f}s")
+        else:
+            if response.status_code not in RETRYABLE_STATUS or attempt >= LLM_HTTP_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response.headers.get("retry-after"))
+            log_warning(f"[{name}] HTTP {response.status_code}; nova tentativa em {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+async def close_http_clients() -> None:
+    """Fecha os pools de conexão (chamado no shutdown da aplicação)"""
+    with _lock:
+        sync_clients = list(_sync_clients.values())
+        async_clients = list(_async_clients.values())
+        _sync_clients.clear()
+        _async_clients.clear()
+    for client in async_clients:
+        await client.aclose()
+    for client in sync_clients:
+        client.close()
@@ -0,0 +1,190 @@
+"""
+Extração e reparo local do JSON devolvido pelos LLMs.
+
+Substitui o padrão re.search(r"\\{.*\\}") + json.loads (que pega do primeiro '{' ao
+último '}' do texto inteiro e falha com qualquer defeito) por:
+
+1. remoção de cercas de código (```json ... ```);
+2. recorte do primeiro objeto/lista balanceado, respeitando strings;
+3. se ainda inválido, um reparo em uma passada: aspas simples -> duplas,
+   True/False/None -> true/false/null, vírgulas antes de '}'/']', quebras de
+   linha cruas dentro de strings e fechamento de JSON truncado (descarta o
+   último item incompleto e fecha os colchetes/chaves abertos).
+
+Tudo local e em microssegundos/milissegundos, antes de pagar uma nova chamada ao modelo.
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+class JSONParseError(ValueError):
+    """Resposta do LLM sem JSON recuperável"""
+
+
+def _json_start(text: str) -> int:
+    positions = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    return min(positions) if positions else -1
+
+
+def extract_balanced(text: str) -> Optional[str]:
+    """Primeiro objeto/lista completo do texto (colchetes dentro de strings são ignorados)"""
+    start = _json_start(text)
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _read_string(text: str, i: int) -> Tuple[str, int, bool]:
+    """Lê a string iniciada em text[i] (aspas simples ou duplas) e a devolve com aspas duplas"""
+    quote = text[i]
+    out = ['"']
+    i += 1
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == "\\" and i + 1 < n:
+            nxt = text[i + 1]
+            out.append("'" if quote == "'" and nxt == "'" else ch + nxt)
+            i += 2
+            continue
+        if ch == quote:
+            out.append('"')
+            return "".join(out), i + 1, True
+        if ch == '"':
+            out.append('\\"')
+        else:
+            out.append(_STRING_ESCAPES.get(ch, ch))
+        i += 1
+    return "".join(out), i, False
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    while out and (out[-1].isspace() or out[-1] == ","):
+        out.pop()
+
+
+def _close(out: List[str], stack: List[str]) -> str:
+    _strip_trailing_comma(out)
+    if out and out[-1] == ":":
+        return ""
+    return "".join(out) + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def repair_json(fragment: str) -> str:
+    """
+    Reescreve um fragmento JSON com os defeitos mais comuns de LLM corrigidos
+
+    `fragment` começa no primeiro '{' ou '['. Não garante JSON válido: o chamador
+    ainda faz json.loads do resultado.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # Último separador ',' visto: ponto seguro para descartar um item truncado
+    safe_point: Optional[Tuple[int, List[str]]] = None
+    truncated_string = False
+    i = 0
+    n = len(fragment)
+    while i < n:
+        ch = fragment[i]
+        if ch in "\"'":
+            string, i, closed = _read_string(fragment, i)
+            out.append(string)
+            if not closed:
+                truncated_string = True
+                break
+            continue
+        if ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(_CLOSERS[stack.pop()])
+            if not stack:
+                break
+        elif ch == ",":
+            safe_point = (len(out), list(stack))
+            out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < n and (fragment[j].isalnum() or fragment[j] == "_"):
+                j += 1
+            word = fragment[i:j]
+            out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if not stack:
+        return "".join(out)
+
+    # Truncado: fecha como está (se não parou no meio de uma string) ou descarta o último item
+    if not truncated_string:
+        closed = _close(list(out), stack)
+        try:
+            json.loads(closed)
+            return closed
+        except ValueError:
+            pass
+    if safe_point:
+        return _close(out[:safe_point[0]], safe_point[1])
+    return _close(out, stack)
+
+
+def parse_llm_json(text: Optional[str]) -> Any:
+    """
+    Converte a resposta do LLM em objeto Python, reparando localmente quando possível
+
+    Levanta JSONParseError se não houver JSON recuperável.
+    """
+    if not text or not text.strip():
+        raise JSONParseError("Resposta vazia")
+    fenced = _FENCE.search(text)
+    if fenced and _json_start(fenced.group(1)) >= 0:
+        text = fenced.group(1)
+
+    start = _json_start(text)
+    if start < 0:
+        raise JSONParseError("Resposta não contém JSON")
+
+    candidate = extract_balanced(text)
+    if candidate is not None:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+
+    repaired = repair_json(candidate if candidate is not None else text[start:])
+    try:
+        return json.loads(repaired)
+    except ValueError as e:
+        raise JSONParseError(f"JSON inválido mesmo após reparo: {e}") from e
@@ -1,40 +1,35 @@
 import subprocess
 import json
 import os
-import re
+import httpx
+from typing import Iterator
 from .base import LLMClient
+from .json_parser import parse_llm_json
+from app.core.text_normalization import clean_llm_output
+from .http_clients import get_sync_client, get_async_client, arequest_with_retry, concurrency_slot
+from .rate_limiter import rate_limited, arate_limited
 
 class OllamaClient(LLMClient):
     def __init__(self, model_name=None):
         self.model_name = model_name or os.getenv("OLLAMA_MODEL", "gemma3:4b-it-qat")
         self.console_log = os.getenv("LLM_CONSOLE_LOG", "false").lower() == "true"
+        # API HTTP do Ollama (usada no streaming; o CLI não entrega tokens incrementais limpos)
+        self.base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
 
     def _clean_ansi_codes(self, text: str) -> str:
-        ansi_escape = re.compile(r'''
-            \x1B
-            (?:
-                [@-Z\\-_]
-            |
-                \[
-                [0-?]*
-                [ -/]*
-                [@-~]
-            )
-        ''', re.VERBOSE)
-        cleaned = ansi_escape.sub('', text)
-        spinner_chars = ['⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏', '⠋']
-        for char in spinner_chars:
-            cleaned = cleaned.replace(char, '')
-        ollama_patterns = [
-            r'\[.*?[GK]',
-            r'\?\d+[hl]',
-            r'\x1b\[\?\d+[hl]',
-        ]
-        for pattern in ollama_patterns:
-            cleaned = re.sub(pattern, '', cleaned)
-        cleaned = re.compile(r'[\x00-\x1F\x7F-\x9F]', re.MULTILINE).sub('', cleaned)
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-        return cleaned
+        return clean_llm_output(text)
+
+    def _run_cli(self, prompt: str) -> str:
+        """Executa o prompt no CLI do Ollama (sem contagem de tokens: uso estimado)"""
+        with rate_limited("ollama", self.model_name, prompt) as call:
+            output = subprocess.check_output(
+                ["ollama", "run", self.model_name, "--think=false"],
+                input=prompt.encode("utf-8"),
+                stderr=subprocess.STDOUT,
+                timeout=300
+            ).decode("utf-8")
+            call.done(output)
+        return output
 
     def extract_section(self, section_name: str, prompt_base: str) -> dict:
         """
@@ -44,19 +39,10 @@ class OllamaClient(LLMClient):
         if self.console_log:
             print(f"[OllamaClient] Enviando prompt para seção '{section_name}' (modelo {self.model_name}), tamanho {len(prompt_base)} chars")
         try:
-            output = subprocess.check_output(
-                ["ollama", "run", self.model_name, "--think=false"],
-                input=prompt_base.encode("utf-8"),
-                stderr=subprocess.STDOUT,
-                timeout=300
-            ).decode("utf-8")
+            output = self._run_cli(prompt_base)
             if self.console_log:
                 print(f"[OllamaClient] Resposta recebida, tamanho {len(output)} chars")
-            cleaned = self._clean_ansi_codes(output)
-            if "{" not in cleaned or "}" not in cleaned:
-                raise ValueError("Resposta não contém JSON")
-            json_str = cleaned[cleaned.find("{"):cleaned.rfind("}")+1]
-            parsed = json.loads(json_str)
+            parsed = self._parse_json_output(output)
         except Exception as first_err:
             if self.console_log:
                 print(f"[OllamaClient] Erro ao parsear JSON inicial: {first_err}")
@@ -67,19 +53,10 @@ class OllamaClient(LLMClient):
                 f"Por favor, corrija e retorne apenas o JSON válido contendo a chave '{section_name}'."
             )
             try:
-                output = subprocess.check_output(
-                    ["ollama", "run", self.model_name, "--think=false"],
-                    input=fix_prompt.encode("utf-8"),
-                    stderr=subprocess.STDOUT,
-                    timeout=300
-                ).decode("utf-8")
+                output = self._run_cli(fix_prompt)
                 if self.console_log:
                     print(f"[OllamaClient] Resposta corrigida recebida, tamanho {len(output)} chars")
-                cleaned = self._clean_ansi_codes(output)
-                if "{" not in cleaned or "}" not in cleaned:
-                    raise ValueError("Resposta corrigida não contém JSON")
-                json_str = cleaned[cleaned.find("{"):cleaned.rfind("}")+1]
-                parsed = json.loads(json_str)
+                parsed = self._parse_json_output(output)
             except Exception as second_err:
                 return {"error": f"Falha após prompt de correção: {second_err}. Resposta raw: {output if 'output' in locals() else ''}"}
         if isinstance(parsed, list):
@@ -89,12 +66,7 @@ class OllamaClient(LLMClient):
     def extract_text(self, prompt: str) -> str:
         if self.console_log:
             print(f"[OllamaClient] Enviando prompt de texto cru (tamanho {len(prompt)} chars)")
-        output = subprocess.check_output(
-            ["ollama", "run", self.model_name, "--think=false"],
-            input=prompt.encode("utf-8"),
-            stderr=subprocess.STDOUT,
-            timeout=300
-        ).decode("utf-8")
+        output = self._run_cli(prompt)
         cleaned_output = self._clean_ansi_codes(output)
         if self.console_log:
             print(f"[OllamaClient] Texto recebido e limpo (tamanho {len(cleaned_output)} chars)")
@@ -108,12 +80,7 @@ class OllamaClient(LLMClient):
         if self.console_log:
             print(f"[OllamaClient] Chat para '{self.model_name}'. Mensagem: {message[:100]}...")
         try:
-            output = subprocess.check_output(
-                ["ollama", "run", self.model_name, "--think=false"],
-                input=prompt.encode("utf-8"),
-                stderr=subprocess.STDOUT,
-                timeout=300
-            ).decode("utf-8")
+            output = self._run_cli(prompt)
             cleaned_output = self._clean_ansi_codes(output)
             if self.console_log:
                 print(f"[OllamaClient] Resposta bruta: {len(output)} chars; limpa: {len(cleaned_output)} chars")
@@ -125,3 +92,68 @@ class OllamaClient(LLMClient):
             if self.console_log:
                 print(f"[OllamaClient] Erro no chat: {e}")
             return "Desculpe, ocorreu um erro ao processar sua mensagem. Tente novamente."
+
+    def chat_stream(self, message: str, context: str = None) -> Iterator[str]:
+        if context:
+            prompt = f"Contexto: {context}\n\nUsuário: {message}\n\nAssistente:"
+        else:
+            prompt = f"Usuário: {message}\n\nAssistente:"
+        if self.console_log:
+            print(f"[OllamaClient] Chat streaming para '{self.model_name}'. Mensagem: {message[:100]}...")
+        payload = {"model": self.model_name, "prompt": prompt, "stream": True, "think": False}
+        client = get_sync_client("ollama", self.base_url)
+        with rate_limited("ollama", self.model_name, prompt) as call, \
+                concurrency_slot("ollama"), \
+                client.stream("POST", "/api/generate", json=payload) as resp:
+            if resp.status_code != 200:
+                resp.read()
+                raise ValueError(f"Ollama API error: {resp.status_code} - {resp.text}")
+            parts = []
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise ValueError(f"Ollama API error: {chunk['error']}")
+                if chunk.get("response"):
+                    parts.append(chunk["response"])
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    call.done("".join(parts), chunk.get("prompt_eval_count"), chunk.get("eval_count"))
+                    break
+
+    async def _agenerate(self, prompt: str) -> str:
+        """Chamada não-streaming à API HTTP do Ollama, com o pool de conexões compartilhado"""
+        async with arate_limited("ollama", self.model_name, prompt) as call:
+            resp = await arequest_with_retry(
+                "ollama",
+                get_async_client("ollama", self.base_url),
+                "POST",
+                "/api/generate",
+                json={"model": self.model_name, "prompt": prompt, "stream": False, "think": False}
+            )
+            if resp.status_code != 200:
+                raise ValueError(f"Ollama API error: {resp.status_code} - {resp.text}")
+            data = resp.json()
+            call.done(data.get("response", ""), data.get("prompt_eval_count"), data.get("eval_count"))
+        return data.get("response", "")
+
+    def _parse_json_output(self, output: str):
+        return parse_llm_json(self._clean_ansi_codes(output))
+
+    async def achat(self, message: str, context: str = None) -> str:
+        if context:
+            prompt = f"Contexto: {context}\n\nUsuário: {message}\n\nAssistente:"
+        else:
+            prompt = f"Usuário: {message}\n\nAssistente:"
+        if self.console_log:
+            print(f"[OllamaClient] (async) Chat para '{self.model_name}'. Mensagem: {message[:100]}...")
+        try:
+            output = await self._agenerate(prompt)
+            return self._clean_ansi_codes(output)
+        except httpx.TimeoutException:
+            return "Desculpe, o tempo limite foi excedido. Tente uma pergunta mais simples."
+        except Exception as e:
+            if self.console_log:
+                print(f"[OllamaClient] Erro no chat: {e}")
+            return "Desculpe, ocorreu um erro ao processar sua mensagem. Tente novamente."
@@ -1,34 +1,63 @@
 import os
-import re
-import json
-from openai import OpenAI
+from typing import Iterator, Optional, Tuple
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from .base import LLMClient
+from .json_parser import parse_llm_json
+from app.core.text_normalization import collapse_whitespace
+from .http_clients import (
+    get_sync_client,
+    get_async_client,
+    concurrency_slot,
+    async_concurrency_slot,
+    LLM_HTTP_RETRIES
+)
+from .rate_limiter import rate_limited, arate_limited
 
 class OpenAIClient(LLMClient):
     def __init__(self, api_key=None, model=None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o")
         self.console_log = os.getenv("LLM_CONSOLE_LOG", "false").lower() == "true"
+        # Clientes do SDK criados uma vez por instância, com o pool httpx sobre o qual foram criados
+        self._sync_sdk: Optional[Tuple[httpx.Client, OpenAI]] = None
+        self._async_sdk: Optional[Tuple[httpx.AsyncClient, AsyncOpenAI]] = None
 
     def _clean_ansi_codes(self, text: str) -> str:
+        return collapse_whitespace(text)
 
-        return re.sub(r'\s+', ' ', text).strip()
+    def _client(self) -> OpenAI:
+        # Pool de conexões compartilhado; o SDK já faz retry com backoff+jitter em 429/5xx.
+        # Recriado só se o pool foi fechado (close_http_clients) e reaberto
+        http_client = get_sync_client("openai")
+        if self._sync_sdk is None or self._sync_sdk[0] is not http_client:
+            self._sync_sdk = (http_client, OpenAI(api_key=self.api_key, http_client=http_client, max_retries=LLM_HTTP_RETRIES))
+        return self._sync_sdk[1]
+
+    def _async_client(self) -> AsyncOpenAI:
+        http_client = get_async_client("openai")
+        if self._async_sdk is None or self._async_sdk[0] is not http_client:
+            self._async_sdk = (http_client, AsyncOpenAI(api_key=self.api_key, http_client=http_client, max_retries=LLM_HTTP_RETRIES))
+        return self._async_sdk[1]
 
     def _call_api(self, prompt: str, max_tokens: int = 1200) -> str:
-        client = OpenAI(api_key=self.api_key)
+        client = self._client()
         if self.console_log:
             print(f"[OpenAIClient] Calling API with model '{self.model}' prompt size {len(prompt)} chars")
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "Você é um especialista em extração de dados de CVs."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=max_tokens,
-            response_format={"type": "text"} 
-        )
-        content = response.choices[0].message.content
+        with rate_limited("openai", self.model, prompt, max_tokens) as call, concurrency_slot("openai"):
+            response = client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "Você é um especialista em extração de dados de CVs."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0,
+                max_tokens=max_tokens,
+                response_format={"type": "text"} 
+            )
+            content = response.choices[0].message.content
+            usage = response.usage
+            call.done(content, usage and usage.prompt_tokens, usage and usage.completion_tokens)
         return self._clean_ansi_codes(content)
 
     def extract_section(self, section_name, prompt_base):
@@ -40,10 +69,7 @@ class OpenAIClient(LLMClient):
         # Primeira tentativa
         try:
             content = self._call_api(prompt_base, max_tokens=1500)
-            raw = re.search(r"\{.*\}", content, re.DOTALL)
-            if not raw:
-                raise ValueError("JSON não encontrado")
-            parsed = json.loads(raw.group())
+            parsed = parse_llm_json(content)
         except Exception as e:
             # fallback
             fix_prompt = (
@@ -54,16 +80,18 @@ class OpenAIClient(LLMClient):
             )
             try:
                 content = self._call_api(fix_prompt, max_tokens=1500)
-                raw = re.search(r"\{.*\}", content, re.DOTALL)
-                if not raw:
-                    raise ValueError("JSON não encontrado após fix")
-                parsed = json.loads(raw.group())
+                parsed = parse_llm_json(content)
             except Exception as e2:
                 return {"error": f"Falha após prompt_fix: {e2}"}
         if isinstance(parsed, list):
             parsed = {section_name: parsed}
         return parsed
 
+    def extract_raw(self, prompt: str) -> str:
+        if not self.api_key:
+            raise ValueError("API key do OpenAI não configurada.")
+        return self._call_api(prompt, max_tokens=1500)
+
     def extract_text(self, prompt: str) -> str:
         if not self.api_key:
             return "Erro: API key do OpenAI não configurada."
@@ -77,3 +105,63 @@ class OpenAIClient(LLMClient):
         prompt = f"{sys_msg}\nUsuário: {message}"
         content = self._call_api(prompt, max_tokens=1000)
         return self._clean_ansi_codes(content)
+
+    def chat_stream(self, message: str, context: str = None) -> Iterator[str]:
+        if not self.api_key:
+            yield "Erro: API key do OpenAI não configurada."
+            return
+        sys_msg = context and f"Você é um assistente de recrutamento. Contexto: {context}" or "Você é um assistente de recrutamento."
+        prompt = f"{sys_msg}\nUsuário: {message}"
+        client = self._client()
+        if self.console_log:
+            print(f"[OpenAIClient] Streaming chat with model '{self.model}' prompt size {len(prompt)} chars")
+        with rate_limited("openai", self.model, prompt, 1000) as call, concurrency_slot("openai"):
+            stream = client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "Você é um especialista em extração de dados de CVs."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0,
+                max_tokens=1000,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            parts = []
+            usage = None
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+                if chunk.usage:
+                    # Último chunk (sem choices) traz o uso da chamada
+                    usage = chunk.usage
+            call.done("".join(parts), usage and usage.prompt_tokens, usage and usage.completion_tokens)
+
+    async def _acall_api(self, prompt: str, max_tokens: int = 1200) -> str:
+        client = self._async_client()
+        if self.console_log:
+            print(f"[OpenAIClient] (async) Calling API with model '{self.model}' prompt size {len(prompt)} chars")
+        async with arate_limited("openai", self.model, prompt, max_tokens) as call, async_concurrency_slot("openai"):
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "Você é um especialista em extração de dados de CVs."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0,
+                max_tokens=max_tokens,
+                response_format={"type": "text"}
+            )
+            content = response.choices[0].message.content
+            usage = response.usage
+            call.done(content, usage and usage.prompt_tokens, usage and usage.completion_tokens)
+        return self._clean_ansi_codes(content)
+
+    async def achat(self, message: str, context: str = None) -> str:
+        if not self.api_key:
+            return "Erro: API key do OpenAI não configurada."
+        sys_msg = context and f"Você é um assistente de recrutamento. Contexto: {context}" or "Você é um assistente de recrutamento."
+        prompt = f"{sys_msg}\nUsuário: {message}"
+        content = await self._acall_api(prompt, max_tokens=1000)
+        return self._clean_ansi_codes(content)
@@ -0,0 +1,241 @@
+"""
+Limite de requisições/tokens por minuto (RPM/TPM) e contabilização de tokens.
+
+Cada par backend/modelo tem dois token buckets: um de requisições e outro de tokens.
+Antes da chamada reserva-se 1 requisição e a estimativa de tokens (prompt +
+max_tokens); ao final a reserva é ajustada pelo uso real informado pelo provedor.
+Quando falta saldo, a chamada espera o tempo necessário para o bucket reabastecer,
+em vez de disparar e receber 429.
+
+Limites (0 = sem limite), com override por backend:
+    LLM_RPM / LLM_TPM, LLM_RPM_<BACKEND> / LLM_TPM_<BACKEND> (ex: LLM_TPM_OPENAI=30000)
+
+O uso é agregado por call site (ex: 'extraction:formacoes', 'vaga_text', 'chat'),
+definido pelo chamador com `with llm_call_site(...)`.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# Aproximação de tokens quando o provedor não informa o uso (~4 caracteres por token)
+CHARS_PER_TOKEN = 4
+
+_call_site: ContextVar[str] = ContextVar("llm_call_site", default="unknown")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return (len(text) // CHARS_PER_TOKEN + 1) if text else 0
+
+
+@contextmanager
+def llm_call_site(name: str):
+    """Marca as chamadas de LLM feitas dentro do bloco com o call site `name`"""
+    token = _call_site.set(name)
+    try:
+        yield
+    finally:
+        _call_site.reset(token)
+
+
+def iterate_with_call_site(name: str, iterator: Iterable) -> Iterator:
+    """
+    Consome um iterador (ex: tokens de chat_stream) com o call site `name`
+
+    O ContextVar é definido e restaurado a cada passo, pois um gerador pode ser
+    retomado em outro contexto (ex: StreamingResponse consome num threadpool).
+    """
+    iterator = iter(iterator)
+    while True:
+        with llm_call_site(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+class _Bucket:
+    """Token bucket com capacidade de 1 minuto de orçamento"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # Uma chamada maior que a capacidade espera o bucket encher, não para sempre
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+
+class RateLimiter:
+    """Limitador RPM/TPM de um backend/modelo; thread-safe e utilizável com asyncio"""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self._requests = _Bucket(rpm) if rpm > 0 else None
+        self._tokens = _Bucket(tpm) if tpm > 0 else None
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserva a chamada se houver saldo (retorna 0) ou o tempo de espera"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self._requests.wait_time(1, now) if self._requests else 0.0,
+                self._tokens.wait_time(tokens, now) if self._tokens else 0.0
+            )
+            if wait == 0.0:
+                if self._requests:
+                    self._requests.level -= 1
+                if self._tokens:
+                    self._tokens.level -= tokens
+            return wait
+
+    def acquire(self, tokens: int) -> None:
+        while True:
+            wait = self._reserve(tokens)
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        while True:
+            wait = self._reserve(tokens)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+    def adjust(self, delta_tokens: int) -> None:
+        """Corrige a reserva pelo uso real (delta positivo consome, negativo devolve)"""
+        if not self._tokens or not delta_tokens:
+            return
+        with self._lock:
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level - delta_tokens)
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_usage: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def _env_limit(kind: str, backend: str) -> int:
+    return int(os.getenv(f"LLM_{kind}_{backend.upper()}", os.getenv(f"LLM_{kind}", 0)))
+
+
+def get_rate_limiter(backend: str, model: str) -> RateLimiter:
+    key = (backend, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.setdefault(
+                key, RateLimiter(_env_limit("RPM", backend), _env_limit("TPM", backend))
+            )
+    return limiter
+
+
+def record_usage(
+    backend: str,
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    estimated: bool = False,
+    call_site: Optional[str] = None
+) -> None:
+    """Acumula o uso de tokens no call site informado (ou no corrente)"""
+    key = (call_site or _call_site.get(), backend, model)
+    with _lock:
+        stats = _usage.setdefault(key, {
+            "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_calls": 0
+        })
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        if estimated:
+            stats["estimated_calls"] += 1
+
+
+def usage_snapshot() -> list:
+    """Uso acumulado por call site/backend/modelo desde o início do processo"""
+    with _lock:
+        return [
+            {"call_site": call_site, "backend": backend, "model": model, **stats}
+            for (call_site, backend, model), stats in sorted(_usage.items())
+        ]
+
+
+def reset_usage() -> None:
+    with _lock:
+        _usage.clear()
+
+
+class LLMCall:
+    """Reserva de uma chamada; o cliente informa o resultado com done()"""
+
+    def __init__(self, backend: str, model: str, prompt: str, max_tokens: int = 0):
+        self.backend = backend
+        self.model = model
+        self.call_site = _call_site.get()
+        self.prompt_estimate = estimate_tokens(prompt)
+        self.reserved = self.prompt_estimate + max_tokens
+        self.limiter = get_rate_limiter(backend, model)
+        self._completion_text = ""
+        self._prompt_tokens: Optional[int] = None
+        self._completion_tokens: Optional[int] = None
+
+    def done(self, completion_text: Any = "", prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None) -> None:
+        self._completion_text = completion_text if isinstance(completion_text, str) else ""
+        self._prompt_tokens = prompt_tokens
+        self._completion_tokens = completion_tokens
+
+    def _abort(self) -> None:
+        # Chamada falhou: devolve a reserva de tokens (a requisição conta para o RPM)
+        self.limiter.adjust(-self.reserved)
+
+    def _finish(self) -> None:
+        estimated = self._prompt_tokens is None or self._completion_tokens is None
+        prompt_tokens = self._prompt_tokens if self._prompt_tokens is not None else self.prompt_estimate
+        completion_tokens = (
+            self._completion_tokens if self._completion_tokens is not None
+            else estimate_tokens(self._completion_text)
+        )
+        self.limiter.adjust(prompt_tokens + completion_tokens - self.reserved)
+        record_usage(self.backend, self.model, prompt_tokens, completion_tokens, estimated, self.call_site)
+
+
+@contextmanager
+def rate_limited(backend: str, model: str, prompt: str, max_tokens: int = 0):
+    """Aguarda saldo RPM/TPM, executa o bloco e contabiliza os tokens usados"""
+    call = LLMCall(backend, model, prompt, max_tokens)
+    call.limiter.acquire(call.reserved)
+    try:
+        yield call
+    except BaseException:
+        call._abort()
+        raise
+    call._finish()
+
+
+@asynccontextmanager
+async def arate_limited(backend: str, model: str, prompt: str, max_tokens: int = 0):
+    """Versão assíncrona de rate_limited"""
+    call = LLMCall(backend, model, prompt, max_tokens)
+    await call.limiter.aacquire(call.reserved)
+    try:
+        yield call
+    except BaseException:
+        call._abort()
+        raise
+    call._finish()
@@ -1,17 +1,34 @@
 import os
+import threading
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import applicant_router, vaga_router, workbook_router, processed_applicant_router, chat_router, prospects_match_router, semantic_performance
+from app.routers import applicant_router, vaga_router, workbook_router, processed_applicant_router, chat_router, prospects_match_router, jobs_router, semantic_performance
 from app.llm.factory import get_llm_client
+from app.llm.http_clients import close_http_clients
+from app.services.job_queue import JOB_WORKERS_IN_API, start_worker_threads
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Jobs rodam em backend/worker.py; JOB_WORKERS_IN_API > 0 também processa na API (dev)
+    stop_workers = threading.Event()
+    start_worker_threads(JOB_WORKERS_IN_API, stop_workers)
+    yield
+    stop_workers.set()
+    # Close pooled LLM HTTP connections on shutdown
+    await close_http_clients()
+
+
 app = FastAPI(
     title="DataThon Decision API",
     description="Candidate and Job Matching System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS middleware for frontend integration
@@ -39,6 +56,7 @@ app.include_router(workbook_router)
 app.include_router(processed_applicant_router)
 app.include_router(chat_router)
 app.include_router(prospects_match_router)
+app.include_router(jobs_router)
 app.include_router(semantic_performance.router)
 
 
@@ -2,3 +2,7 @@ from .processed_applicant import ProcessedApplicant
 from .vaga import Vaga
 from .workbook import Workbook
 from .match_prospect import MatchProspect
+from .extraction_dead_letter import ExtractionDeadLetter
+from .chat_session_record import ChatSessionRecord
+from .applicant_skill import ApplicantSkill
+from .processing_job import ProcessingJob
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, Text
+from app.core.database import Base
+
+
+class ApplicantSkill(Base):
+    """
+    Inverted index of canonical skills (skill -> applicant ids).
+    
+    One row per (canonical skill, applicant), kept in sync with
+    processed_applicants.cv_pt_json['habilidades'] at ingestion time, so skill
+    filters are index lookups instead of regex scans over the CV JSON.
+    """
+    __tablename__ = "applicant_skills"
+    
+    skill = Column(Text, primary_key=True)  # Canonical skill (app.core.skill_taxonomy)
+    applicant_id = Column(BigInteger, primary_key=True, index=True)  # processed_applicants.id
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Text, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.database import Base
+
+
+class ChatSessionRecord(Base):
+    """
+    Model representing a persisted chat session, shared by all API workers.
+    
+    Used by SqlSessionStore (CHAT_SESSION_STORE=sql): the whole ChatSession is stored
+    as JSON and expires after CHAT_SESSION_TTL seconds without activity.
+    """
+    __tablename__ = "chat_sessions"
+    
+    # Primary key
+    id = Column(Text, primary_key=True)  # ChatSession.id
+    
+    # Session payload
+    data = Column(JSONB, nullable=False)  # ChatSession.to_dict()
+    
+    # Lifecycle
+    updated_at = Column(DateTime, nullable=False)  # Last activity
+    expires_at = Column(DateTime, nullable=False)  # updated_at + TTL
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, BigInteger, Integer, Text, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ExtractionDeadLetter(Base):
+    """
+    Model representing a CV extraction that failed after exhausting its retry policy.
+    
+    Each row records one chunk of one CV section that could not be extracted, with the
+    failure classification and the last raw LLM response, so it can be inspected and
+    reprocessed later instead of retrying indefinitely.
+    """
+    __tablename__ = "extraction_dead_letters"
+    
+    # Primary key
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    
+    # Failed extraction identification
+    applicant_id = Column(BigInteger, nullable=False)  # Applicant whose CV failed
+    section = Column(Text, nullable=False)  # CV section (formacoes, experiencias, ...)
+    chunk_index = Column(Integer, nullable=False)  # 1-based chunk of the CV text
+    
+    # Failure details
+    error_kind = Column(Text, nullable=False)  # timeout, malformed_json, schema_violation, empty_result, api_error
+    error_message = Column(Text, nullable=True)  # Last error message
+    raw_response = Column(Text, nullable=True)  # Last raw LLM response (truncated)
+    attempts = Column(Integer, nullable=False)  # LLM calls spent on the chunk
+    
+    # Lifecycle
+    created_at = Column(DateTime, server_default=func.now())  # Failure timestamp
+    resolved_at = Column(DateTime, nullable=True)  # Set when the applicant is reprocessed successfully
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, LargeBinary
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, load_only, Load
 from app.core.database import Base
 
 
@@ -9,6 +10,9 @@ class ProcessedApplicant(Base):
     
     This table stores comprehensive applicant information including personal data,
     CV processing results, and semantic embeddings for candidate matching.
+    
+    Heavy columns are deferred in groups ("cv", "semantic", "embedding") so plain
+    queries never transfer them; use the load profiles below to undefer per endpoint.
     """
     __tablename__ = "processed_applicants"
     
@@ -37,11 +41,33 @@ class ProcessedApplicant(Base):
     
     # CV and document processing fields
     download_cv = Column(String)  # CV download link or path
-    cv_pt_json = Column(JSONB)  # CV data in JSON format
-    cv_texto_semantico = Column(Text)  # Semantic text representation of CV
-    cv_embedding = Column(LargeBinary)  # Binary embedding data
+    cv_pt_json = deferred(Column(JSONB), group="cv")  # CV data in JSON format
+    cv_texto_semantico = deferred(Column(Text), group="semantic")  # Semantic text representation of CV
+    cv_embedding = deferred(Column(LargeBinary), group="embedding")  # Binary embedding data
     nivel_maximo_formacao = Column(String)  # Maximum education level
-    cv_embedding_vector = Column(Text)  # Vector embedding as text placeholder
+    cv_embedding_vector = deferred(Column(Text), group="embedding")  # Vector embedding as text placeholder
     
     # Metadata fields
     updated_at = Column(DateTime)  # Last update timestamp
+
+
+# Load profiles: query(ProcessedApplicant).options(*PROFILE)
+# Listing/search views: only the fields of ProcessedApplicantSummary
+SUMMARY_LOAD = (
+    load_only(
+        ProcessedApplicant.id,
+        ProcessedApplicant.nome,
+        ProcessedApplicant.email,
+        ProcessedApplicant.nivel_maximo_formacao,
+        ProcessedApplicant.updated_at,
+    ),
+)
+
+# Personal data + structured CV (prospects, get_applicants_by_ids)
+WITH_CV_LOAD = (Load(ProcessedApplicant).undefer_group("cv"),)
+
+# Detail view (ProcessedApplicantResponse): CV + semantic text, never embeddings
+DETAIL_LOAD = (
+    Load(ProcessedApplicant).undefer_group("cv"),
+    Load(ProcessedApplicant).undefer_group("semantic"),
+)
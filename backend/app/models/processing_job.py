@@ -0,0 +1,40 @@
+from sqlalchemy import Column, BigInteger, Integer, Text, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ProcessingJob(Base):
+    """
+    Model representing a durable background job (CV extraction, vaga processing, ...).
+    
+    Jobs are enqueued by the API and claimed by worker processes with
+    SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers on any machine
+    can share the queue. A partial unique index on (kind, entity_id) for
+    pending/running jobs keeps one active job per entity.
+    """
+    __tablename__ = "processing_jobs"
+    
+    # Primary key
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    
+    # Job definition
+    kind = Column(Text, nullable=False)  # applicant, vaga, vaga_batch
+    entity_id = Column(Text, nullable=True)  # Applicant/vaga id used for deduplication
+    payload = Column(JSONB, nullable=False)  # Handler arguments
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    
+    # Execution state
+    status = Column(Text, nullable=False, default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)  # Executions started
+    max_attempts = Column(Integer, nullable=False, default=3)  # Executions before giving up
+    run_after = Column(DateTime, nullable=False, server_default=func.now())  # Retry backoff
+    locked_by = Column(Text, nullable=True)  # Worker that claimed the job
+    locked_at = Column(DateTime, nullable=True)  # Claim time (stale claims are requeued)
+    last_error = Column(Text, nullable=True)  # Error of the last failed execution
+    result = Column(JSONB, nullable=True)  # Handler return value, if any
+    
+    # Lifecycle
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
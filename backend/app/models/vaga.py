@@ -81,6 +81,7 @@ class Vaga(Base):
     vaga_texto_semantico = Column(Text)  # Semantic text representation
     vaga_embedding = Column(BYTEA)  # Binary embedding data
     vaga_embedding_vector = Column(Text)  # Vector embedding as text placeholder
+    vaga_fingerprint = Column(Text)  # sha256 of the normalized prompt inputs + models behind the text/embedding
     
     # Metadata fields
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Last update timestamp
@@ -1,9 +1,14 @@
 from app.models.processed_applicant import ProcessedApplicant
+from app.repositories.applicant_skill_repository import ApplicantSkillRepository, skills_from_cv
 from app.core.database import SessionLocal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import json
+import os
 from app.core.logging import log_info, log_warning, log_error, log_debug, llm_log
 from datetime import datetime
 
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", 500))
+
 class ApplicantRepository:
     def __init__(self, db_session=None):
         log_info("[Repository] Initializing ApplicantRepository")
@@ -41,10 +46,91 @@ class ApplicantRepository:
                 updated_at=now,
             )
             self.db.add(db_obj)
+        # Índice de skills na mesma transação (flush antes por causa da FK)
+        self.db.flush()
+        ApplicantSkillRepository(self.db).replace_skills({applicant_id: skills_from_cv(final_json)})
         self.db.commit()
         log_info(f"[Repository] Upsert committed for applicant {applicant_id}")
         return db_obj
 
+    @staticmethod
+    def build_row(applicant_dict, final_json, max_education_level, cv_texto_semantico=None, cv_embedding=None, cv_embedding_vector=None):
+        """
+        Monta a linha de processed_applicants usada por upsert_applicants.
+        Campos semânticos None ficam fora da linha para não sobrescrever valores já gravados.
+        """
+        columns = ProcessedApplicant.__table__.columns.keys()
+        row = {k: v for k, v in applicant_dict.items() if k in columns}
+        row["cv_pt_json"] = final_json
+        row["nivel_maximo_formacao"] = max_education_level
+        row["updated_at"] = datetime.utcnow()
+        if cv_texto_semantico is not None:
+            row["cv_texto_semantico"] = cv_texto_semantico
+        if cv_embedding is not None:
+            row["cv_embedding"] = cv_embedding
+        if cv_embedding_vector is not None:
+            row["cv_embedding_vector"] = cv_embedding_vector
+        return row
+
+    def upsert_applicants(self, rows, batch_size=UPSERT_BATCH_SIZE):
+        """
+        Upsert em lote via INSERT ... ON CONFLICT (id) DO UPDATE.
+
+        Args:
+            rows: dicts com colunas de processed_applicants (ex: build_row); 'id' obrigatório.
+                  Colunas ausentes numa linha não são alteradas no conflito.
+            batch_size: linhas por statement/commit
+
+        Returns:
+            Total de linhas enviadas ao banco
+        """
+        table = ProcessedApplicant.__table__
+        columns = table.columns.keys()
+
+        # Deduplica por id (a última ocorrência vence): ON CONFLICT não aceita
+        # afetar a mesma linha duas vezes no mesmo statement
+        prepared = {}
+        for row in rows:
+            row = {k: v for k, v in row.items() if k in columns}
+            if row.get("id") is None:
+                log_warning("[Repository] Skipping row without id in bulk upsert")
+                continue
+            vector = row.get("cv_embedding_vector")
+            if vector is not None and not isinstance(vector, str):
+                row["cv_embedding_vector"] = json.dumps(vector, ensure_ascii=False)
+            prepared[row["id"]] = row
+        prepared = list(prepared.values())
+
+        log_info(f"[Repository] Bulk upserting {len(prepared)} applicants (batch size {batch_size})")
+        total = 0
+        try:
+            for start in range(0, len(prepared), batch_size):
+                batch = prepared[start:start + batch_size]
+                # Um INSERT multi-VALUES exige o mesmo conjunto de colunas em todas as linhas
+                groups = {}
+                for row in batch:
+                    groups.setdefault(tuple(sorted(row)), []).append(row)
+                for keys, group in groups.items():
+                    stmt = pg_insert(table).values(group)
+                    update_cols = {k: stmt.excluded[k] for k in keys if k != "id"}
+                    if update_cols:
+                        stmt = stmt.on_conflict_do_update(index_elements=[table.c.id], set_=update_cols)
+                    else:
+                        stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.id])
+                    self.db.execute(stmt)
+                # Linhas sem cv_pt_json não alteram as skills já indexadas
+                ApplicantSkillRepository(self.db).replace_skills({
+                    row["id"]: skills_from_cv(row["cv_pt_json"]) for row in batch if "cv_pt_json" in row
+                })
+                self.db.commit()
+                total += len(batch)
+                log_info(f"[Repository] Bulk upsert committed {total}/{len(prepared)} applicants")
+        except Exception as e:
+            self.db.rollback()
+            log_error(f"[Repository] Error in bulk upsert after {total} applicants: {e}")
+            raise
+        return total
+
     def get_applicant(self, applicant_id):
         log_info(f"[Repository] Getting applicant {applicant_id}")
         return self.db.query(ProcessedApplicant).filter_by(id=applicant_id).first()
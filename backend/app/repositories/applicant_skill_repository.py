@@ -0,0 +1,96 @@
+import os
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.applicant_skill import ApplicantSkill
+from app.models.processed_applicant import ProcessedApplicant
+from app.core.skill_taxonomy import canonicalize_skills, expand_skill_terms
+from app.core.logging import log_info
+
+SKILL_INDEX_BATCH_SIZE = int(os.getenv("SKILL_INDEX_BATCH_SIZE", 1000))
+
+
+def skills_from_cv(cv_json) -> List[str]:
+    """Habilidades canônicas de um cv_pt_json (dict ou None)"""
+    if not isinstance(cv_json, dict):
+        return []
+    return canonicalize_skills(cv_json.get("habilidades") or [])
+
+
+class ApplicantSkillRepository:
+    """Repository do índice invertido skill -> candidatos (tabela applicant_skills)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def replace_skills(self, skills_by_applicant: Dict[int, Iterable[str]], commit: bool = False) -> None:
+        """
+        Regrava as skills dos candidatos informados (já canônicas)
+
+        Fica na transação do chamador (upsert do candidato) a menos que commit=True.
+        """
+        if not skills_by_applicant:
+            return
+        applicant_ids = list(skills_by_applicant)
+        self.db.query(ApplicantSkill).filter(
+            ApplicantSkill.applicant_id.in_(applicant_ids)
+        ).delete(synchronize_session=False)
+
+        rows = [
+            {"skill": skill, "applicant_id": applicant_id}
+            for applicant_id, skills in skills_by_applicant.items()
+            for skill in dict.fromkeys(skills)
+        ]
+        for start in range(0, len(rows), SKILL_INDEX_BATCH_SIZE):
+            stmt = pg_insert(ApplicantSkill.__table__).values(rows[start:start + SKILL_INDEX_BATCH_SIZE])
+            self.db.execute(stmt.on_conflict_do_nothing())
+        if commit:
+            self.db.commit()
+
+    def skill_vocabulary(self) -> List[str]:
+        """Skills distintas do índice (quando o feature store não está disponível)"""
+        return [row.skill for row in self.db.query(ApplicantSkill.skill).distinct()]
+
+    def applicant_ids_with_any(
+        self,
+        skills: List[str],
+        applicant_ids: Optional[List[int]] = None,
+        vocabulary: Optional[Iterable[str]] = None
+    ) -> Set[int]:
+        """
+        Candidatos com PELO MENOS UMA das skills canônicas
+
+        Casa por igualdade ou pela skill como palavra inteira de uma skill composta
+        ("spring" -> "spring boot"). O casamento por palavra é feito em Python sobre
+        o vocabulário (o do feature store ou skill_vocabulary()), e o banco só recebe
+        skill IN (...), resolvido pela chave primária. Com applicant_ids, a busca
+        fica restrita a esses candidatos.
+        """
+        if not skills:
+            return set()
+        if applicant_ids is not None and not applicant_ids:
+            return set()
+        if vocabulary is None:
+            vocabulary = self.skill_vocabulary()
+        terms = expand_skill_terms(skills, vocabulary)
+        query = self.db.query(ApplicantSkill.applicant_id).filter(ApplicantSkill.skill.in_(terms))
+        if applicant_ids is not None:
+            query = query.filter(ApplicantSkill.applicant_id.in_(applicant_ids))
+        return {row.applicant_id for row in query.distinct()}
+
+    def rebuild(self, batch_size: int = SKILL_INDEX_BATCH_SIZE) -> int:
+        """Reconstrói o índice a partir do cv_pt_json de todos os candidatos (carga inicial)"""
+        total = 0
+        last_id = None
+        while True:
+            query = self.db.query(ProcessedApplicant.id, ProcessedApplicant.cv_pt_json).order_by(ProcessedApplicant.id)
+            if last_id is not None:
+                query = query.filter(ProcessedApplicant.id > last_id)
+            batch = query.limit(batch_size).all()
+            if not batch:
+                break
+            self.replace_skills({row.id: skills_from_cv(row.cv_pt_json) for row in batch}, commit=True)
+            total += len(batch)
+            last_id = batch[-1].id
+            log_info(f"[SkillIndex] {total} candidatos indexados")
+        return total
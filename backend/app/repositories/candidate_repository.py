@@ -100,34 +100,20 @@ class CandidateRepository:
             mode: 'incrinental' ou 'reset'
         """
         try:
-            from app.models.match_prospect import MatchProspect
-            
-            if mode == 'reset':
-                # Remove all existing match_prospects
-                self.db.query(MatchProspect).filter(
-                    MatchProspect.workbook_id == workbook_id
-                ).delete()
-                log_info(f"Rinovidos match_prospects existentes (modo reset)")
-            else:
-                # Modo incrinental: rinove os existentes também (simplificado)
-                self.db.query(MatchProspect).filter(
-                    MatchProspect.workbook_id == workbook_id
-                ).delete()
-                log_info(f"Rinovidos match_prospects existentes (modo incrinental)")
-            
-            # Adiciona novos match_prospects
-            for candidate in candidates:
-                match_prospect = MatchProspect(
-                    workbook_id=workbook_id,
-                    applicant_id=candidate['id'],
-                    score_semantico=candidate.get('score_semantico', 0.5),
-                    origem=candidate.get('origin', 'sql_query'),
-                    selecionado=False
-                )
-                self.db.add(match_prospect)
-            
-            self.db.commit()
-            log_info(f"Saved {len(candidates)} match_prospects")
+            from app.repositories.match_prospect_repository import MatchProspectRepository
+            
+            # Ambos os modos substituem o conjunto do workbook; o diff preserva
+            # selecionado e data_entrada dos candidatos que permanecem
+            rows = [
+                {
+                    'applicant_id': candidate['id'],
+                    'score_semantico': candidate.get('score_semantico', 0.5),
+                    'origem': candidate.get('origin', 'sql_query')
+                }
+                for candidate in candidates
+            ]
+            summary = MatchProspectRepository(self.db).sync_workbook_prospects(workbook_id, rows)
+            log_info(f"Saved {len(candidates)} match_prospects (modo {mode}): {summary}")
             
         except Exception as e:
             log_error(f"Erro ao salvar match_prospects: {str(e)}")
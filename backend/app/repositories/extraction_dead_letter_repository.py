@@ -0,0 +1,55 @@
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.extraction_dead_letter import ExtractionDeadLetter
+from app.core.logging import log_info
+
+# Resposta bruta guardada no dead letter (suficiente para diagnosticar o erro)
+RAW_RESPONSE_MAX_CHARS = 4000
+
+
+class ExtractionDeadLetterRepository:
+    """Repository das extrações de CV que esgotaram a política de retry"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(
+        self,
+        applicant_id: int,
+        section: str,
+        chunk_index: int,
+        error_kind: str,
+        error_message: Optional[str],
+        raw_response: Optional[str],
+        attempts: int
+    ) -> ExtractionDeadLetter:
+        entry = ExtractionDeadLetter(
+            applicant_id=applicant_id,
+            section=section,
+            chunk_index=chunk_index,
+            error_kind=error_kind,
+            error_message=error_message,
+            raw_response=raw_response[:RAW_RESPONSE_MAX_CHARS] if raw_response else None,
+            attempts=attempts
+        )
+        self.db.add(entry)
+        self.db.commit()
+        return entry
+
+    def list_pending(self, limit: int = 100, applicant_id: Optional[int] = None) -> List[ExtractionDeadLetter]:
+        query = self.db.query(ExtractionDeadLetter).filter(ExtractionDeadLetter.resolved_at.is_(None))
+        if applicant_id is not None:
+            query = query.filter(ExtractionDeadLetter.applicant_id == applicant_id)
+        return query.order_by(ExtractionDeadLetter.created_at.desc(), ExtractionDeadLetter.id.desc()).limit(limit).all()
+
+    def resolve_applicant(self, applicant_id: int) -> int:
+        """Marca como resolvidas as falhas pendentes de um candidato reprocessado com sucesso"""
+        resolved = self.db.query(ExtractionDeadLetter).filter(
+            ExtractionDeadLetter.applicant_id == applicant_id,
+            ExtractionDeadLetter.resolved_at.is_(None)
+        ).update({ExtractionDeadLetter.resolved_at: func.now()}, synchronize_session=False)
+        self.db.commit()
+        if resolved:
+            log_info(f"[DeadLetter] {resolved} falha(s) do candidato {applicant_id} resolvida(s)")
+        return resolved
@@ -0,0 +1,178 @@
+from typing import Dict, Any, List
+import os
+import uuid
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.match_prospect import MatchProspect
+from app.models.workbook import Workbook
+from app.models.vaga import Vaga
+from app.core.logging import log_info, log_error
+from app.services.candidate_pool_cache import get_candidate_pool_cache
+
+PROSPECTS_BATCH_SIZE = int(os.getenv("PROSPECTS_BATCH_SIZE", 1000))
+
+# Se True, o resumo de workbooks é lido da materialized view workbook_prospects_summary,
+# atualizada sempre que o número de prospects de algum workbook muda
+PROSPECTS_SUMMARY_MATVIEW = os.getenv("PROSPECTS_SUMMARY_MATVIEW", "false").lower() == "true"
+
+# Colunas que podem ser atualizadas num prospect já existente.
+# data_entrada nunca é reescrita: registra quando o candidato entrou no workbook.
+UPDATABLE_COLUMNS = ("score_semantico", "origem", "selecionado", "observacoes")
+
+
+class MatchProspectRepository:
+    """
+    Repository para escrita em lote de match_prospects.
+
+    Em vez de apagar todos os prospects do workbook e reinseri-los um a um,
+    calcula o diff contra as chaves (workbook_id, applicant_id) existentes e
+    aplica inserts/updates com INSERT ... ON CONFLICT e deletes com um único DELETE.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def sync_workbook_prospects(
+        self,
+        workbook_id,
+        prospects: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> Dict[str, int]:
+        """
+        Sincroniza os match_prospects do workbook com a lista informada
+
+        Args:
+            workbook_id: ID do workbook (UUID ou string)
+            prospects: dicts com 'applicant_id' e opcionalmente score_semantico, origem,
+                       selecionado, observacoes. Colunas ausentes não são alteradas em
+                       prospects existentes (ex: omitir 'selecionado' preserva a seleção).
+            commit: se True, faz commit ao final
+
+        Returns:
+            Contagem de inserted/updated/deleted/unchanged
+        """
+        workbook_uuid = workbook_id if isinstance(workbook_id, uuid.UUID) else uuid.UUID(str(workbook_id))
+
+        # Normaliza e deduplica por applicant_id (a última ocorrência vence)
+        desired: Dict[int, Dict[str, Any]] = {}
+        for prospect in prospects:
+            applicant_id = prospect.get("applicant_id")
+            if applicant_id is None:
+                continue
+            row = {k: prospect[k] for k in UPDATABLE_COLUMNS if k in prospect}
+            row["applicant_id"] = int(applicant_id)
+            desired[row["applicant_id"]] = row
+
+        existing = {
+            row.applicant_id: row
+            for row in self.db.query(
+                MatchProspect.applicant_id,
+                *[getattr(MatchProspect, c) for c in UPDATABLE_COLUMNS]
+            ).filter(MatchProspect.workbook_id == workbook_uuid).all()
+        }
+
+        to_delete = [applicant_id for applicant_id in existing if applicant_id not in desired]
+        to_insert = []
+        to_update = []
+        for applicant_id, row in desired.items():
+            current = existing.get(applicant_id)
+            if current is None:
+                to_insert.append(row)
+            elif any(getattr(current, c) != v for c, v in row.items() if c != "applicant_id"):
+                to_update.append(row)
+
+        if to_delete:
+            for start in range(0, len(to_delete), PROSPECTS_BATCH_SIZE):
+                batch = to_delete[start:start + PROSPECTS_BATCH_SIZE]
+                self.db.query(MatchProspect).filter(
+                    MatchProspect.workbook_id == workbook_uuid,
+                    MatchProspect.applicant_id.in_(batch)
+                ).delete(synchronize_session=False)
+
+        self._upsert(workbook_uuid, to_insert + to_update)
+
+        if commit:
+            self.db.commit()
+            # Updates não alteram contagens; só inserts/deletes invalidam o resumo
+            if to_insert or to_delete:
+                self.refresh_summary()
+
+        # Pool de candidatos do chat exclui prospects não selecionados: precisa ser refeito.
+        # Outros workers percebem a mudança pela versão dos prospects conferida a cada filtro
+        if to_insert or to_update or to_delete:
+            get_candidate_pool_cache().invalidate(workbook_uuid)
+
+        summary = {
+            "inserted": len(to_insert),
+            "updated": len(to_update),
+            "deleted": len(to_delete),
+            "unchanged": len(desired) - len(to_insert) - len(to_update)
+        }
+        log_info(f"match_prospects sincronizados para workbook {workbook_uuid}: {summary}")
+        return summary
+
+    def _upsert(self, workbook_uuid: uuid.UUID, rows: List[Dict[str, Any]]) -> None:
+        """Aplica inserts/updates em lote via INSERT ... ON CONFLICT DO UPDATE"""
+        table = MatchProspect.__table__
+
+        # Um INSERT multi-VALUES exige o mesmo conjunto de colunas em todas as linhas
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append({**row, "workbook_id": workbook_uuid})
+
+        for keys, group in groups.items():
+            for start in range(0, len(group), PROSPECTS_BATCH_SIZE):
+                stmt = pg_insert(table).values(group[start:start + PROSPECTS_BATCH_SIZE])
+                update_cols = {k: stmt.excluded[k] for k in keys if k in UPDATABLE_COLUMNS}
+                if update_cols:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[table.c.workbook_id, table.c.applicant_id],
+                        set_=update_cols
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(
+                        index_elements=[table.c.workbook_id, table.c.applicant_id]
+                    )
+                self.db.execute(stmt)
+
+    def get_workbook_summaries(self) -> List[Any]:
+        """
+        Workbooks com prospects: (workbook_id, vaga_id, vaga_titulo, total_prospects)
+
+        A contagem é agregada em match_prospects antes do join (index-only scan em
+        uq_workbook_match), ou lida da materialized view quando habilitada.
+        """
+        if PROSPECTS_SUMMARY_MATVIEW:
+            return self.db.execute(text(
+                "SELECT workbook_id, vaga_id, vaga_titulo, total_prospects "
+                "FROM public.workbook_prospects_summary ORDER BY workbook_id"
+            )).all()
+
+        counts = self.db.query(
+            MatchProspect.workbook_id,
+            func.count().label("total_prospects")
+        ).group_by(MatchProspect.workbook_id).subquery()
+
+        return self.db.query(
+            Workbook.id,
+            Workbook.vaga_id,
+            Vaga.informacoes_basicas_titulo_vaga,
+            counts.c.total_prospects
+        ).join(
+            counts, counts.c.workbook_id == Workbook.id
+        ).join(
+            Vaga, Workbook.vaga_id == Vaga.id
+        ).order_by(Workbook.id).all()
+
+    def refresh_summary(self) -> None:
+        """Atualiza a materialized view de resumo (no-op se desabilitada)"""
+        if not PROSPECTS_SUMMARY_MATVIEW:
+            return
+        try:
+            # CONCURRENTLY não bloqueia leituras do resumo durante o refresh
+            self.db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY public.workbook_prospects_summary"))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            log_error(f"Erro ao atualizar workbook_prospects_summary: {str(e)}")
@@ -0,0 +1,228 @@
+import os
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import func, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.processing_job import ProcessingJob
+from app.core.logging import log_info, log_warning
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# Espera antes da 2ª tentativa; dobra a cada nova falha
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", 30))
+# Erro guardado no job (suficiente para diagnosticar a falha)
+JOB_ERROR_MAX_CHARS = 4000
+# Jobs concluídos/falhos mais antigos que isso são apagados (payload tem dados pessoais do candidato)
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", 7))
+
+ACTIVE_STATUSES = ("pending", "running")
+
+_CLAIM_SQL = """
+UPDATE processing_jobs
+SET status = 'running', attempts = attempts + 1, locked_by = :worker_id,
+    locked_at = NOW(), updated_at = NOW()
+WHERE id = (
+    SELECT id FROM processing_jobs
+    WHERE status = 'pending' AND run_after <= NOW() {kind_filter}
+    ORDER BY priority DESC, run_after, id
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id
+"""
+
+
+class ProcessingJobRepository:
+    """Repository da fila de jobs em Postgres (tabela processing_jobs)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        entity_id: Optional[str] = None,
+        priority: int = 0,
+        max_attempts: int = JOB_MAX_ATTEMPTS
+    ) -> Tuple[ProcessingJob, bool]:
+        """
+        Enfileira um job; (job, True) se criado
+
+        Se já existe job pendente/em execução do mesmo kind+entity_id, devolve
+        esse job e False (índice único parcial, vale entre processos).
+        """
+        table = ProcessingJob.__table__
+        stmt = pg_insert(table).values(
+            kind=kind,
+            entity_id=entity_id,
+            payload=payload,
+            priority=priority,
+            max_attempts=max_attempts,
+            status="pending"
+        ).on_conflict_do_nothing(
+            index_elements=[table.c.kind, table.c.entity_id],
+            # Literal: o Postgres só infere o índice parcial se o predicado bater sem parâmetros
+            index_where=text("status IN ('pending', 'running')")
+        ).returning(table.c.id)
+        job_id = self.db.execute(stmt).scalar()
+        self.db.commit()
+
+        if job_id is not None:
+            log_info(f"[JobQueue] Job {job_id} enfileirado ({kind} {entity_id or ''}, prioridade {priority})")
+            return self.db.get(ProcessingJob, job_id), True
+        return self.get_active(kind, entity_id), False
+
+    def get(self, job_id: int) -> Optional[ProcessingJob]:
+        return self.db.get(ProcessingJob, job_id)
+
+    def get_active(self, kind: str, entity_id: Optional[str]) -> Optional[ProcessingJob]:
+        return self.db.query(ProcessingJob).filter(
+            ProcessingJob.kind == kind,
+            ProcessingJob.entity_id == entity_id,
+            ProcessingJob.status.in_(ACTIVE_STATUSES)
+        ).first()
+
+    def list_jobs(
+        self,
+        status: Optional[str] = None,
+        kind: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[ProcessingJob]:
+        query = self.db.query(ProcessingJob)
+        if status:
+            query = query.filter(ProcessingJob.status == status)
+        if kind:
+            query = query.filter(ProcessingJob.kind == kind)
+        if entity_id:
+            query = query.filter(ProcessingJob.entity_id == entity_id)
+        return query.order_by(ProcessingJob.id.desc()).limit(limit).all()
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Quantidade de jobs por kind e status"""
+        rows = self.db.execute(text(
+            "SELECT kind, status, COUNT(*) AS total FROM processing_jobs GROUP BY kind, status"
+        )).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row.kind, {})[row.status] = row.total
+        return counts
+
+    def claim(self, worker_id: str, kinds: Optional[Sequence[str]] = None) -> Optional[ProcessingJob]:
+        """Reserva o próximo job pendente (prioridade, depois o mais antigo); None se a fila estiver vazia"""
+        params: Dict[str, Any] = {"worker_id": worker_id}
+        kind_filter = ""
+        if kinds:
+            kind_filter = "AND kind = ANY(:kinds)"
+            params["kinds"] = list(kinds)
+        job_id = self.db.execute(text(_CLAIM_SQL.format(kind_filter=kind_filter)), params).scalar()
+        self.db.commit()
+        if job_id is None:
+            return None
+        return self.db.get(ProcessingJob, job_id)
+
+    def heartbeat(self, job_id: int, worker_id: str) -> None:
+        """Renova locked_at enquanto o worker ainda executa o job"""
+        self.db.execute(
+            text("UPDATE processing_jobs SET locked_at = NOW() WHERE id = :id AND locked_by = :worker_id AND status = 'running'"),
+            {"id": job_id, "worker_id": worker_id}
+        )
+        self.db.commit()
+
+    def complete(self, job: ProcessingJob, worker_id: str, result: Any = None) -> bool:
+        """Marca como concluído e descarta o payload (CPF, telefone, texto do CV...); False se o lock foi perdido"""
+        return self._finish_run(job, worker_id, {
+            "status": "done",
+            "payload": {},
+            "result": result,
+            "last_error": None,
+            # Horários sempre do servidor: run_after/locked_at são comparados com NOW() (TIMESTAMP sem fuso)
+            "finished_at": func.now(),
+        })
+
+    def fail(self, job: ProcessingJob, worker_id: str, error: str) -> bool:
+        """Registra a falha; volta para a fila com backoff ou fica 'failed' após max_attempts. False se o lock foi perdido"""
+        values: Dict[str, Any] = {"last_error": (error or "")[:JOB_ERROR_MAX_CHARS]}
+        if job.attempts >= job.max_attempts:
+            values.update(status="failed", finished_at=func.now())
+        else:
+            delay = JOB_RETRY_BASE_SECONDS * 2 ** max(job.attempts - 1, 0)
+            values.update(status="pending", run_after=func.now() + timedelta(seconds=delay))
+        if not self._finish_run(job, worker_id, values):
+            return False
+        if values["status"] == "failed":
+            log_warning(f"[JobQueue] Job {job.id} ({job.kind}) falhou após {job.attempts} tentativa(s)")
+        else:
+            log_info(f"[JobQueue] Job {job.id} ({job.kind}) será tentado de novo em {delay}s")
+        return True
+
+    def _finish_run(self, job: ProcessingJob, worker_id: str, values: Dict[str, Any]) -> bool:
+        """
+        Encerra a execução só se este worker ainda tiver o lock
+
+        Sem heartbeat (ex: queda do banco), requeue_stale devolve o job à fila e outro
+        worker pode reservá-lo; o resultado da execução antiga não sobrescreve a nova.
+        """
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(
+                ProcessingJob.id == job.id,
+                ProcessingJob.locked_by == worker_id,
+                ProcessingJob.status == "running"
+            )
+            .values(locked_by=None, updated_at=func.now(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        if not result.rowcount:
+            log_warning(f"[JobQueue] Job {job.id} ({job.kind}): worker {worker_id} perdeu o lock; resultado descartado")
+            return False
+        return True
+
+    def requeue_stale(self, timeout_seconds: int) -> int:
+        """
+        Jobs 'running' sem heartbeat há timeout_seconds (worker morreu) voltam para a fila
+
+        Quem já esgotou max_attempts vai para 'failed'.
+        """
+        result = self.db.execute(text("""
+            UPDATE processing_jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                finished_at = CASE WHEN attempts >= max_attempts THEN NOW() ELSE NULL END,
+                last_error = COALESCE(last_error, 'worker parou sem concluir o job'),
+                locked_by = NULL, run_after = NOW(), updated_at = NOW()
+            WHERE status = 'running' AND locked_at < NOW() - make_interval(secs => :timeout)
+        """), {"timeout": timeout_seconds})
+        self.db.commit()
+        if result.rowcount:
+            log_warning(f"[JobQueue] {result.rowcount} job(s) sem heartbeat devolvidos à fila")
+        return result.rowcount
+
+    def purge_finished(self, retention_days: int = JOB_RETENTION_DAYS) -> int:
+        """Apaga jobs 'done'/'failed' terminados há mais de retention_days"""
+        result = self.db.execute(text("""
+            DELETE FROM processing_jobs
+            WHERE status IN ('done', 'failed') AND finished_at < NOW() - make_interval(days => :days)
+        """), {"days": retention_days})
+        self.db.commit()
+        if result.rowcount:
+            log_info(f"[JobQueue] {result.rowcount} job(s) antigos removidos")
+        return result.rowcount
+
+    def retry(self, job_id: int) -> Optional[ProcessingJob]:
+        """Recoloca um job 'failed' na fila; None se não existir, não estiver 'failed' ou já houver outro ativo"""
+        job = self.get(job_id)
+        if job is None or job.status != "failed":
+            return None
+        job.status = "pending"
+        job.attempts = 0
+        job.run_after = func.now()
+        job.finished_at = None
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return None
+        return job
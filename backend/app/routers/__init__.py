@@ -4,3 +4,4 @@ from .workbook import router as workbook_router
 from .processed_applicant import router as processed_applicant_router
 from .chat import router as chat_router
 from .prospects_match import router as prospects_match_router
+from .jobs import router as jobs_router
@@ -1,24 +1,22 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.schemas import ApplicantIn
 from app.models import ProcessedApplicant
+from app.models.processed_applicant import WITH_CV_LOAD
 from app.core.database import SessionLocal
 from app.llm.factory import get_llm_client
 from app.core.logging import log_info, log_warning, log_error, log_debug, llm_log
 import json
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
 import traceback
-import threading
 import os
 from app.services.cv_extractor_service import extract_section, merge_results, education_level_order, VALID_LANGUAGE_LEVELS
-from app.repositories.applicant_repository import ApplicantRepository
-from app.services.applicant_processing_orchestrator import ApplicantProcessingOrchestrator
-from typing import List
+from app.repositories.extraction_dead_letter_repository import ExtractionDeadLetterRepository
+from app.services.job_queue import JOB_APPLICANT, enqueue_job
+from typing import List, Optional
 from pydantic import BaseModel
 
 router = APIRouter()
-executor = ThreadPoolExecutor(max_workers=4)
 
 def get_db():
     db = SessionLocal()
@@ -27,84 +25,29 @@ def get_db():
     finally:
         db.close()
 
-# Singleton for concurrent processing control
-class ProcessingRegistry:
-    _instance = None
-    _lock = threading.Lock()
-    def __new__(cls):
-        if not cls._instance:
-            with cls._lock:
-                if not cls._instance:
-                    cls._instance = super().__new__(cls)
-                    cls._instance.processing_ids = set()
-                    cls._instance.processing_lock = threading.Lock()
-        return cls._instance
-
-    def is_processing(self, applicant_id):
-        with self.processing_lock:
-            return applicant_id in self.processing_ids
-
-    def start_processing(self, applicant_id):
-        with self.processing_lock:
-            if applicant_id in self.processing_ids:
-                return False
-            self.processing_ids.add(applicant_id)
-            return True
-
-    def finish_processing(self, applicant_id):
-        with self.processing_lock:
-            self.processing_ids.discard(applicant_id)
-
-processing_registry = ProcessingRegistry()
-
-def process_cv_in_background(applicant_dict, db_dict):
-    applicant_id = applicant_dict["id"]
-    log_info(f"[BG] Starting processing for applicant {applicant_id}")
-    orchestrator = ApplicantProcessingOrchestrator()
-    try:
-        cv_text = applicant_dict["cv_pt"]
-        log_info(f"[BG] Extracted CV for applicant {applicant_id}: {cv_text[:50]}...")
-        if not cv_text or len(cv_text.strip()) < 30:
-            log_warning(f"Empty or too short CV for applicant {applicant_id}.")
-            return
-        log_info(f"[BG] Calling orchestrator.process_applicant for {applicant_id}")
-        orchestrator.process_applicant(applicant_dict)
-        log_info(f"Applicant {applicant_id} processed successfully.")
-    except Exception as e:
-        log_error(f"Error processing applicant {applicant_id}: {e}\n{traceback.format_exc()}")
-    finally:
-        log_info(f"[BG] Finishing processing for applicant {applicant_id}")
-        processing_registry.finish_processing(applicant_id)
-        repo = ApplicantRepository()
-        repo.close()
-
 @router.post("/process_applicant/")
-def process_applicant(applicant: ApplicantIn, background_tasks: BackgroundTasks):
+def process_applicant(applicant: ApplicantIn, db: Session = Depends(get_db)):
     log_info(f"[API] Received request to process applicant: {applicant.id}")
     applicant_id = applicant.id
-    if processing_registry.is_processing(applicant_id):
-        log_warning(f"Applicant {applicant_id} is already being processed.")
-        return {"error": "This applicant is already being processed. Please wait until it finishes."}
-    if not processing_registry.start_processing(applicant_id):
-        log_warning(f"Applicant {applicant_id} could not be marked as processing.")
-        return {"error": "Failed to start processing applicant."}
     try:
-        applicant_dict = applicant.dict()
-        db_dict = applicant.dict()
-        log_info(f"[API] Adding background task for applicant {applicant_id}")
-        background_tasks.add_task(executor.submit, process_cv_in_background, applicant_dict, db_dict)
-        log_info(f"[API] Background task added for applicant {applicant_id}")
-        return {"message": "Applicant received for processing."}
+        job, created = enqueue_job(db, JOB_APPLICANT, applicant.dict(), entity_id=applicant_id)
     except Exception as e:
-        processing_registry.finish_processing(applicant_id)
         log_error(f"Error receiving applicant: {e}\n{traceback.format_exc()}")
         return {"error": "Failed to receive applicant for processing."}
+    if not created:
+        log_warning(f"Applicant {applicant_id} is already being processed.")
+        return {
+            "error": "This applicant is already being processed. Please wait until it finishes.",
+            "job_id": job.id if job else None
+        }
+    log_info(f"[API] Job {job.id} enqueued for applicant {applicant_id}")
+    return {"message": "Applicant received for processing.", "job_id": job.id}
 
 @router.get("/get_processed_applicant/{applicant_id}")
 def get_processed_applicant(applicant_id: int):
     db = SessionLocal()
     try:
-        db_obj = db.query(ProcessedApplicant).filter_by(id=applicant_id).first()
+        db_obj = db.query(ProcessedApplicant).options(*WITH_CV_LOAD).filter_by(id=applicant_id).first()
         if not db_obj:
             return {"error": "Applicant not found."}
         # Build the dictionary with all fields, but replace cv_pt with the JSON from cv_pt_json
@@ -125,6 +68,26 @@ def get_processed_applicant(applicant_id: int):
         db.close()
 
 
+@router.get("/extraction_dead_letters/")
+def list_extraction_dead_letters(applicant_id: Optional[int] = None, limit: int = 100, db: Session = Depends(get_db)):
+    """Chunks de CV que esgotaram a política de retry da extração (pendentes de reprocessamento)"""
+    entries = ExtractionDeadLetterRepository(db).list_pending(limit=limit, applicant_id=applicant_id)
+    return [
+        {
+            "id": e.id,
+            "applicant_id": e.applicant_id,
+            "section": e.section,
+            "chunk_index": e.chunk_index,
+            "error_kind": e.error_kind,
+            "error_message": e.error_message,
+            "raw_response": e.raw_response,
+            "attempts": e.attempts,
+            "created_at": e.created_at
+        }
+        for e in entries
+    ]
+
+
 class ApplicantIdsRequest(BaseModel):
     applicant_ids: List[int]
 
@@ -137,7 +100,7 @@ def get_applicants_by_ids(request: ApplicantIdsRequest):
         if not request.applicant_ids:
             return []
             
-        applicants = db.query(ProcessedApplicant).filter(
+        applicants = db.query(ProcessedApplicant).options(*WITH_CV_LOAD).filter(
             ProcessedApplicant.id.in_(request.applicant_ids)
         ).all()
         
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Iterator, Tuple, Dict, Any
+import json
 from app.schemas.chat import ChatRequest, ChatResponse, ChatHistoryResponse
 from app.chat.services.chat_service import ChatService
 from app.dependencies import get_db
+from app.core.database import SessionLocal
 
 router = APIRouter()
 
@@ -38,6 +41,37 @@ async def chat_with_llm(
         confidence=result.get('confidence')
     )
 
+def _sse(events: Iterator[Tuple[str, Dict[str, Any]]]) -> Iterator[str]:
+    """Formata eventos (nome, dados) como Server-Sent Events"""
+    for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@router.post("/chat/stream")
+def chat_with_llm_stream(request: ChatRequest):
+    """
+    Versão streaming de /chat via Server-Sent Events (text/event-stream)
+    
+    Eventos: meta (session_id, intent, confidence), candidates (lista de candidatos
+    filtrados), token (trecho da resposta), error e done (resposta completa).
+    """
+    def events() -> Iterator[Tuple[str, Dict[str, Any]]]:
+        # Sessão própria do gerador: a do get_db é fechada antes do corpo da
+        # StreamingResponse ser enviado
+        with SessionLocal() as db:
+            yield from ChatService(db).stream_chat(
+                message=request.message,
+                workbook_id=request.workbook_id,
+                context=request.context,
+                session_id=request.session_id
+            )
+    
+    # Gerador síncrono: o Starlette o consome num threadpool, sem bloquear o event loop
+    return StreamingResponse(
+        _sse(events()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/chat/history/{session_id}", response_model=ChatHistoryResponse)
 def get_chat_history(
     session_id: str,
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.dependencies import get_db
+from app.repositories.processing_job_repository import ProcessingJobRepository
+from app.services.job_queue import job_to_dict
+from app.core.logging import log_info
+from typing import Optional
+
+router = APIRouter()
+
+
+@router.get("/jobs")
+def listar_jobs(
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Jobs de processamento mais recentes (filtros por status, kind e entidade) e totais por kind/status"""
+    repository = ProcessingJobRepository(db)
+    return {
+        "counts": repository.counts(),
+        "jobs": [job_to_dict(job) for job in repository.list_jobs(status=status, kind=kind, entity_id=entity_id, limit=limit)]
+    }
+
+
+@router.get("/jobs/{job_id}")
+def detalhes_job(job_id: int, db: Session = Depends(get_db)):
+    """Status, tentativas, último erro e resultado de um job"""
+    job = ProcessingJobRepository(db).get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job_to_dict(job)
+
+
+@router.post("/jobs/{job_id}/retry")
+def reprocessar_job(job_id: int, db: Session = Depends(get_db)):
+    """Recoloca na fila um job que esgotou as tentativas"""
+    repository = ProcessingJobRepository(db)
+    job = repository.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job.status != "failed":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}; only failed jobs can be retried")
+    job = repository.retry(job_id)
+    if job is None:
+        raise HTTPException(status_code=409, detail="Another job for the same entity is already queued")
+    log_info(f"Job {job_id} recolocado na fila")
+    return job_to_dict(job)
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
-from app.models.processed_applicant import ProcessedApplicant
+from app.models.processed_applicant import ProcessedApplicant, SUMMARY_LOAD, DETAIL_LOAD
 from app.schemas.processed_applicant import (
     ProcessedApplicantResponse, 
     ProcessedApplicantSummary, 
-    ProcessedApplicantUpdate
+    ProcessedApplicantUpdate,
+    ProcessedApplicantMatch,
+    ProcessedApplicantPage
 )
+from app.core.pagination import paginate_keyset, count_rows
+from app.core.text_search import text_equals, text_matches, text_similarity
 from typing import List, Optional
 
 router = APIRouter()
@@ -18,17 +22,29 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/processed-applicants", response_model=List[ProcessedApplicantSummary])
+def _page(db: Session, query, limit: int, cursor: Optional[str], count: str, table_name: Optional[str] = None) -> ProcessedApplicantPage:
+    """Builds a keyset page over (updated_at DESC, id DESC) with the requested count mode"""
+    items, next_cursor = paginate_keyset(query, ProcessedApplicant, limit, cursor)
+    total, is_estimate = count_rows(db, query, count, table_name) if not cursor else (None, False)
+    return ProcessedApplicantPage(
+        items=items,
+        next_cursor=next_cursor,
+        total=total,
+        total_is_estimate=is_estimate
+    )
+
+@router.get("/processed-applicants", response_model=ProcessedApplicantPage)
 def list_processed_applicants(
-    skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("none", pattern="^(none|exact|estimated)$", description="Total count mode (first page only)"),
     db: Session = Depends(get_db)
 ):
     """
-    List processed applicants with pagination and basic information.
+    List processed applicants with keyset pagination (most recently updated first).
     """
-    applicants = db.query(ProcessedApplicant).offset(skip).limit(limit).all()
-    return applicants
+    query = db.query(ProcessedApplicant).options(*SUMMARY_LOAD)
+    return _page(db, query, limit, cursor, count, table_name="public.processed_applicants")
 
 @router.get("/processed-applicants/{applicant_id}", response_model=ProcessedApplicantResponse)
 def get_processed_applicant(
@@ -38,7 +54,7 @@ def get_processed_applicant(
     """
     Get detailed information about a specific processed applicant.
     """
-    applicant = db.query(ProcessedApplicant).filter(ProcessedApplicant.id == applicant_id).first()
+    applicant = db.query(ProcessedApplicant).options(*DETAIL_LOAD).filter(ProcessedApplicant.id == applicant_id).first()
     if not applicant:
         return {"error": "Processed applicant not found"}
     return applicant
@@ -52,7 +68,7 @@ def update_processed_applicant(
     """
     Update a processed applicant's information.
     """
-    applicant = db.query(ProcessedApplicant).filter(ProcessedApplicant.id == applicant_id).first()
+    applicant = db.query(ProcessedApplicant).options(*DETAIL_LOAD).filter(ProcessedApplicant.id == applicant_id).first()
     if not applicant:
         return {"error": "Processed applicant not found"}
     
@@ -69,28 +85,60 @@ def update_processed_applicant(
         db.rollback()
         return {"error": f"Error updating processed applicant: {str(e)}"}
 
-@router.get("/processed-applicants/search/by-name")
+@router.get("/processed-applicants/search/by-name", response_model=ProcessedApplicantPage)
 def search_applicants_by_name(
     name: str = Query(..., min_length=2),
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("none", pattern="^(none|exact|estimated)$", description="Total count mode (first page only)"),
     db: Session = Depends(get_db)
-) -> List[ProcessedApplicantSummary]:
+):
     """
-    Search processed applicants by name (partial match).
+    Search processed applicants by name (accent-insensitive partial/fuzzy match), paginated by cursor.
+    For relevance-ranked results use /processed-applicants/search/typeahead.
     """
-    applicants = db.query(ProcessedApplicant).filter(
-        ProcessedApplicant.nome.ilike(f"%{name}%")
-    ).limit(50).all()
-    return applicants
+    query = db.query(ProcessedApplicant).options(*SUMMARY_LOAD).filter(
+        text_matches(ProcessedApplicant.nome, name)
+    )
+    return _page(db, query, limit, cursor, count)
 
-@router.get("/processed-applicants/search/by-education")
+@router.get("/processed-applicants/search/by-education", response_model=ProcessedApplicantPage)
 def search_applicants_by_education(
     education_level: str = Query(...),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("none", pattern="^(none|exact|estimated)$", description="Total count mode (first page only)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Search processed applicants by education level (exact, accent/case-insensitive), paginated by cursor.
+    "graduação" does not return "pós-graduação"; for fuzzy lookup use /processed-applicants/search/typeahead.
+    """
+    query = db.query(ProcessedApplicant).options(*SUMMARY_LOAD).filter(
+        text_equals(ProcessedApplicant.nivel_maximo_formacao, education_level)
+    )
+    return _page(db, query, limit, cursor, count)
+
+@router.get("/processed-applicants/search/typeahead", response_model=List[ProcessedApplicantMatch])
+def typeahead_applicants(
+    q: str = Query(..., min_length=2, description="Name fragment; accents and case are ignored"),
+    field: str = Query("nome", pattern="^(nome|nivel_maximo_formacao)$"),
+    limit: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db)
-) -> List[ProcessedApplicantSummary]:
+):
     """
-    Search processed applicants by education level.
+    Similarity-ranked lookup over the trigram index, best matches first.
     """
-    applicants = db.query(ProcessedApplicant).filter(
-        ProcessedApplicant.nivel_maximo_formacao == education_level
-    ).limit(100).all()
-    return applicants
+    column = getattr(ProcessedApplicant, field)
+    similarity = text_similarity(column, q).label("similaridade")
+    rows = db.query(ProcessedApplicant, similarity).options(*SUMMARY_LOAD).filter(
+        text_matches(column, q)
+    ).order_by(similarity.desc(), ProcessedApplicant.id).limit(limit).all()
+
+    return [
+        ProcessedApplicantMatch(
+            **ProcessedApplicantSummary.model_validate(applicant).model_dump(),
+            similaridade=round(score or 0.0, 4)
+        )
+        for applicant, score in rows
+    ]
@@ -5,6 +5,7 @@ from app.core.database import SessionLocal
 from app.services.semantic_performance_service import SemanticPerformanceService
 from app.schemas.semantic_performance import SemanticPerformanceResponse, CacheClearResponse
 from app.core.logging import log_info, log_error
+from app.llm.rate_limiter import usage_snapshot, reset_usage
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
@@ -135,3 +136,27 @@ def get_semantic_performance_info():
             "localizacao": "temp_cache/semantic_performance_cache.json"
         }
     }
+
+
+@router.get("/llm-usage")
+def get_llm_usage():
+    """
+    Retorna o consumo de tokens dos LLMs desde o início do processo.
+    
+    Agregado por call site (extraction:<seção>, vaga_text, chat, criteria_extraction,
+    *_embedding), backend e modelo. `estimated_calls` conta as chamadas cujo uso
+    foi estimado pelo tamanho do texto (ex: CLI do Ollama, que não informa tokens).
+    """
+    items = usage_snapshot()
+    return {
+        "total_prompt_tokens": sum(i["prompt_tokens"] for i in items),
+        "total_completion_tokens": sum(i["completion_tokens"] for i in items),
+        "usage": items
+    }
+
+
+@router.delete("/llm-usage")
+def clear_llm_usage():
+    """Zera os contadores de uso de tokens"""
+    reset_usage()
+    return {"message": "Contadores de uso de LLM zerados"}
@@ -1,33 +1,17 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from app.schemas.vaga import VagaCreate, VagaUpdate
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.models.vaga import Vaga
-from app.services.vaga_processing_orchestrator import VagaProcessingOrchestrator
+from app.services.job_queue import JOB_VAGA, JOB_VAGA_BATCH, enqueue_job
 from app.core.logging import log_info, log_warning, log_error
-from app.core.processing_registry import ProcessingRegistryBase
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 import traceback
 
 router = APIRouter()
-executor = ThreadPoolExecutor(max_workers=4)
 
-class VagaProcessingRegistry(ProcessingRegistryBase):
-    pass
-
-registry = VagaProcessingRegistry()
-
-def process_vaga_in_background(vaga_dict):
-    vaga_id = vaga_dict["id"]
-    log_info(f"[BG] Starting processing for vaga {vaga_id}")
-    orchestrator = VagaProcessingOrchestrator()
-    try:
-        orchestrator.process_vaga(vaga_dict, vaga_id)
-        log_info(f"[BG] Finished processing for vaga {vaga_id}")
-    except Exception as e:
-        log_error(f"[BG] Error processing vaga {vaga_id}: {e}\n{traceback.format_exc()}")
-    finally:
-        registry.finish_processing(vaga_id)
+# entity_id do reprocessamento em lote (um job ativo por vez)
+BATCH_REPROCESS_KEY = "reprocessar_vagas"
 
 
 def get_db():
@@ -88,19 +72,38 @@ def detalhes_vaga(vaga_id: int, db: Session = Depends(get_db)):
     return data
 
 @router.post("/vagas")
-def process_vaga(vaga: VagaCreate, background_tasks: BackgroundTasks):
+def process_vaga(vaga: VagaCreate, db: Session = Depends(get_db)):
     vaga_id = vaga.id
     log_info(f"[API] Received request to process vaga: {vaga_id}")
-    if registry.is_processing(vaga_id):
-        log_warning(f"Vaga {vaga_id} is already being processed.")
-        return {"error": "This vaga is already being processed. Please wait until it finishes."}
-    if not registry.start_processing(vaga_id):
-        log_warning(f"Vaga {vaga_id} could not be marked as processing.")
+    try:
+        job, created = enqueue_job(db, JOB_VAGA, vaga.dict(), entity_id=vaga_id)
+    except Exception as e:
+        log_error(f"Error receiving vaga {vaga_id}: {e}\n{traceback.format_exc()}")
         return {"error": "Failed to start processing vaga."}
+    if not created:
+        log_warning(f"Vaga {vaga_id} is already being processed.")
+        return {
+            "error": "This vaga is already being processed. Please wait until it finishes.",
+            "job_id": job.id if job else None
+        }
+    log_info(f"[API] Job {job.id} enqueued for vaga {vaga_id}")
+    return {"message": "Vaga received for processing.", "job_id": job.id}
 
-    vaga_dict = vaga.dict()
-    background_tasks.add_task(executor.submit, process_vaga_in_background, vaga_dict)
-    log_info(f"[API] Background task added for vaga {vaga_id}")
-    return {"message": "Vaga received for processing."}
 
+@router.post("/vagas/reprocessar")
+def reprocessar_vagas(force: bool = False, limit: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Regenera texto semântico e embedding das vagas em lote.
 
+    Por padrão só as vagas que precisam de extração; force=true reprocessa todas
+    (ex: depois de mudar o prompt). O resumo do lote fica em GET /jobs/{job_id}.
+    """
+    job, created = enqueue_job(db, JOB_VAGA_BATCH, {"force": force, "limit": limit}, entity_id=BATCH_REPROCESS_KEY)
+    if not created:
+        log_warning("Batch reprocessing of vagas is already running.")
+        return {
+            "error": "Vaga reprocessing is already running. Please wait until it finishes.",
+            "job_id": job.id if job else None
+        }
+    log_info(f"[API] Batch reprocessing of vagas enqueued as job {job.id} (force={force}, limit={limit})")
+    return {"message": "Vaga reprocessing started.", "job_id": job.id}
@@ -6,7 +6,9 @@ from .processed_applicant import (
     ProcessedApplicantCreate, 
     ProcessedApplicantUpdate, 
     ProcessedApplicantResponse, 
-    ProcessedApplicantSummary
+    ProcessedApplicantSummary,
+    ProcessedApplicantMatch,
+    ProcessedApplicantPage
 )
 from .match_prospect import (
     MatchProspectBase, 
@@ -0,0 +1,76 @@
+from typing import Any, Dict, Optional
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+
+
+class LLMOutputItem(BaseModel):
+    # Campos extras devolvidos pelo LLM são preservados; anos/números viram texto
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+
+class FormacaoOutput(LLMOutputItem):
+    curso: Optional[str] = None
+    nivel: Optional[str] = None
+    instituicao: Optional[str] = None
+    ano_inicio: Optional[str] = None
+    ano_fim: Optional[str] = None
+    observacoes: Optional[str] = None
+
+
+class ExperienciaOutput(LLMOutputItem):
+    empresa: Optional[str] = None
+    cargo: Optional[str] = None
+    inicio: Optional[str] = Field(None, validation_alias=AliasChoices("inicio", "data_inicio", "data inicio"))
+    fim: Optional[str] = Field(None, validation_alias=AliasChoices("fim", "data_fim", "data fim"))
+    descricao: Optional[str] = None
+
+
+class IdiomaOutput(LLMOutputItem):
+    idioma: Optional[str] = None
+    nivel: Optional[str] = None
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+class SearchCriteriaOutput(BaseModel):
+    """Critérios de busca de candidatos para uma vaga, extraídos pelo LLM do texto do chat"""
+    model_config = ConfigDict(extra="allow")
+
+    vaga_id: Optional[int] = None
+    usar_similaridade: bool = True
+    limite: Optional[int] = None
+    filtros: Dict[str, Any] = Field(default_factory=dict)
+
+    @field_validator("vaga_id", "limite", mode="before")
+    @classmethod
+    def coerce_optional_int(cls, value):
+        # LLM às vezes devolve "7", [7] ou "dez"
+        return _optional_int(value)
+
+    @field_validator("usar_similaridade", mode="before")
+    @classmethod
+    def default_similarity(cls, value):
+        return True if value is None else value
+
+    @field_validator("filtros", mode="before")
+    @classmethod
+    def default_filters(cls, value):
+        return value if isinstance(value, dict) else {}
+
+
+# Validadores compilados uma única vez (pydantic-core) para os itens de cada seção do CV
+SECTION_ITEM_ADAPTERS: Dict[str, TypeAdapter] = {
+    "formacoes": TypeAdapter(FormacaoOutput),
+    "experiencias": TypeAdapter(ExperienciaOutput),
+    "habilidades": TypeAdapter(str),
+    "idiomas": TypeAdapter(IdiomaOutput),
+}
@@ -68,3 +68,14 @@ class ProcessedApplicantSummary(BaseModel):
     
     class Config:
         from_attributes = True
+
+class ProcessedApplicantMatch(ProcessedApplicantSummary):
+    """Summary plus the trigram similarity of the match (0-1), for ranked typeahead"""
+    similaridade: float
+
+class ProcessedApplicantPage(BaseModel):
+    """Page of a keyset-paginated listing; pass next_cursor back as ?cursor= for the next page"""
+    items: List[ProcessedApplicantSummary]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None  # Only when count=exact|estimated
+    total_is_estimate: bool = False
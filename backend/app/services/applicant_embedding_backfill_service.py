@@ -0,0 +1,104 @@
+"""
+Backfill em lote do texto semântico e do embedding dos candidatos.
+
+O orquestrador trata um candidato por vez (um embedding e um upsert por job).
+Para gerar os embeddings que faltam, ou regenerar todos depois de trocar o
+modelo, este serviço:
+
+1. percorre processed_applicants por id (keyset), lendo só id, cv_pt_json e
+   nivel_maximo_formacao; por padrão apenas quem não tem cv_embedding_vector;
+2. gera os embeddings em lotes de APPLICANT_BACKFILL_EMBEDDING_SIZE textos por
+   chamada (EmbeddingClient.generate_embeddings);
+3. grava com ApplicantRepository.upsert_applicants (INSERT ... ON CONFLICT em
+   lote, commit por bloco), que também regrava applicant_skills.
+
+Candidatos sem texto ou cujo embedding falhar não são alterados.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.database import SessionLocal
+from app.core.logging import log_info, log_error
+from app.llm.rate_limiter import llm_call_site
+from app.models.processed_applicant import ProcessedApplicant
+from app.repositories.applicant_repository import ApplicantRepository
+from app.services.cv_semantic_service import CVSemanticService
+
+APPLICANT_BACKFILL_EMBEDDING_SIZE = int(os.getenv("APPLICANT_BACKFILL_EMBEDDING_SIZE", 100))
+APPLICANT_BACKFILL_BATCH_SIZE = int(os.getenv("APPLICANT_BACKFILL_BATCH_SIZE", 500))
+
+
+class ApplicantEmbeddingBackfillService:
+    """Regenera cv_texto_semantico/cv_embedding em lote"""
+
+    def __init__(self, semantic_service: Optional[CVSemanticService] = None):
+        self.semantic_service = semantic_service or CVSemanticService()
+
+    def run(self, force: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+        """force=True regenera todos; sem force, só os candidatos sem embedding"""
+        start = time.time()
+        summary = {"selecionados": 0, "atualizados": 0, "falhas_embedding": 0}
+        last_id = None
+        while limit is None or summary["selecionados"] < limit:
+            batch_size = APPLICANT_BACKFILL_BATCH_SIZE
+            if limit is not None:
+                batch_size = min(batch_size, limit - summary["selecionados"])
+            with SessionLocal() as db:
+                query = db.query(
+                    ProcessedApplicant.id,
+                    ProcessedApplicant.cv_pt_json,
+                    ProcessedApplicant.nivel_maximo_formacao
+                ).filter(ProcessedApplicant.cv_pt_json.isnot(None))
+                if not force:
+                    query = query.filter(ProcessedApplicant.cv_embedding_vector.is_(None))
+                if last_id is not None:
+                    query = query.filter(ProcessedApplicant.id > last_id)
+                block = query.order_by(ProcessedApplicant.id).limit(batch_size).all()
+            if not block:
+                break
+            summary["selecionados"] += len(block)
+            last_id = block[-1].id
+
+            rows = self._process_block(block, summary)
+            if rows:
+                with SessionLocal() as db:
+                    summary["atualizados"] += ApplicantRepository(db).upsert_applicants(rows)
+            log_info(f"[ApplicantBackfill] {summary['selecionados']} candidatos processados")
+
+        summary["segundos"] = round(time.time() - start, 2)
+        log_info(f"[ApplicantBackfill] Concluído: {summary}")
+        return summary
+
+    def _process_block(self, block, summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Embeddings em lote; linhas prontas para upsert_applicants"""
+        pairs = [(row, self.semantic_service.cv_json_to_text(row.cv_pt_json)) for row in block]
+        # CV sem experiências/formações/habilidades/idiomas: texto vazio derrubaria o lote inteiro na API
+        summary["falhas_embedding"] += sum(1 for _, text in pairs if not text)
+        pairs = [(row, text) for row, text in pairs if text]
+        rows = []
+        for offset in range(0, len(pairs), APPLICANT_BACKFILL_EMBEDDING_SIZE):
+            chunk = pairs[offset:offset + APPLICANT_BACKFILL_EMBEDDING_SIZE]
+            try:
+                with llm_call_site("cv_embedding"):
+                    embeddings = self.semantic_service.embedding_client.generate_embeddings(
+                        [text for _, text in chunk], label=f"cv_backfill_{chunk[0][0].id}"
+                    )
+            except Exception as e:
+                log_error(f"[ApplicantBackfill] Erro ao gerar embeddings a partir do candidato {chunk[0][0].id}: {e}")
+                embeddings = [None] * len(chunk)
+
+            for (row, text), embedding in zip(chunk, embeddings):
+                if embedding is None:
+                    summary["falhas_embedding"] += 1
+                    continue
+                rows.append(ApplicantRepository.build_row(
+                    {"id": row.id},
+                    row.cv_pt_json,
+                    row.nivel_maximo_formacao,
+                    cv_texto_semantico=text,
+                    cv_embedding=embedding.tobytes(),
+                    cv_embedding_vector=embedding.tolist()
+                ))
+        return rows
@@ -18,7 +18,7 @@ class ApplicantProcessingOrchestrator:
             log_info(f"[Orchestrator] CV processing completed for applicant {applicant_id}")
         except Exception as e:
             log_error(f"[Orchestrator] Error in CV processing for applicant {applicant_id}: {e}")
-            return
+            raise
         
         # ETAPA 2: Gerar embedding (OPCIONAL - comentado por performance)
         semantic_service = CVSemanticService()
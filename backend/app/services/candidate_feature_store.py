@@ -0,0 +1,282 @@
+"""
+Store colunar (NumPy) das features de candidatos usadas pelos filtros do chat.
+
+Os filtros de idioma e habilidade percorriam o cv_pt_json decodificado de cada
+candidato do pool. Aqui as features da base inteira ficam em colunas:
+
+- ids: int64 ordenados (posição = linha das demais colunas);
+- education: rank de nivel_maximo_formacao (education_level_order, -1 se desconhecido);
+- language_levels: matriz (candidatos x idiomas) uint8, um bit por nível que o
+  candidato declarou naquele idioma (LEVEL_BITS; OTHER_LEVEL para níveis fora da
+  hierarquia, ex: "nativo");
+- skills: vocabulário internado (skills canônicas, app.core.skill_taxonomy) + postings CSR
+  (skill_indptr[i]:skill_indptr[i+1] são os ids das skills da linha i).
+
+Cada filtro vira uma máscara booleana sobre a base inteira. A primeira
+consulta lê idiomas/habilidades de todos os candidatos; depois refresh() só
+busca as linhas com updated_at >= último visto (no máximo a cada
+CANDIDATE_FEATURES_REFRESH_SECONDS). Se o total de linhas no banco não bater
+com o do store (remoções, updated_at nulo), a carga é completa de novo.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.logging import log_info, log_error
+from app.core.skill_taxonomy import canonical_skill, canonicalize_skills, skill_matches
+from app.services.cv_extractor_service import education_level_order
+
+CANDIDATE_FEATURE_STORE = os.getenv("CANDIDATE_FEATURE_STORE", "true").lower() == "true"
+CANDIDATE_FEATURES_REFRESH_SECONDS = int(os.getenv("CANDIDATE_FEATURES_REFRESH_SECONDS", 60))
+
+# Um bit por nível; a hierarquia é a mesma de SemanticCandidateService._filter_by_languages
+LEVEL_BITS = {
+    'básico': 1, 'basico': 1,
+    'intermediário': 2, 'intermediario': 2,
+    'avançado': 4, 'avancado': 4,
+    'fluente': 8,
+}
+OTHER_LEVEL = 16
+# Bits aceitos por nível mínimo quando incluir_superiores=True
+LEVELS_AT_LEAST = {level: sum(b for b in set(LEVEL_BITS.values()) if b >= bit) for level, bit in LEVEL_BITS.items()}
+
+EDUCATION_RANK = {level.lower(): rank for level, rank in education_level_order.items()}
+
+ENGLISH_NAMES = ('ingles', 'inglês', 'english')
+
+_FEATURES_QUERY = """SELECT pa.id, pa.nivel_maximo_formacao, pa.updated_at,
+       pa.cv_pt_json->'idiomas' AS idiomas,
+       pa.cv_pt_json->'habilidades' AS habilidades
+FROM processed_applicants pa"""
+
+
+def normalize_language(name) -> str:
+    name = str(name or '').strip().lower()
+    return 'inglês' if name in ENGLISH_NAMES else name
+
+
+# Linha do store antes de virar coluna: (rank de formação, {idioma: bits de nível}, skills)
+_Record = Tuple[int, Dict[str, int], Tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class FeatureColumns:
+    """Snapshot imutável das colunas; trocado inteiro a cada refresh"""
+    ids: np.ndarray
+    education: np.ndarray
+    languages: Tuple[str, ...]
+    language_levels: np.ndarray
+    skills: Tuple[str, ...]
+    skill_indptr: np.ndarray
+    skill_indices: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, candidate_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(linha de cada id, se o id está no store)"""
+        wanted = np.asarray(candidate_ids, dtype=np.int64)
+        if not len(self.ids):
+            return np.zeros(len(wanted), dtype=np.int64), np.zeros(len(wanted), dtype=bool)
+        rows = np.minimum(np.searchsorted(self.ids, wanted), len(self.ids) - 1)
+        return rows, self.ids[rows] == wanted
+
+    def language_mask(self, requirements: Iterable) -> Optional[np.ndarray]:
+        """
+        Candidatos que atendem a PELO MENOS UM requisito de idioma
+
+        Mesmas regras de _filter_by_languages: nome do idioma casa por substring
+        nos dois sentidos; sem nível basta ter o idioma. None se algum nível
+        pedido não puder ser expresso nos bits (o chamador usa o filtro em Python).
+        """
+        mask = np.zeros(len(self.ids), dtype=bool)
+        for requirement in requirements:
+            if isinstance(requirement, dict) and requirement.get('idioma'):
+                required = normalize_language(requirement.get('idioma'))
+                level = str(requirement.get('nivel_minimo', '') or '').strip().lower()
+                include_higher = requirement.get('incluir_superiores', True)
+            elif isinstance(requirement, str):
+                required, level, include_higher = normalize_language(requirement), '', True
+            else:
+                continue
+
+            if not level:
+                accepted = 0xFF
+            elif level not in LEVEL_BITS:
+                return None
+            else:
+                accepted = LEVELS_AT_LEAST[level] if include_higher else LEVEL_BITS[level]
+
+            columns = [
+                i for i, name in enumerate(self.languages)
+                if required in name or name in required
+            ]
+            if columns:
+                held = np.bitwise_or.reduce(self.language_levels[:, columns], axis=1)
+                mask |= (held & accepted) != 0
+        return mask
+
+    def skill_mask(self, required_skills: Iterable[str]) -> np.ndarray:
+        """Candidatos com PELO MENOS UMA das skills pedidas (comparadas na forma canônica)"""
+        terms = [canonical_skill(skill) for skill in required_skills]
+        terms = [term for term in terms if term]
+        # Casamento sobre o vocabulário (pequeno), não sobre cada candidato
+        wanted = np.zeros(len(self.skills), dtype=bool)
+        for index, skill in enumerate(self.skills):
+            if any(skill_matches(term, skill) for term in terms):
+                wanted[index] = True
+        hits = np.concatenate(([0], np.cumsum(wanted[self.skill_indices], dtype=np.int64)))
+        return hits[self.skill_indptr[1:]] > hits[self.skill_indptr[:-1]]
+
+    def education_mask(self, minimum_level: str) -> Optional[np.ndarray]:
+        """Candidatos com formação máxima >= minimum_level; None se o nível não for conhecido"""
+        rank = EDUCATION_RANK.get(str(minimum_level or '').strip().lower())
+        if rank is None:
+            return None
+        return self.education >= rank
+
+
+def _build_columns(records: Dict[int, _Record]) -> FeatureColumns:
+    ids = np.fromiter(sorted(records), dtype=np.int64, count=len(records))
+    languages = sorted({name for _, levels, _ in records.values() for name in levels})
+    language_index = {name: i for i, name in enumerate(languages)}
+    skills = sorted({skill for _, _, names in records.values() for skill in names})
+    skill_index = {skill: i for i, skill in enumerate(skills)}
+
+    education = np.empty(len(ids), dtype=np.int8)
+    language_levels = np.zeros((len(ids), len(languages)), dtype=np.uint8)
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    indices: List[int] = []
+    for row, candidate_id in enumerate(ids.tolist()):
+        rank, levels, names = records[candidate_id]
+        education[row] = rank
+        for name, bits in levels.items():
+            language_levels[row, language_index[name]] = bits
+        indices.extend(skill_index[skill] for skill in names)
+        indptr[row + 1] = len(indices)
+
+    return FeatureColumns(
+        ids=ids,
+        education=education,
+        languages=tuple(languages),
+        language_levels=language_levels,
+        skills=tuple(skills),
+        skill_indptr=indptr,
+        skill_indices=np.asarray(indices, dtype=np.int32)
+    )
+
+
+def _record_from_row(row) -> _Record:
+    levels: Dict[str, int] = {}
+    for entry in row.idiomas or []:
+        if not isinstance(entry, dict):
+            continue
+        name = normalize_language(entry.get('idioma'))
+        if not name:
+            continue
+        level = str(entry.get('nivel', '') or '').strip().lower()
+        levels[name] = levels.get(name, 0) | LEVEL_BITS.get(level, OTHER_LEVEL)
+
+    names = tuple(sorted(canonicalize_skills(row.habilidades or [])))
+    rank = EDUCATION_RANK.get(str(row.nivel_maximo_formacao or '').strip().lower(), -1)
+    return rank, levels, names
+
+
+class CandidateFeatureStore:
+    """Features da base de candidatos em colunas NumPy (um store por processo)"""
+
+    def __init__(self, refresh_seconds: int = CANDIDATE_FEATURES_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.columns: Optional[FeatureColumns] = None
+        self._records: Dict[int, _Record] = {}
+        self._watermark: Optional[datetime] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session, force: bool = False) -> Optional[FeatureColumns]:
+        """Atualiza as colunas se necessário e devolve o snapshot atual (None se nunca carregou)"""
+        if not force and self._checked_at is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return self.columns
+        with self._lock:
+            if not force and self._checked_at is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+                return self.columns
+            try:
+                if self.columns is None or force:
+                    self._full_load(db)
+                else:
+                    self._incremental_load(db)
+            except Exception as e:
+                log_error(f"[CandidateFeatures] Falha ao atualizar features: {str(e)}")
+            self._checked_at = time.monotonic()
+        return self.columns
+
+    def _full_load(self, db: Session) -> None:
+        start = time.time()
+        records: Dict[int, _Record] = {}
+        watermark = None
+        for row in db.execute(text(_FEATURES_QUERY)):
+            records[row.id] = _record_from_row(row)
+            if row.updated_at is not None and (watermark is None or row.updated_at > watermark):
+                watermark = row.updated_at
+        self._records = records
+        self._watermark = watermark
+        self.columns = _build_columns(records)
+        log_info(
+            f"[CandidateFeatures] Carga completa: {len(records)} candidatos, "
+            f"{len(self.columns.skills)} skills, {len(self.columns.languages)} idiomas "
+            f"em {time.time() - start:.2f}s"
+        )
+
+    def _incremental_load(self, db: Session) -> None:
+        total = db.execute(text("SELECT COUNT(*) FROM processed_applicants")).scalar()
+        if self._watermark is None:
+            if total != len(self._records):
+                self._full_load(db)
+            return
+
+        # >= para não perder linhas gravadas no mesmo instante da última carga
+        rows = db.execute(
+            text(f"{_FEATURES_QUERY} WHERE pa.updated_at >= :since"),
+            {"since": self._watermark}
+        ).fetchall()
+        records = dict(self._records)
+        watermark = self._watermark
+        changed = 0
+        for row in rows:
+            record = _record_from_row(row)
+            if records.get(row.id) != record:
+                records[row.id] = record
+                changed += 1
+            if row.updated_at > watermark:
+                watermark = row.updated_at
+
+        if total != len(records):
+            # Remoções ou linhas sem updated_at: só a carga completa enxerga
+            self._full_load(db)
+            return
+        self._watermark = watermark
+        if changed:
+            self._records = records
+            self.columns = _build_columns(records)
+            log_info(f"[CandidateFeatures] {changed} candidato(s) atualizados")
+
+
+_store: Optional[CandidateFeatureStore] = None
+_store_lock = threading.Lock()
+
+
+def get_candidate_feature_store() -> CandidateFeatureStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CandidateFeatureStore()
+    return _store
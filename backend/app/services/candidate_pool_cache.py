@@ -0,0 +1,131 @@
+"""
+Cache por workbook do pool de candidatos ranqueado pela busca semântica.
+
+Cada filtro do chat fazia a consulta vetorial do pool (até 1000+ linhas), as
+buscas de prospects e a decodificação do cv_pt_json. O pool decodificado fica
+aqui e é reaproveitado enquanto:
+
+- os match_prospects do workbook forem os mesmos (ids e seleção, conferidos a
+  cada filtro com uma consulta leve, o que vale também entre workers);
+- a vaga e o tamanho do pool atenderem ao pedido;
+- não passar CANDIDATE_POOL_TTL segundos (novos CVs e reprocessamento da vaga).
+
+O pool guarda também o último filtro aplicado e os candidatos que passaram. Se o
+filtro seguinte só acrescenta restrições ao anterior (como os passos
+incrementais de FilterHistory), ele é aplicado apenas a esses candidatos.
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.logging import log_info
+
+CANDIDATE_POOL_TTL = int(os.getenv("CANDIDATE_POOL_TTL", 300))
+CANDIDATE_POOL_CACHE_SIZE = int(os.getenv("CANDIDATE_POOL_CACHE_SIZE", 20))
+
+# (applicant_id, selecionado) de todos os match_prospects do workbook
+ProspectsVersion = FrozenSet[Tuple[int, bool]]
+
+# (filtros aplicados, ids não selecionados que passaram) de uma mesma requisição
+FilterResult = Tuple[Dict[str, Any], FrozenSet[int]]
+
+
+@dataclass
+class CandidatePool:
+    """Pool ranqueado (distância ASC) já decodificado, sem os prospects não selecionados"""
+    vaga_id: int
+    pool_size: int
+    prospects_version: ProspectsVersion
+    candidates: List[Dict[str, Any]]
+    created_at: float = field(default_factory=time.monotonic)
+    # Último filtro aplicado e ids que passaram: um único par, trocado inteiro sob o
+    # lock do cache para requisições concorrentes não misturarem filtros e ids
+    last_filter: Optional[FilterResult] = None
+
+
+def narrows(previous: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    """
+    True se current mantém todas as restrições de previous (e talvez acrescente outras)
+
+    Cada filtro presente em previous precisa estar igual em current; assim o
+    resultado de current está contido no de previous.
+    """
+    return all(current.get(key) == value for key, value in previous.items() if value)
+
+
+class CandidatePoolCache:
+    """LRU de pools por workbook (um por processo)"""
+
+    def __init__(self, max_workbooks: int = CANDIDATE_POOL_CACHE_SIZE, ttl_seconds: int = CANDIDATE_POOL_TTL):
+        self.max_workbooks = max_workbooks
+        self.ttl_seconds = ttl_seconds
+        self._pools: "OrderedDict[str, CandidatePool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        workbook_id,
+        vaga_id: int,
+        pool_size: int,
+        prospects_version: ProspectsVersion
+    ) -> Optional[CandidatePool]:
+        key = str(workbook_id)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                return None
+            if (
+                time.monotonic() - pool.created_at > self.ttl_seconds
+                or pool.vaga_id != vaga_id
+                or pool.pool_size < pool_size
+                or pool.prospects_version != prospects_version
+            ):
+                del self._pools[key]
+                return None
+            self._pools.move_to_end(key)
+            return pool
+
+    def put(self, workbook_id, pool: CandidatePool) -> None:
+        key = str(workbook_id)
+        with self._lock:
+            self._pools[key] = pool
+            self._pools.move_to_end(key)
+            while len(self._pools) > self.max_workbooks:
+                self._pools.popitem(last=False)
+
+    def record_filter(self, pool: CandidatePool, filters: Dict[str, Any], passed_ids) -> None:
+        """Guarda o resultado do filtro no pool (cópia dos filtros: o chamador pode alterá-los)"""
+        result = (copy.deepcopy(filters), frozenset(passed_ids))
+        with self._lock:
+            pool.last_filter = result
+
+    def last_filter(self, pool: CandidatePool) -> Optional[FilterResult]:
+        with self._lock:
+            return pool.last_filter
+
+    def invalidate(self, workbook_id) -> None:
+        with self._lock:
+            if self._pools.pop(str(workbook_id), None) is not None:
+                log_info(f"[CandidatePool] Pool do workbook {workbook_id} invalidado")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pools.clear()
+
+
+_cache: Optional[CandidatePoolCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_candidate_pool_cache() -> CandidatePoolCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CandidatePoolCache()
+    return _cache
@@ -0,0 +1,355 @@
+"""
+Extração de critérios de busca de candidatos sem passar pelo LLM quando possível.
+
+Ordem de tentativa para cada mensagem de filtro:
+
+1. Cache exato pelo texto normalizado (minúsculas, sem acentos e pontuação).
+2. Extrator por regras: mensagens formadas só por verbos de busca, números,
+   skills, idiomas/níveis e cidades conhecidas ("encontre 10 desenvolvedores
+   Python com inglês avançado"). Qualquer palavra fora desse vocabulário manda a
+   mensagem para o LLM.
+3. Quase-duplicata (opcional, CRITERIA_EMBEDDING_CACHE=true): similaridade de
+   cosseno entre o embedding da mensagem e os das frases já extraídas. Só vale
+   se os números e os termos do vocabulário forem os mesmos, para "10 ... inglês
+   avançado" não reaproveitar "5 ... inglês básico".
+4. LLM; o resultado válido entra no cache.
+
+Cada prompt de extração tem o seu extrator (get_criteria_extractor(scope)): o
+cache de um chamador nunca devolve critérios no formato do outro.
+"""
+
+import copy
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.keyword_automaton import fold_text
+from app.core.logging import log_info, log_error
+
+CRITERIA_CACHE_SIZE = int(os.getenv("CRITERIA_CACHE_SIZE", 1000))
+CRITERIA_EMBEDDING_CACHE = os.getenv("CRITERIA_EMBEDDING_CACHE", "false").lower() == "true"
+CRITERIA_CACHE_SIMILARITY = float(os.getenv("CRITERIA_CACHE_SIMILARITY", 0.95))
+
+# --- limite ("traga 6 candidatos", "busque 10") ---
+
+_LIMIT_PATTERNS = [
+    re.compile(r'\b(?:me\s+)?(?:traga|busque|filtre|quero|encontre)\s+(\d+)\s*candidatos?\b'),
+    re.compile(r'\b(\d+)\s*candidatos?\b'),
+    re.compile(r'\btraga\s+(\d+)\b'),
+    re.compile(r'\bbusque\s+(\d+)\b'),
+]
+
+
+def extract_limit(text: str) -> Optional[int]:
+    """Número de candidatos pedido no texto (1 a 100), por regex"""
+    text_lower = text.lower()
+    for pattern in _LIMIT_PATTERNS:
+        match = pattern.search(text_lower)
+        if match:
+            limit = int(match.group(1))
+            if 1 <= limit <= 100:  # Limite razoável
+                return limit
+    return None
+
+
+# --- vocabulário do extrator por regras (chaves já normalizadas por fold_text) ---
+
+SKILLS = {
+    'python': 'Python', 'java': 'Java', 'javascript': 'JavaScript', 'typescript': 'TypeScript',
+    'react': 'React', 'angular': 'Angular', 'vue': 'Vue', 'node': 'Node', 'nodejs': 'Node.js',
+    'php': 'PHP', 'ruby': 'Ruby', 'kotlin': 'Kotlin', 'swift': 'Swift', 'golang': 'Go',
+    'sql': 'SQL', 'oracle': 'Oracle', 'postgresql': 'PostgreSQL', 'mysql': 'MySQL', 'mongodb': 'MongoDB',
+    'aws': 'AWS', 'azure': 'Azure', 'gcp': 'GCP', 'docker': 'Docker', 'kubernetes': 'Kubernetes',
+    'linux': 'Linux', 'sap': 'SAP', 'abap': 'ABAP', 'salesforce': 'Salesforce', 'scrum': 'Scrum',
+    'spring': 'Spring', 'django': 'Django', 'flask': 'Flask', 'excel': 'Excel', 'power bi': 'Power BI',
+}
+
+LANGUAGES = {
+    'ingles': 'inglês', 'english': 'inglês', 'espanhol': 'espanhol', 'frances': 'francês',
+    'alemao': 'alemão', 'italiano': 'italiano', 'mandarim': 'mandarim', 'japones': 'japonês',
+}
+
+LEVELS = {
+    'basico': 'básico', 'intermediario': 'intermediário', 'avancado': 'avançado', 'fluente': 'fluente',
+}
+
+LOCATIONS = {
+    'sao paulo': 'São Paulo', 'sp': 'São Paulo', 'rio de janeiro': 'Rio de Janeiro', 'rio': 'Rio de Janeiro',
+    'rj': 'Rio de Janeiro', 'belo horizonte': 'Belo Horizonte', 'bh': 'Belo Horizonte',
+    'curitiba': 'Curitiba', 'porto alegre': 'Porto Alegre', 'campinas': 'Campinas', 'recife': 'Recife',
+    'salvador': 'Salvador', 'brasilia': 'Brasília', 'florianopolis': 'Florianópolis', 'fortaleza': 'Fortaleza',
+}
+
+# Palavras que não mudam os critérios: verbos de busca, quem é buscado e ligações
+FILLER_WORDS = set(
+    "me nos traga traz trazer busque buscar encontre encontrar mostre mostrar liste listar filtre filtrar "
+    "quero queria gostaria procure procurar selecione selecionar indique sugira recomende preciso de "
+    "por favor apenas somente so ate os as o a um uma uns umas "
+    "candidato candidatos candidata candidatas pessoa pessoas profissional profissionais perfil perfis "
+    "desenvolvedor desenvolvedores desenvolvedora desenvolvedoras dev devs programador programadores "
+    "analista analistas engenheiro engenheiros consultor consultores especialista especialistas "
+    "com e ou em de do da dos das no na nos nas para que tenham tenha saibam saiba conheca conhecam "
+    "falem fale saber conhecimento conhecimentos experiencia nivel partir minimo pelo menos "
+    "mora morem moram more".split()
+)
+
+_NUMBER = re.compile(r"^\d+$")
+
+
+def normalize_filter_text(text: str) -> str:
+    return fold_text(text).strip()
+
+
+def _tokens_with_phrases(normalized: str, vocabulary: Dict[str, str]) -> List[Tuple[str, Optional[str]]]:
+    """Tokens da mensagem, juntando expressões de mais de uma palavra do vocabulário ("sao paulo")"""
+    words = normalized.split()
+    result = []
+    i = 0
+    while i < len(words):
+        for size in (3, 2):
+            phrase = " ".join(words[i:i + size])
+            if len(words) - i >= size and phrase in vocabulary:
+                result.append((phrase, vocabulary[phrase]))
+                i += size
+                break
+        else:
+            result.append((words[i], vocabulary.get(words[i])))
+            i += 1
+    return result
+
+
+_VOCABULARY: Dict[str, str] = {
+    **{k: f"skill:{v}" for k, v in SKILLS.items()},
+    **{k: f"idioma:{v}" for k, v in LANGUAGES.items()},
+    **{k: f"nivel:{v}" for k, v in LEVELS.items()},
+    **{k: f"local:{v}" for k, v in LOCATIONS.items()},
+}
+
+
+def vocabulary_signature(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """(números, termos do vocabulário) da mensagem; quase-duplicatas precisam ter a mesma assinatura"""
+    tokens = _tokens_with_phrases(normalize_filter_text(text), _VOCABULARY)
+    numbers = tuple(token for token, _ in tokens if _NUMBER.match(token))
+    terms = tuple(sorted({term for _, term in tokens if term}))
+    return numbers, terms
+
+
+def extract_criteria_by_rules(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Critérios de mensagens simples, no formato de SearchCriteriaOutput
+
+    Devolve None quando alguma palavra não é reconhecida (o LLM decide) ou quando
+    a mensagem não tem nenhum critério.
+    """
+    tokens = _tokens_with_phrases(normalize_filter_text(text), _VOCABULARY)
+    limite = None
+    skills: List[str] = []
+    languages: List[Any] = []
+    location = None
+
+    for token, term in tokens:
+        if term is None:
+            if _NUMBER.match(token):
+                if limite is not None:
+                    return None  # Dois números: "10 candidatos com 5 anos" fica com o LLM
+                limite = int(token)
+                continue
+            if token in FILLER_WORDS:
+                continue
+            return None
+
+        kind, value = term.split(":", 1)
+        if kind == "skill":
+            if value not in skills:
+                skills.append(value)
+        elif kind == "idioma":
+            languages.append({"idioma": value, "nivel_minimo": None, "incluir_superiores": True})
+        elif kind == "nivel":
+            # Nível vale para o idioma mais próximo: "inglês avançado" ou "avançado em inglês"
+            pending = [lang for lang in languages if lang["nivel_minimo"] is None]
+            if pending:
+                pending[-1]["nivel_minimo"] = value
+            else:
+                languages.append({"idioma": None, "nivel_minimo": value, "incluir_superiores": True})
+        elif kind == "local":
+            if location is not None and location != value:
+                return None
+            location = value
+
+    # Nível antes do idioma ("fluente em inglês")
+    for i, lang in enumerate(languages):
+        if lang["idioma"] is None:
+            following = next((l for l in languages[i + 1:] if l["idioma"] and l["nivel_minimo"] is None), None)
+            if following is None:
+                return None
+            following["nivel_minimo"] = lang["nivel_minimo"]
+    languages = [
+        lang if lang["nivel_minimo"] else lang["idioma"]
+        for lang in languages if lang["idioma"]
+    ]
+
+    if limite is not None and not 1 <= limite <= 100:
+        return None
+    if limite is None and not (skills or languages or location):
+        return None
+
+    return {
+        "vaga_id": None,
+        "usar_similaridade": True,
+        "limite": limite,
+        "filtros": {
+            "idiomas": languages,
+            "habilidades": skills,
+            "formacao": {},
+            "experiencia": {},
+            "localizacao": location,
+            "sexo": None,
+            "outros": []
+        }
+    }
+
+
+class CriteriaExtractor:
+    """Cache exato + regras + quase-duplicatas por embedding na frente do LLM (um por processo)"""
+
+    def __init__(
+        self,
+        max_entries: int = CRITERIA_CACHE_SIZE,
+        use_embeddings: bool = CRITERIA_EMBEDDING_CACHE,
+        similarity: float = CRITERIA_CACHE_SIMILARITY,
+        embedding_client=None
+    ):
+        self.max_entries = max_entries
+        self.use_embeddings = use_embeddings
+        self.similarity = similarity
+        self._embedding_client = embedding_client
+        self._lock = threading.Lock()
+        # texto normalizado -> critérios (ordem LRU)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Frases já extraídas pelo LLM: matriz de embeddings normalizados + (texto, assinatura)
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._phrases: List[Tuple[str, Tuple]] = []
+
+    @property
+    def embedding_client(self):
+        if self._embedding_client is None:
+            from app.llm.embedding_client import get_embedding_client
+            self._embedding_client = get_embedding_client()
+        return self._embedding_client
+
+    def extract(self, text: str, llm_extract: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Critérios da mensagem; llm_extract só é chamado se cache e regras não resolverem
+
+        llm_extract devolve None quando a resposta do LLM é inválida (não vai para o cache).
+        """
+        key = normalize_filter_text(text)
+        cached = self._get(key)
+        if cached is not None:
+            log_info(f"[CriteriaCache] Cache hit: '{key}'")
+            return cached
+
+        criteria = extract_criteria_by_rules(text)
+        if criteria is not None:
+            log_info(f"[CriteriaCache] Critérios por regras: {criteria}")
+            self._put(key, criteria)
+            return copy.deepcopy(criteria)
+
+        vector = None
+        signature = vocabulary_signature(text)
+        if self.use_embeddings:
+            vector = self._embed(text)
+            similar = self._find_similar(vector, signature) if vector is not None else None
+            if similar is not None:
+                log_info(f"[CriteriaCache] Quase-duplicata de '{similar}'")
+                criteria = self._get(similar)
+                if criteria is not None:
+                    self._put(key, criteria)
+                    return criteria
+
+        criteria = llm_extract(text)
+        if criteria is None:
+            return None
+        self._put(key, criteria)
+        if vector is not None:
+            self._add_phrase(key, signature, vector)
+        return copy.deepcopy(criteria)
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            criteria = self._cache.get(key)
+            if criteria is None:
+                return None
+            self._cache.move_to_end(key)
+        return copy.deepcopy(criteria)
+
+    def _put(self, key: str, criteria: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[key] = copy.deepcopy(criteria)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            vector = self.embedding_client.generate_embedding(text, label="criteria_cache")
+        except Exception as e:
+            log_error(f"[CriteriaCache] Falha no embedding: {e}")
+            return None
+        if vector is None:
+            return None
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _find_similar(self, vector: np.ndarray, signature: Tuple) -> Optional[str]:
+        with self._lock:
+            if not self._phrases or self._vectors.shape[1] != vector.shape[0]:
+                return None
+            similarities = self._vectors @ vector
+            for index in np.argsort(similarities)[::-1]:
+                if similarities[index] < self.similarity:
+                    return None
+                phrase, phrase_signature = self._phrases[index]
+                if phrase_signature == signature:
+                    return phrase
+        return None
+
+    def _add_phrase(self, key: str, signature: Tuple, vector: np.ndarray) -> None:
+        with self._lock:
+            if self._phrases and self._vectors.shape[1] != vector.shape[0]:
+                # Modelo de embedding trocado: recomeça o índice
+                self._vectors = np.zeros((0, vector.shape[0]), dtype=np.float32)
+                self._phrases = []
+            if not self._phrases:
+                self._vectors = vector[np.newaxis, :]
+            else:
+                self._vectors = np.vstack([self._vectors, vector])
+            self._phrases.append((key, signature))
+            # Mantém só as frases mais recentes (mesmo limite do cache exato)
+            if len(self._phrases) > self.max_entries:
+                self._vectors = self._vectors[-self.max_entries:]
+                self._phrases = self._phrases[-self.max_entries:]
+
+
+# Um extrator por prompt: cada chamador guarda no cache o formato que o seu LLM devolve
+CRITERIA_SCOPE_CANDIDATES = "candidate_search"
+CRITERIA_SCOPE_VAGA_FILTER = "vaga_filter"
+
+_extractors: Dict[str, CriteriaExtractor] = {}
+_extractor_lock = threading.Lock()
+
+
+def get_criteria_extractor(scope: str = CRITERIA_SCOPE_CANDIDATES) -> CriteriaExtractor:
+    """Extrator compartilhado pelo processo para o scope (o cache sobrevive às requisições)"""
+    extractor = _extractors.get(scope)
+    if extractor is None:
+        with _extractor_lock:
+            extractor = _extractors.get(scope)
+            if extractor is None:
+                extractor = _extractors[scope] = CriteriaExtractor()
+    return extractor
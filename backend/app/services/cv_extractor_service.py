@@ -5,8 +5,17 @@ from datetime import datetime
 import os
 
 from app.core.config import settings
+from app.core.skill_taxonomy import dedupe_skills
+from app.core.text_normalization import fix_letter_spacing
 from app.services.prompt_builder import build_prompt
 from app.llm.factory import get_llm_client
+from app.llm.rate_limiter import llm_call_site
+from app.services.extraction_retry import (
+    ExtractionError,
+    RetryBudget,
+    extract_with_retry,
+    record_dead_letter
+)
 
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 5000))
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
@@ -18,18 +27,6 @@ education_level_order = {
 }
 
 VALID_LANGUAGE_LEVELS = {"básico", "intermediário", "avançado", "fluente", "nativo"}
-MAX_RETRIES = 10
-
-
-def remove_ansi(text):
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    return ansi_escape.sub('', text)
-
-
-def fix_letter_spacing(text):
-    def fix_line(line):
-        return re.sub(r'((?:[A-Za-zÀ-ÿ]\s){3,}[A-Za-zÀ-ÿ])', lambda m: m.group(0).replace(' ', ''), line)
-    return '\n'.join(fix_line(l) for l in text.splitlines())
 
 
 def split_chunks(text, size=CHUNK_SIZE):
@@ -50,16 +47,19 @@ def remove_duplicates(lst, keys):
     return uniques
 
 
-def extract_section(applicant_id, section_name, schema_snippet, cv_text):
+def extract_section(applicant_id, section_name, schema_snippet, cv_text, budget=None):
     """
     Extrai do LLM (Ollama ou DeepSeek) a seção do CV, com retry e deduplicação.
+
+    As novas tentativas seguem a política de app.services.extraction_retry e consomem
+    o orçamento `budget` do candidato; chunks que a esgotam vão para o dead letter.
     """
     cv_text = fix_letter_spacing(cv_text)
-    prompt_base = build_prompt(section_name, schema_snippet, cv_text)
     chunks = split_chunks(cv_text)
     seen = set()
     result = []
     llm = get_llm_client()
+    budget = budget or RetryBudget()
 
     for idx, chunk in enumerate(chunks, start=1):
         key = hash(chunk)
@@ -67,32 +67,16 @@ def extract_section(applicant_id, section_name, schema_snippet, cv_text):
         seen.add(key)
         print(f"🧩 Chunk {idx}/{len(chunks)} length={len(chunk)}")
 
-        for attempt in range(1, MAX_RETRIES+1):
-            try:
-                # extrai via cliente genérico
-                parsed = llm.extract_section(section_name, prompt_base)
-                if isinstance(parsed, dict) and parsed.get("error"):
-                    raise ValueError(parsed["error"])
-
-                # ajusta lista
-                if isinstance(parsed, list):
-                    parsed = {section_name: parsed}
-
-                # campo especial para 'experiencias'
-                if section_name == "experiencias":
-                    for exp in parsed.get("experiencias", []):
-                        if "data_fim" in exp: exp["fim"] = exp.pop("data_fim")
-                        if "data fim" in exp: exp["fim"] = exp.pop("data fim")
-                        if "data_inicio" in exp: exp["inicio"] = exp.pop("data_inicio")
-                        if "data inicio" in exp: exp["inicio"] = exp.pop("data inicio")
-
-                result.extend(parsed.get(section_name, []))
-                break
-
-            except Exception as e:
-                print(f"⚠️ Erro {section_name} chunk {idx} tentativa {attempt}: {e}")
-                if attempt == MAX_RETRIES:
-                    print(f"❌ Falha definitiva no chunk {idx}")
+        try:
+            with llm_call_site(f"extraction:{section_name}"):
+                items = extract_with_retry(llm, section_name, build_prompt(section_name, schema_snippet, chunk), budget)
+        except ExtractionError as e:
+            print(f"❌ Falha definitiva {section_name} chunk {idx} ({e.kind}, {e.attempts} tentativa(s)): {e.message}")
+            if applicant_id is not None:
+                record_dead_letter(applicant_id, section_name, idx, e)
+            continue
+
+        result.extend(items)
 
     # dedupe conforme seção
     if section_name == "formacoes":
@@ -102,11 +86,22 @@ def extract_section(applicant_id, section_name, schema_snippet, cv_text):
     elif section_name == "idiomas":
         result = remove_duplicates(result, ["idioma","nivel"])
     elif section_name == "habilidades":
-        result = list(set(item.strip() for item in result if isinstance(item,str)))
+        result = dedupe_skills(result)
 
     return {section_name: result}
 
 
+def resolve_dead_letters(applicant_id):
+    """Candidato extraído sem falhas: marca as falhas anteriores como resolvidas"""
+    from app.core.database import SessionLocal
+    from app.repositories.extraction_dead_letter_repository import ExtractionDeadLetterRepository
+    try:
+        with SessionLocal() as db:
+            ExtractionDeadLetterRepository(db).resolve_applicant(applicant_id)
+    except Exception as e:
+        print(f"⚠️ Falha ao resolver dead letters {applicant_id}: {e}")
+
+
 def merge_results(forms, exps, skills, langs):
     return {
         "formacoes": forms.get("formacoes", []),
@@ -136,10 +131,17 @@ def process_single_applicant(app):
       "idiomas": json.dumps({"idiomas":[{"idioma":"","nivel":""}]},ensure_ascii=False)
     }
 
-    forms = extract_section(cid,"formacoes",schemas["formacoes"],txt)
-    exps = extract_section(cid,"experiencias",schemas["experiencias"],txt)
-    sks  = extract_section(cid,"habilidades",schemas["habilidades"],txt)
-    lgs  = extract_section(cid,"idiomas",schemas["idiomas"],txt)
+    # orçamento de novas tentativas compartilhado pelas 4 seções
+    budget = RetryBudget()
+    forms = extract_section(cid,"formacoes",schemas["formacoes"],txt,budget)
+    exps = extract_section(cid,"experiencias",schemas["experiencias"],txt,budget)
+    sks  = extract_section(cid,"habilidades",schemas["habilidades"],txt,budget)
+    lgs  = extract_section(cid,"idiomas",schemas["idiomas"],txt,budget)
+
+    if budget.failures:
+        print(f"⚠️ {len(budget.failures)} chunk(s) com falha definitiva {cid} (registrados no dead letter)")
+    else:
+        resolve_dead_letters(cid)
 
     if not (forms and exps and sks and lgs): print(f"⚠️ Extração incompleta {cid}"); return None
 
@@ -1,5 +1,6 @@
 import numpy as np
 from app.llm.embedding_client import get_embedding_client
+from app.llm.rate_limiter import llm_call_site
 
 class CVSemanticService:
     def __init__(self):
@@ -40,7 +41,8 @@ class CVSemanticService:
     def process(self, cv_json):
         try:
             text = self.cv_json_to_text(cv_json)
-            embedding = self.embedding_client.generate_embedding(text, label="cv_semantic")
+            with llm_call_site("cv_embedding"):
+                embedding = self.embedding_client.generate_embedding(text, label="cv_semantic")
             if embedding is not None:
                 return {
                     "cv_texto_semantico": text,
@@ -0,0 +1,194 @@
+"""
+Política de retry da extração de seções do CV.
+
+Cada falha é classificada (timeout, JSON malformado, violação de schema, resposta
+vazia, erro de API) e cada classe tem um limite próprio de novas tentativas por
+chunk. Todas as novas tentativas de um candidato consomem um orçamento comum
+(EXTRACTION_RETRY_BUDGET), o que limita o custo de um CV problemático a poucas
+chamadas em vez de dezenas. JSON malformado passa antes pelo reparo local de
+app.llm.json_parser e os itens são validados pelos modelos de app.schemas.llm_outputs;
+só se isso falhar o LLM é chamado de novo, com o erro e a resposta anterior no prompt.
+
+Chunks que esgotam a política vão para a tabela extraction_dead_letters.
+"""
+
+import json
+import os
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import openai
+from pydantic import ValidationError
+
+from app.core.logging import log_warning, log_error
+from app.llm.http_clients import backoff_delay
+from app.llm.json_parser import JSONParseError, parse_llm_json
+from app.schemas.llm_outputs import SECTION_ITEM_ADAPTERS
+
+TIMEOUT = "timeout"
+MALFORMED_JSON = "malformed_json"
+SCHEMA_VIOLATION = "schema_violation"
+EMPTY_RESULT = "empty_result"
+API_ERROR = "api_error"
+
+# Novas tentativas permitidas por chunk para cada classe de erro.
+# Timeout não é repetido por padrão: a chamada já consumiu o timeout inteiro (até 300s).
+RETRY_LIMITS = {
+    TIMEOUT: int(os.getenv("EXTRACTION_TIMEOUT_RETRIES", 0)),
+    MALFORMED_JSON: int(os.getenv("EXTRACTION_MALFORMED_JSON_RETRIES", 1)),
+    SCHEMA_VIOLATION: int(os.getenv("EXTRACTION_SCHEMA_RETRIES", 1)),
+    EMPTY_RESULT: int(os.getenv("EXTRACTION_EMPTY_RETRIES", 1)),
+    API_ERROR: int(os.getenv("EXTRACTION_API_ERROR_RETRIES", 1)),
+}
+
+# Total de novas tentativas por candidato, somando as 4 seções e todos os chunks
+EXTRACTION_RETRY_BUDGET = int(os.getenv("EXTRACTION_RETRY_BUDGET", 4))
+
+TIMEOUT_ERRORS = (subprocess.TimeoutExpired, httpx.TimeoutException, openai.APITimeoutError, TimeoutError)
+
+# Trecho da resposta anterior incluído no prompt de correção
+FIX_PROMPT_RESPONSE_CHARS = 2000
+
+
+class ExtractionError(Exception):
+    """Falha classificada de uma tentativa de extração"""
+
+    def __init__(self, kind: str, message: str, raw_response: Optional[str] = None, attempts: int = 0):
+        super().__init__(message)
+        self.kind = kind
+        self.message = message
+        self.raw_response = raw_response
+        self.attempts = attempts
+
+
+class RetryBudget:
+    """Orçamento de novas tentativas compartilhado pelas seções de um candidato"""
+
+    def __init__(self, total: int = EXTRACTION_RETRY_BUDGET):
+        self.remaining = total
+        self.failures: List[ExtractionError] = []
+
+    def consume(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+def classify_error(error: Exception) -> str:
+    if isinstance(error, ExtractionError):
+        return error.kind
+    if isinstance(error, TIMEOUT_ERRORS):
+        return TIMEOUT
+    if isinstance(error, json.JSONDecodeError):
+        return MALFORMED_JSON
+    return API_ERROR
+
+
+def parse_section(section_name: str, raw: Optional[str]) -> List[Any]:
+    """Converte a resposta bruta nos itens da seção ou levanta ExtractionError classificado"""
+    if not raw or not raw.strip():
+        raise ExtractionError(EMPTY_RESULT, "Resposta vazia do LLM", raw)
+
+    try:
+        parsed = parse_llm_json(raw)
+    except JSONParseError as e:
+        raise ExtractionError(MALFORMED_JSON, str(e), raw)
+
+    items = parsed if isinstance(parsed, list) else None
+    if isinstance(parsed, dict):
+        if parsed.get("error"):
+            raise ExtractionError(API_ERROR, str(parsed["error"]), raw)
+        items = parsed.get(section_name)
+    if not isinstance(items, list):
+        raise ExtractionError(SCHEMA_VIOLATION, f"JSON sem a lista '{section_name}'", raw)
+
+    # Itens inválidos são descartados; só é violação se nenhum item for aproveitável
+    adapter = SECTION_ITEM_ADAPTERS.get(section_name)
+    if adapter is None:
+        return items
+    valid = []
+    first_error = None
+    for item in items:
+        try:
+            value = adapter.validate_python(item)
+        except ValidationError as e:
+            first_error = first_error or e
+            continue
+        valid.append(value.model_dump() if hasattr(value, "model_dump") else value)
+    if items and not valid:
+        raise ExtractionError(
+            SCHEMA_VIOLATION,
+            f"Itens de '{section_name}' fora do schema: {first_error.errors()[0]['msg']}",
+            raw
+        )
+    return valid
+
+
+def build_fix_prompt(prompt: str, section_name: str, error: ExtractionError) -> str:
+    previous = (error.raw_response or "")[:FIX_PROMPT_RESPONSE_CHARS]
+    return (
+        f"{prompt}\n\n"
+        f"⚠️ A resposta anterior apresentou o erro: {error.message}\n"
+        f"Resposta recebida:\n{previous}\n\n"
+        f"Por favor, corrija e retorne apenas o JSON válido contendo a chave '{section_name}'."
+    )
+
+
+def extract_with_retry(llm, section_name: str, prompt: str, budget: RetryBudget) -> List[Any]:
+    """
+    Extrai os itens de uma seção aplicando a política de retry
+
+    Levanta ExtractionError (com attempts preenchido) quando o limite da classe
+    de erro ou o orçamento do candidato se esgota.
+    """
+    retries: Dict[str, int] = {}
+    attempts = 0
+    current_prompt = prompt
+    while True:
+        attempts += 1
+        raw = None
+        try:
+            raw = llm.extract_raw(current_prompt)
+            return parse_section(section_name, raw)
+        except Exception as e:
+            error = e if isinstance(e, ExtractionError) else ExtractionError(classify_error(e), str(e) or type(e).__name__, raw)
+
+        error.attempts = attempts
+        retries[error.kind] = retries.get(error.kind, 0) + 1
+        if retries[error.kind] > RETRY_LIMITS.get(error.kind, 0) or not budget.consume():
+            budget.failures.append(error)
+            raise error
+
+        log_warning(
+            f"[Extraction] {section_name}: {error.kind} ({error.message}); "
+            f"nova tentativa {attempts + 1}, orçamento restante {budget.remaining}"
+        )
+        if error.kind in (MALFORMED_JSON, SCHEMA_VIOLATION):
+            current_prompt = build_fix_prompt(prompt, section_name, error)
+        else:
+            current_prompt = prompt
+            if error.kind in (TIMEOUT, API_ERROR):
+                time.sleep(backoff_delay(retries[error.kind] - 1))
+
+
+def record_dead_letter(applicant_id, section_name: str, chunk_index: int, error: ExtractionError) -> None:
+    """Registra a falha definitiva; erros de banco não interrompem o processamento do CV"""
+    from app.core.database import SessionLocal
+    from app.repositories.extraction_dead_letter_repository import ExtractionDeadLetterRepository
+
+    try:
+        with SessionLocal() as db:
+            ExtractionDeadLetterRepository(db).record(
+                applicant_id=applicant_id,
+                section=section_name,
+                chunk_index=chunk_index,
+                error_kind=error.kind,
+                error_message=error.message,
+                raw_response=error.raw_response,
+                attempts=error.attempts
+            )
+    except Exception as e:
+        log_error(f"[Extraction] Falha ao registrar dead letter do candidato {applicant_id}: {e}")
@@ -0,0 +1,201 @@
+"""
+Fila durável de processamento em background (tabela processing_jobs).
+
+Antes, cada router tinha um ThreadPoolExecutor(max_workers=4) e um registry em
+memória: jobs se perdiam num restart/deploy, a vazão ficava presa ao processo
+da API e o controle de duplicidade só valia dentro de um processo. Agora:
+
+- a API só enfileira (enqueue_job) e responde com o id do job;
+- workers (backend/worker.py, quantos processos forem necessários) reservam o
+  próximo job com SELECT ... FOR UPDATE SKIP LOCKED, por prioridade e depois
+  pelo mais antigo;
+- falhas voltam para a fila com backoff exponencial até max_attempts e então
+  ficam 'failed' (POST /jobs/{id}/retry recoloca na fila);
+- o worker renova locked_at a cada JOB_HEARTBEAT_SECONDS; jobs 'running' sem
+  heartbeat há JOB_LOCK_TIMEOUT_SECONDS (worker morto) voltam para a fila, e o
+  worker antigo não consegue mais concluí-los (complete/fail exigem o lock);
+- o índice único parcial (kind, entity_id) garante um job ativo por entidade;
+- o payload (dados pessoais do candidato) é descartado quando o job conclui, e
+  jobs 'done'/'failed' saem da tabela após JOB_RETENTION_DAYS.
+"""
+
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.logging import log_info, log_warning, log_error
+from app.models.processing_job import ProcessingJob
+from app.repositories.processing_job_repository import ProcessingJobRepository
+
+JOB_POLL_SECONDS = int(os.getenv("JOB_POLL_SECONDS", 2))
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", 30))
+JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", 300))
+# Intervalo entre limpezas dos jobs antigos (JOB_RETENTION_DAYS) por worker
+JOB_PURGE_INTERVAL_SECONDS = int(os.getenv("JOB_PURGE_INTERVAL_SECONDS", 3600))
+# Workers dentro do processo da API (0 = só os processos de backend/worker.py)
+JOB_WORKERS_IN_API = int(os.getenv("JOB_WORKERS_IN_API", 0))
+
+JOB_APPLICANT = "applicant"
+JOB_VAGA = "vaga"
+JOB_VAGA_BATCH = "vaga_batch"
+
+# Maior roda primeiro: vaga nova bloqueia o recrutador; o lote pode esperar
+JOB_PRIORITIES = {
+    JOB_VAGA: 10,
+    JOB_APPLICANT: 0,
+    JOB_VAGA_BATCH: -10,
+}
+
+
+def _process_applicant(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    from app.services.applicant_processing_orchestrator import ApplicantProcessingOrchestrator
+
+    cv_text = payload.get("cv_pt") or ""
+    if len(cv_text.strip()) < 30:
+        log_warning(f"[JobQueue] Empty or too short CV for applicant {payload.get('id')}.")
+        return {"skipped": "cv_too_short"}
+    ApplicantProcessingOrchestrator().process_applicant(payload)
+    return None
+
+
+def _process_vaga(payload: Dict[str, Any]) -> None:
+    from app.services.vaga_processing_orchestrator import VagaProcessingOrchestrator
+
+    VagaProcessingOrchestrator().process_vaga(payload, payload["id"])
+
+
+def _process_vaga_batch(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.vaga_batch_processing_service import VagaBatchProcessingService
+
+    return VagaBatchProcessingService().run(force=payload.get("force", False), limit=payload.get("limit"))
+
+
+# kind -> handler(payload); o retorno (JSON) fica em processing_jobs.result
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    JOB_APPLICANT: _process_applicant,
+    JOB_VAGA: _process_vaga,
+    JOB_VAGA_BATCH: _process_vaga_batch,
+}
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Dict[str, Any],
+    entity_id: Optional[Any] = None,
+    priority: Optional[int] = None
+) -> Tuple[ProcessingJob, bool]:
+    """Enfileira um job; (job ativo existente, False) se a entidade já está na fila"""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return ProcessingJobRepository(db).enqueue(
+        kind,
+        payload,
+        entity_id=str(entity_id) if entity_id is not None else None,
+        priority=JOB_PRIORITIES.get(kind, 0) if priority is None else priority
+    )
+
+
+def job_to_dict(job: ProcessingJob) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "entity_id": job.entity_id,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after,
+        "locked_by": job.locked_by,
+        "last_error": job.last_error,
+        "result": job.result,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at
+    }
+
+
+class JobWorker:
+    """Loop de um worker: reserva, executa e registra o resultado de um job por vez"""
+
+    def __init__(self, worker_id: Optional[str] = None, kinds: Optional[Sequence[str]] = None, poll_seconds: int = JOB_POLL_SECONDS):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.kinds: Optional[List[str]] = list(kinds) if kinds else None
+        self.poll_seconds = poll_seconds
+        self._purged_at: Optional[float] = None
+
+    def run(self, stop_event: threading.Event) -> None:
+        log_info(f"[JobWorker] {self.worker_id} iniciado (kinds={self.kinds or 'todos'})")
+        while not stop_event.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                # Banco fora do ar etc.: espera e tenta de novo, sem derrubar o worker
+                log_error(f"[JobWorker] {self.worker_id} erro no loop: {e}")
+                processed = False
+            if not processed:
+                stop_event.wait(self.poll_seconds)
+        log_info(f"[JobWorker] {self.worker_id} encerrado")
+
+    def run_once(self) -> bool:
+        """Executa no máximo um job; False se a fila estava vazia"""
+        with SessionLocal() as db:
+            repository = ProcessingJobRepository(db)
+            repository.requeue_stale(JOB_LOCK_TIMEOUT_SECONDS)
+            job = repository.claim(self.worker_id, self.kinds)
+            if job is None:
+                # Fila vazia: momento de limpar os jobs antigos
+                if self._purged_at is None or time.monotonic() - self._purged_at >= JOB_PURGE_INTERVAL_SECONDS:
+                    self._purged_at = time.monotonic()
+                    repository.purge_finished()
+                return False
+
+            log_info(f"[JobWorker] {self.worker_id} executando job {job.id} ({job.kind} {job.entity_id or ''}, tentativa {job.attempts}/{job.max_attempts})")
+            handler = JOB_HANDLERS.get(job.kind)
+            payload = dict(job.payload)
+            # Encerra a transação de leitura: a conexão não fica presa enquanto o handler roda
+            db.commit()
+            stop_heartbeat = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(job.id, stop_heartbeat), daemon=True)
+            heartbeat.start()
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {job.kind}")
+                result = handler(payload)
+            except Exception as e:
+                log_error(f"[JobWorker] Job {job.id} ({job.kind}) falhou: {e}\n{traceback.format_exc()}")
+                repository.fail(job, self.worker_id, f"{type(e).__name__}: {e}")
+            else:
+                if repository.complete(job, self.worker_id, result):
+                    log_info(f"[JobWorker] Job {job.id} ({job.kind}) concluído")
+            finally:
+                stop_heartbeat.set()
+                heartbeat.join()
+        return True
+
+    def _heartbeat(self, job_id: int, stop: threading.Event) -> None:
+        """Sessão própria: a do job fica ociosa enquanto o handler roda"""
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                with SessionLocal() as db:
+                    ProcessingJobRepository(db).heartbeat(job_id, self.worker_id)
+            except Exception as e:
+                log_warning(f"[JobWorker] Falha no heartbeat do job {job_id}: {e}")
+
+
+def start_worker_threads(count: int, stop_event: threading.Event, kinds: Optional[Sequence[str]] = None) -> List[threading.Thread]:
+    """Sobe count workers em threads daemon (backend/worker.py e, opcionalmente, a API)"""
+    threads = []
+    for index in range(count):
+        worker = JobWorker(kinds=kinds)
+        thread = threading.Thread(target=worker.run, args=(stop_event,), name=f"job-worker-{index}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
@@ -2,7 +2,7 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 from app.models.match_prospect import MatchProspect
-from app.models.processed_applicant import ProcessedApplicant
+from app.models.processed_applicant import ProcessedApplicant, WITH_CV_LOAD
 from app.models.workbook import Workbook
 from app.models.vaga import Vaga
 from app.schemas.prospects_match import (
@@ -11,6 +11,8 @@ from app.schemas.prospects_match import (
     ProspectMatchByVagaResponse
 )
 from app.core.logging import log_info, log_error, log_warning
+from app.core.text_search import text_matches, text_similarity
+from app.repositories.match_prospect_repository import MatchProspectRepository
 import json
 import uuid
 
@@ -75,7 +77,7 @@ class ProspectsMatchService:
             vaga_titulo = vaga.informacoes_basicas_titulo_vaga if vaga else None
             
             # Buscar match_prospects com seus applicants relacionados
-            query = self.db.query(MatchProspect, ProcessedApplicant).join(
+            query = self.db.query(MatchProspect, ProcessedApplicant).options(*WITH_CV_LOAD).join(
                 ProcessedApplicant, 
                 MatchProspect.applicant_id == ProcessedApplicant.id
             ).filter(
@@ -120,27 +122,42 @@ class ProspectsMatchService:
             
             vaga_titulo = vaga.informacoes_basicas_titulo_vaga
             
-            # Buscar todos os workbooks desta vaga
-            workbooks = self.db.query(Workbook).filter(Workbook.vaga_id == vaga_id).all()
-            
-            if not workbooks:
-                log_warning(f"No workbooks found for job: {vaga_id}")
-                return None
-            
-            workbooks_data = []
-            total_prospects = 0
-            
-            for workbook in workbooks:
-                # Search prospects for each workbook
-                workbook_prospects = self.get_prospects_by_workbook_id(str(workbook.id))
-                if workbook_prospects:
-                    workbooks_data.append(workbook_prospects)
-                    total_prospects += workbook_prospects.total_prospects
+            # Uma única query para os prospects de todos os workbooks da vaga
+            results = self.db.query(Workbook.id, MatchProspect, ProcessedApplicant).options(*WITH_CV_LOAD).join(
+                MatchProspect,
+                MatchProspect.workbook_id == Workbook.id
+            ).join(
+                ProcessedApplicant,
+                MatchProspect.applicant_id == ProcessedApplicant.id
+            ).filter(
+                Workbook.vaga_id == vaga_id
+            ).order_by(
+                Workbook.criado_em, Workbook.id
+            ).all()
             
-            if not workbooks_data:
+            if not results:
                 log_warning(f"No prospects found for job: {vaga_id}")
                 return None
             
+            # Agrupa em memória por workbook, preservando a ordem dos workbooks
+            prospects_by_workbook: Dict[uuid.UUID, List[ApplicantProspectResponse]] = {}
+            for workbook_id, match_prospect, applicant in results:
+                prospects_by_workbook.setdefault(workbook_id, []).append(
+                    self._convert_to_applicant_prospect_response(match_prospect, applicant)
+                )
+            
+            workbooks_data = [
+                ProspectMatchByWorkbookResponse(
+                    workbook_id=str(workbook_id),
+                    vaga_id=vaga_id,
+                    vaga_titulo=vaga_titulo,
+                    prospects=prospects,
+                    total_prospects=len(prospects)
+                )
+                for workbook_id, prospects in prospects_by_workbook.items()
+            ]
+            total_prospects = len(results)
+            
             log_info(f"Found {total_prospects} total prospects for job {vaga_id} in {len(workbooks_data)} workbooks")
             
             return ProspectMatchByVagaResponse(
@@ -165,12 +182,15 @@ class ProspectsMatchService:
                 log_warning("Nome de busca muito curto (mínimo 2 caracteres)")
                 return []
             
-            # Buscar match_prospects com applicants cujo nome contenha o termo
-            query = self.db.query(MatchProspect, ProcessedApplicant).join(
+            # Busca por trigramas (sem acento/caixa), mais similares primeiro
+            query = self.db.query(MatchProspect, ProcessedApplicant).options(*WITH_CV_LOAD).join(
                 ProcessedApplicant, 
                 MatchProspect.applicant_id == ProcessedApplicant.id
             ).filter(
-                ProcessedApplicant.nome.ilike(f"%{name}%")
+                text_matches(ProcessedApplicant.nome, name)
+            ).order_by(
+                text_similarity(ProcessedApplicant.nome, name).desc(),
+                ProcessedApplicant.id
             ).limit(limit)
             
             results = query.all()
@@ -180,7 +200,7 @@ class ProspectsMatchService:
                 prospect_response = self._convert_to_applicant_prospect_response(match_prospect, applicant)
                 prospects_list.append(prospect_response)
             
-            log_info(f"Found {len(prospects_list)} prospects com nome contendo '{name}'")
+            log_info(f"Found {len(prospects_list)} prospects com nome similar a '{name}'")
             return prospects_list
             
         except Exception as e:
@@ -192,27 +212,8 @@ class ProspectsMatchService:
         Returns a summary list of all workbooks that have prospects
         """
         try:
-            # Buscar workbooks que têm match_prospects
-            query = self.db.query(
-                Workbook.id,
-                Workbook.vaga_id,
-                Vaga.informacoes_basicas_titulo_vaga,
-                self.db.query(MatchProspect).filter(
-                    MatchProspect.workbook_id == Workbook.id
-                ).count().label('prospects_count')
-            ).join(
-                Vaga, Workbook.vaga_id == Vaga.id
-            ).join(
-                MatchProspect, MatchProspect.workbook_id == Workbook.id
-            ).group_by(
-                Workbook.id, Workbook.vaga_id, Vaga.informacoes_basicas_titulo_vaga
-            ).having(
-                self.db.query(MatchProspect).filter(
-                    MatchProspect.workbook_id == Workbook.id
-                ).count() > 0
-            )
-            
-            results = query.all()
+            # GROUP BY em match_prospects (ou materialized view, se habilitada)
+            results = MatchProspectRepository(self.db).get_workbook_summaries()
             
             workbooks_summary = []
             for workbook_id, vaga_id, vaga_titulo, prospects_count in results:
@@ -284,26 +284,18 @@ class SemanticSearchService:
     def save_filtered_candidates(self, workbook_id: str, candidates: List[Dict]):
         """Salva candidatos filtrados como match_prospects"""
         try:
-            from app.models.match_prospect import MatchProspect
+            from app.repositories.match_prospect_repository import MatchProspectRepository
             
-            # Rinove match_prospects existentes
-            self.db.query(MatchProspect).filter(
-                MatchProspect.workbook_id == workbook_id
-            ).delete()
-            
-            # Adiciona novos match_prospects
-            for candidate in candidates:
-                match_prospect = MatchProspect(
-                    workbook_id=workbook_id,
-                    applicant_id=candidate['id'],
-                    score_semantico=candidate.get('score_semantico', 0.5),
-                    origem=candidate.get('origin', 'sql_query'),
-                    selecionado=False
-                )
-                self.db.add(match_prospect)
-            
-            self.db.commit()
-            log_info(f"Saved {len(candidates)} match_prospects via SQL para workbook {workbook_id}")
+            rows = [
+                {
+                    'applicant_id': candidate['id'],
+                    'score_semantico': candidate.get('score_semantico', 0.5),
+                    'origem': candidate.get('origin', 'sql_query')
+                }
+                for candidate in candidates
+            ]
+            summary = MatchProspectRepository(self.db).sync_workbook_prospects(workbook_id, rows)
+            log_info(f"Saved {len(candidates)} match_prospects via SQL para workbook {workbook_id}: {summary}")
             
         except Exception as e:
             log_error(f"Erro ao salvar match_prospects: {str(e)}")
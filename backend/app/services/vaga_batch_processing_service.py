@@ -0,0 +1,163 @@
+"""
+Reprocessamento em lote do texto semântico e do embedding das vagas.
+
+processar_vaga trata uma vaga por vez: uma chamada de LLM, um embedding e dois
+commits. Para regenerar milhares de vagas (ex: depois de mudar o prompt) este
+job:
+
+1. seleciona as vagas pelas mesmas regras de vaga_precisa_extrair, incluindo
+   as de vaga_fingerprint diferente do atual (prompt ou modelo mudou), ou todas
+   com force=True, lendo só id, fingerprint e os campos do prompt;
+2. gera os textos em paralelo, até VAGA_BATCH_CONCURRENCY chamadas de LLM ao
+   mesmo tempo (o RateLimiter dos clientes continua valendo);
+3. gera os embeddings em lotes de VAGA_BATCH_EMBEDDING_SIZE textos por chamada
+   (EmbeddingClient.generate_embeddings);
+4. grava texto + embedding com um UPDATE em lote por bloco de VAGA_BATCH_SIZE
+   vagas, com commit por bloco (o progresso não se perde se o job parar).
+
+Vagas sem os três campos preenchidos não geram texto e ficam como estão; vagas
+cujo texto ou embedding falhar também não são alteradas, para não apagar um
+embedding válido.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.logging import log_info, log_error
+from app.llm.rate_limiter import llm_call_site
+from app.models.vaga import Vaga
+from app.services.vaga_extractor_service import (
+    CAMPOS_RELEVANTES,
+    VagaExtractorService,
+    build_vaga_prompt,
+    embedding_columns,
+    model_id,
+    vaga_fingerprint
+)
+
+VAGA_BATCH_CONCURRENCY = int(os.getenv("VAGA_BATCH_CONCURRENCY", 8))
+VAGA_BATCH_EMBEDDING_SIZE = int(os.getenv("VAGA_BATCH_EMBEDDING_SIZE", 100))
+VAGA_BATCH_SIZE = int(os.getenv("VAGA_BATCH_SIZE", 200))
+
+
+class VagaBatchProcessingService:
+    """Job de reprocessamento de vagas em lote"""
+
+    def __init__(self, extractor: Optional[VagaExtractorService] = None, concurrency: int = VAGA_BATCH_CONCURRENCY):
+        self.extractor = extractor or VagaExtractorService()
+        self.concurrency = max(1, concurrency)
+
+    def select_vagas(self, db: Session, force: bool = False, vaga_ids: Optional[List[int]] = None, limit: Optional[int] = None):
+        """
+        Linhas (id, campos do prompt, vaga_fingerprint, pelas_regras) candidatas a reprocessar
+
+        pelas_regras: precisa de extração pelas regras de vaga_precisa_extrair sem
+        payload. Sem force, também vêm as vagas com fingerprint gravado, para
+        comparar com o atual em Python; fingerprint nulo (vaga anterior ao
+        fingerprint) não força reprocessamento aqui.
+        """
+        fields = [getattr(Vaga, campo) for campo in CAMPOS_RELEVANTES]
+        pelas_regras = or_(
+            *[func.coalesce(func.trim(field), '') == '' for field in fields],
+            Vaga.vaga_texto_semantico.is_(None),
+            Vaga.vaga_embedding.is_(None),
+            Vaga.vaga_embedding_vector.is_(None)
+        )
+        query = db.query(Vaga.id, *fields, Vaga.vaga_fingerprint, pelas_regras.label("pelas_regras"))
+        if vaga_ids:
+            query = query.filter(Vaga.id.in_(vaga_ids))
+        if not force:
+            query = query.filter(or_(pelas_regras, Vaga.vaga_fingerprint.isnot(None)))
+        query = query.order_by(Vaga.id)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def run(self, force: bool = False, vaga_ids: Optional[List[int]] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Reprocessa as vagas selecionadas e devolve o resumo"""
+        start = time.time()
+        with SessionLocal() as db:
+            vagas = self.select_vagas(db, force=force, vaga_ids=vaga_ids, limit=limit)
+
+        llm_model = model_id(self.extractor.llm_client)
+        embedding_model = model_id(self.extractor.embedding_client)
+
+        summary = {"selecionadas": 0, "atualizadas": 0, "incompletas": 0, "inalteradas": 0, "falhas_texto": 0, "falhas_embedding": 0}
+        complete = []
+        for vaga in vagas:
+            fingerprint = vaga_fingerprint(build_vaga_prompt(vaga), llm_model, embedding_model)
+            if fingerprint is None:
+                summary["incompletas"] += 1
+            elif force or vaga.pelas_regras or fingerprint != vaga.vaga_fingerprint:
+                complete.append((vaga, fingerprint))
+            else:
+                summary["inalteradas"] += 1
+        summary["selecionadas"] = len(complete)
+        log_info(
+            f"[VagaBatch] {len(complete)} vagas a reprocessar (force={force}), {summary['inalteradas']} inalteradas, "
+            f"{summary['incompletas']} sem campos completos; concorrência {self.concurrency}"
+        )
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for offset in range(0, len(complete), VAGA_BATCH_SIZE):
+                block = complete[offset:offset + VAGA_BATCH_SIZE]
+                rows = self._process_block(pool, block, summary)
+                if rows:
+                    self._write_back(rows)
+                    summary["atualizadas"] += len(rows)
+                log_info(f"[VagaBatch] {min(offset + len(block), len(complete))}/{len(complete)} vagas processadas")
+
+        summary["segundos"] = round(time.time() - start, 2)
+        log_info(f"[VagaBatch] Concluído: {summary}")
+        return summary
+
+    def _process_block(self, pool: ThreadPoolExecutor, block, summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Textos em paralelo + embeddings em lote; linhas prontas para o UPDATE"""
+        texts = list(pool.map(self.extractor.gerar_texto_semantico, [vaga for vaga, _ in block]))
+
+        generated = [(vaga, fingerprint, text) for (vaga, fingerprint), text in zip(block, texts) if text]
+        summary["falhas_texto"] += len(block) - len(generated)
+
+        rows = []
+        now = datetime.utcnow()
+        for offset in range(0, len(generated), VAGA_BATCH_EMBEDDING_SIZE):
+            chunk = generated[offset:offset + VAGA_BATCH_EMBEDDING_SIZE]
+            try:
+                with llm_call_site("vaga_embedding"):
+                    embeddings = self.extractor.embedding_client.generate_embeddings(
+                        [text for _, _, text in chunk], label=f"vagas_batch_{chunk[0][0].id}"
+                    )
+            except Exception as e:
+                log_error(f"[VagaBatch] Erro ao gerar embeddings a partir da vaga {chunk[0][0].id}: {e}")
+                embeddings = [None] * len(chunk)
+
+            for (vaga, fingerprint, text), embedding in zip(chunk, embeddings):
+                if embedding is None:
+                    summary["falhas_embedding"] += 1
+                    continue
+                rows.append({
+                    "id": vaga.id,
+                    "vaga_texto_semantico": text,
+                    "vaga_fingerprint": fingerprint,
+                    "updated_at": now,
+                    **embedding_columns(embedding)
+                })
+        return rows
+
+    def _write_back(self, rows: List[Dict[str, Any]]) -> None:
+        """UPDATE em lote por chave primária (executemany) e um commit"""
+        with SessionLocal() as db:
+            try:
+                db.execute(update(Vaga), rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                log_error(f"[VagaBatch] Erro ao gravar {len(rows)} vagas: {e}")
+                raise
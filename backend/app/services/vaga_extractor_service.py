@@ -1,18 +1,107 @@
 from typing import Dict, Any, Optional
+import hashlib
+import json
 from app.llm.factory import get_llm_client
 from app.llm.embedding_client import get_embedding_client
+from app.llm.rate_limiter import llm_call_site
 from app.models.vaga import Vaga
 from sqlalchemy.orm import Session
 import numpy as np
 from datetime import datetime
 from app.core.logging import log_info, log_error, log_warning
+from app.core.text_normalization import collapse_whitespace, strip_terminal_codes
+
+# Campos que alimentam o texto semântico da vaga
+CAMPOS_RELEVANTES = (
+    'perfil_vaga_areas_atuacao',
+    'perfil_vaga_principais_atividades',
+    'perfil_vaga_competencia_tecnicas_e_comportamentais',
+)
+
+
+def normalize_vaga_field(value) -> str:
+    """Campo do prompt sem espaços/quebras repetidos (mesmo texto -> mesmo prompt e fingerprint)"""
+    return collapse_whitespace(str(value or ''))
+
+
+def build_vaga_prompt(vaga) -> Optional[str]:
+    """Prompt do texto semântico; None se algum dos CAMPOS_RELEVANTES estiver vazio"""
+    areas, atividades, competencias = (normalize_vaga_field(getattr(vaga, campo)) for campo in CAMPOS_RELEVANTES)
+    if not (areas and atividades and competencias):
+        return None
+
+    return (
+        "Você é um especialista in RH e NLP. Sua tarefa é gerar uma descrição de vaga formal e objetiva, "
+        "com frases curtas e diretas, no mesmo estilo do exinplo abaixo:\n\n"
+        "Experiência como Especialista in SAP ABAP na inpresa IBM, de janeiro de 2020 até o momento. "
+        "Responsável por desenvolvimento e manutenção de sishasas SAP utilizando a linguagin ABAP. "
+        "Trabalhou in projetos de customização e integração de módulos SAP com foco técnico. "
+        "Formação acadêmica in Ciência da Computação. "
+        "Habilidades técnicas incluin: SAP ABAP, desenvolvimento de relatórios, user exits, enhancinent points, BAPI, performance tuning e debugging.\n\n"
+        "Com base nas informações abaixo, gere um novo parágrafo com o mesmo estilo. "
+        "Comece com 'Experiência como Desenvolvedor ABAP'. Use linguagin formal, sin copiar o exinplo literalmente:\n\n"
+        f"Área de atuação: {areas}\n"
+        f"Principais atividades: {atividades}\n"
+        f"Competências técnicas e comportamentais: {competencias}\n\n"
+        "Finalize com: 'Habilidades técnicas incluin: ...' preenchendo com as competências listadas, se houver. "
+        "Não use colchetes, datas fictícias, nomes de inpresa ou instruções no texto final. Gere um parágrafo limpo, direto e natural."
+    )
+
+
+def model_id(client) -> str:
+    """Identificação do modelo de um cliente LLM/embedding (entra no fingerprint)"""
+    return str(getattr(client, "model", None) or getattr(client, "model_name", None) or type(client).__name__)
+
+
+def vaga_fingerprint(prompt: Optional[str], llm_model: str, embedding_model: str) -> Optional[str]:
+    """
+    sha256 do prompt (campos normalizados + template) e dos modelos de texto e embedding
+
+    Igual ao vaga_fingerprint gravado => texto e embedding da vaga já correspondem a
+    esta entrada e a extração pode ser pulada.
+    """
+    if prompt is None:
+        return None
+    payload = json.dumps({"prompt": prompt, "llm": llm_model, "embedding": embedding_model}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def vaga_precisa_extrair(vaga, vaga_data: Optional[Dict[str, Any]] = None, fingerprint: Optional[str] = None) -> bool:
+    """
+    Se a vaga precisa de novo texto semântico/embedding
+
+    Com fingerprint: igual ao gravado (e texto/embedding existindo) dispensa a
+    extração; diferente de um fingerprint gravado (entrada, prompt ou modelo
+    mudou) exige. Fora isso: algum campo relevante veio preenchido no payload,
+    algum está vazio no banco ou falta texto/embedding.
+    """
+    tem_texto_e_embedding = (
+        vaga.vaga_texto_semantico is not None and
+        vaga.vaga_embedding is not None and
+        vaga.vaga_embedding_vector is not None
+    )
+    if fingerprint is not None and vaga.vaga_fingerprint is not None:
+        return fingerprint != vaga.vaga_fingerprint or not tem_texto_e_embedding
+
+    algum_campo_json_preenchido = any(
+        str((vaga_data or {}).get(campo) or '').strip() != '' for campo in CAMPOS_RELEVANTES
+    )
+
+    algum_campo_bd_vazio = any(
+        str(getattr(vaga, campo) or '').strip() == '' for campo in CAMPOS_RELEVANTES
+    )
+
+    return algum_campo_json_preenchido or algum_campo_bd_vazio or not tem_texto_e_embedding
+
+
+def embedding_columns(embedding) -> Dict[str, Any]:
+    """Colunas vaga_embedding (bytes float32) e vaga_embedding_vector (texto) de um embedding"""
+    embedding_array = np.array(embedding, dtype=np.float32)
+    return {
+        "vaga_embedding": embedding_array.tobytes(),
+        "vaga_embedding_vector": str(embedding_array.tolist()),
+    }
 
-def limpar_texto_llm(text: str) -> str:
-    import re
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    text = ansi_escape.sub('', text)
-    text = re.sub(r'[⠁-⣿]+', '', text)
-    return text.strip()
 
 class VagaExtractorService:
     def __init__(self, llm_client=None, embedding_client=None):
@@ -31,33 +120,26 @@ class VagaExtractorService:
             self._embedding_client = get_embedding_client()
         return self._embedding_client
 
-    def gerar_texto_semantico(self, vaga: Vaga) -> Optional[str]:
-        areas = vaga.perfil_vaga_areas_atuacao or ''
-        atividades = vaga.perfil_vaga_principais_atividades or ''
-        competencias = vaga.perfil_vaga_competencia_tecnicas_e_comportamentais or ''
-        if not (areas and atividades and competencias):
+    def fingerprint(self, vaga) -> Optional[str]:
+        """vaga_fingerprint da entrada atual da vaga (None se faltar campo ou cliente)"""
+        prompt = build_vaga_prompt(vaga)
+        if prompt is None:
+            return None
+        try:
+            return vaga_fingerprint(prompt, model_id(self.llm_client), model_id(self.embedding_client))
+        except Exception as e:
+            log_warning(f"[Vaga {vaga.id}] Could not compute fingerprint: {e}")
             return None
 
-        prompt = (
-            "Você é um especialista in RH e NLP. Sua tarefa é gerar uma descrição de vaga formal e objetiva, "
-            "com frases curtas e diretas, no mesmo estilo do exinplo abaixo:\n\n"
-            "Experiência como Especialista in SAP ABAP na inpresa IBM, de janeiro de 2020 até o momento. "
-            "Responsável por desenvolvimento e manutenção de sishasas SAP utilizando a linguagin ABAP. "
-            "Trabalhou in projetos de customização e integração de módulos SAP com foco técnico. "
-            "Formação acadêmica in Ciência da Computação. "
-            "Habilidades técnicas incluin: SAP ABAP, desenvolvimento de relatórios, user exits, enhancinent points, BAPI, performance tuning e debugging.\n\n"
-            "Com base nas informações abaixo, gere um novo parágrafo com o mesmo estilo. "
-            "Comece com 'Experiência como Desenvolvedor ABAP'. Use linguagin formal, sin copiar o exinplo literalmente:\n\n"
-            f"Área de atuação: {areas}\n"
-            f"Principais atividades: {atividades}\n"
-            f"Competências técnicas e comportamentais: {competencias}\n\n"
-            "Finalize com: 'Habilidades técnicas incluin: ...' preenchendo com as competências listadas, se houver. "
-            "Não use colchetes, datas fictícias, nomes de inpresa ou instruções no texto final. Gere um parágrafo limpo, direto e natural."
-        )
+    def gerar_texto_semantico(self, vaga: Vaga) -> Optional[str]:
+        prompt = build_vaga_prompt(vaga)
+        if prompt is None:
+            return None
 
         try:
-            texto = self.llm_client.extract_text(prompt)
-            clean_text = limpar_texto_llm(texto)
+            with llm_call_site("vaga_text"):
+                texto = self.llm_client.extract_text(prompt)
+            clean_text = strip_terminal_codes(texto).strip()
             if len(clean_text) < 20:
                 return None
             return clean_text
@@ -77,39 +159,26 @@ class VagaExtractorService:
         db.commit()
         db.refresh(vaga)
 
-        campos_relevantes = [
-            'perfil_vaga_areas_atuacao',
-            'perfil_vaga_principais_atividades',
-            'perfil_vaga_competencia_tecnicas_e_comportamentais',
-        ]
-
-        algum_campo_json_preenchido = any(
-            str(vaga_data.get(campo) or '').strip() != '' for campo in campos_relevantes
-        )
-
-        algum_campo_bd_vazio = any(
-            str(getattr(vaga, campo) or '').strip() == '' for campo in campos_relevantes
-        )
+        fingerprint = self.fingerprint(vaga)
+        precisa_extrair = vaga_precisa_extrair(vaga, vaga_data, fingerprint)
 
-        precisa_extrair = (
-            algum_campo_json_preenchido or
-            algum_campo_bd_vazio or
-            vaga.vaga_texto_semantico is None or
-            vaga.vaga_embedding is None or
-            vaga.vaga_embedding_vector is None
-        )
+        if not precisa_extrair and fingerprint is not None:
+            log_info(f"[Vaga {vaga_id}] Unchanged fingerprint, skipping extraction")
 
         if precisa_extrair:
             texto_semantico = self.gerar_texto_semantico(vaga)
             vaga.vaga_texto_semantico = texto_semantico
+            # Só fica gravado quando texto e embedding forem gerados para esta entrada
+            vaga.vaga_fingerprint = None
 
             if texto_semantico:
                 try:
-                    embedding = self.embedding_client.generate_embedding(texto_semantico, label=f"vaga_{vaga.id}")
+                    with llm_call_site("vaga_embedding"):
+                        embedding = self.embedding_client.generate_embedding(texto_semantico, label=f"vaga_{vaga.id}")
                     if embedding is not None:
-                        embedding_array = np.array(embedding, dtype=np.float32)
-                        vaga.vaga_embedding = embedding_array.tobytes()
-                        vaga.vaga_embedding_vector = str(embedding_array.tolist())
+                        for column, value in embedding_columns(embedding).items():
+                            setattr(vaga, column, value)
+                        vaga.vaga_fingerprint = fingerprint
                         vaga.updated_at = datetime.utcnow()
                 except Exception as e:
                     log_error(f"[Vaga {vaga.id}] Error generating embedding: {e}")
@@ -47,6 +47,8 @@ class VagaProcessingOrchestrator:
             # Add detailed debug info
             log_error(f"[Orchestrator] StatusVaga enum values: {[e.value for e in StatusVaga]}")
             log_error(f"[Orchestrator] Traceback: {traceback.format_exc()}")
+            # Propaga para o job ser tentado de novo (app/services/job_queue.py)
+            raise
         finally:
             db.close()
             log_info(f"[Orchestrator] Finished processing vaga {vaga_id}")
\ No newline at end of file
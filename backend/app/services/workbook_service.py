@@ -3,9 +3,11 @@ import uuid
 from sqlalchemy.orm import Session
 from app.repositories.workbook_repository import WorkbookRepository
 from app.repositories.vaga_repository import get_vaga_by_id
+from app.repositories.match_prospect_repository import MatchProspectRepository
 from app.models.match_prospect import MatchProspect
 from app.core.exceptions import APIExceptions
 from app.core.logging import log_info, log_error
+from app.services.candidate_pool_cache import get_candidate_pool_cache
 
 class WorkbookService:
     """Camada de serviço para regras de negócio do Workbook"""
@@ -13,6 +15,7 @@ class WorkbookService:
     def __init__(self, db: Session):
         self.db = db
         self.repository = WorkbookRepository(db)
+        self.prospect_repository = MatchProspectRepository(db)
     
     def create_workbook(self, workbook_data: Any):
         """Cria um workbook verificando se a vaga existe e atualiza seu status"""
@@ -63,39 +66,31 @@ class WorkbookService:
         return workbook
     
     def update_match_prospects(self, workbook_id: uuid.UUID, prospects: List[Any]):
-        """Atualiza os match prospects (overwrite)"""
+        """Atualiza os match prospects (overwrite) aplicando apenas o diff em lote"""
         # Verifica se o workbook existe
         workbook = self.get_workbook(workbook_id)
         
         try:
-            # Remove prospects existentes
-            self.db.query(MatchProspect).filter(
-                MatchProspect.workbook_id == workbook_id
-            ).delete()
-            
-            # Cria novos prospects
-            new_prospects = []
+            rows = []
             for prospect_data in prospects:
                 if hasattr(prospect_data, 'dict'):
-                    data = prospect_data.dict()
+                    data = prospect_data.dict(exclude_unset=True)
                 else:
                     data = prospect_data
-                    
-                prospect = MatchProspect(
-                    workbook_id=workbook_id,
-                    applicant_id=data.get('applicant_id'),
-                    score_semantico=data.get('score_semantico'),
-                    origem=data.get('origin'),
-                    selecionado=data.get('selecionado', False),
-                    observacoes=data.get('observacoes')
-                )
-                new_prospects.append(prospect)
+                
+                # Só os campos enviados: omitidos preservam seleção/score/observações já gravados
+                row = {'applicant_id': data.get('applicant_id')}
+                for field in ('score_semantico', 'selecionado', 'observacoes'):
+                    if field in data:
+                        row[field] = data[field]
+                if 'origin' in data:
+                    row['origem'] = data['origin']
+                rows.append(row)
             
-            self.db.add_all(new_prospects)
-            self.db.commit()
+            summary = self.prospect_repository.sync_workbook_prospects(workbook_id, rows)
             
-            log_info(f"Atualizados {len(new_prospects)} match prospects para workbook {workbook_id}")
-            return new_prospects
+            log_info(f"Atualizados {len(rows)} match prospects para workbook {workbook_id}: {summary}")
+            return rows
             
         except Exception as e:
             self.db.rollback()
@@ -131,6 +126,8 @@ class WorkbookService:
             # Remove o workbook
             self.db.delete(workbook)
             self.db.commit()
+            self.prospect_repository.refresh_summary()
+            get_candidate_pool_cache().invalidate(workbook_id)
             
             log_info(f"Workbook {workbook_id} removido e vaga {workbook.vaga_id} revertida para status 'aberta'")
             
@@ -0,0 +1,27 @@
+"""
+Gera em lote o texto semântico e o embedding dos candidatos já processados
+(app/services/applicant_embedding_backfill_service.py).
+
+Sem argumentos, só os candidatos sem embedding; --force regenera todos (ex:
+depois de trocar EMBEDDING_MODEL).
+
+    python backfill_applicant_embeddings.py
+    python backfill_applicant_embeddings.py --force --limit 1000
+"""
+
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.applicant_embedding_backfill_service import ApplicantEmbeddingBackfillService
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill de embeddings de processed_applicants")
+    parser.add_argument("--force", action="store_true", help="regenera também quem já tem embedding")
+    parser.add_argument("--limit", type=int, default=None, help="máximo de candidatos")
+    args = parser.parse_args()
+
+    summary = ApplicantEmbeddingBackfillService().run(force=args.force, limit=args.limit)
+    print(f"{summary['atualizados']} candidatos atualizados, {summary['falhas_embedding']} falhas ({summary['segundos']}s)")
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark do pré-processamento de texto por CV.
+
+Compara as implementações anteriores (regex recompilada a cada chamada, passes
+de str.replace para o spinner) com app.core.text_normalization.
+
+Uso (a partir de backend/):
+    python benchmark_text_normalization.py [repetições]
+"""
+
+import re
+import sys
+import timeit
+
+from app.core.text_normalization import clean_llm_output, fix_letter_spacing, strip_terminal_codes
+
+
+# --- implementações anteriores (referência) ---
+
+def legacy_fix_letter_spacing(text):
+    def fix_line(line):
+        return re.sub(r'((?:[A-Za-zÀ-ÿ]\s){3,}[A-Za-zÀ-ÿ])', lambda m: m.group(0).replace(' ', ''), line)
+    return '\n'.join(fix_line(l) for l in text.splitlines())
+
+
+def legacy_clean_ansi_codes(text):
+    ansi_escape = re.compile(r'''
+        \x1B
+        (?:
+            [@-Z\\-_]
+        |
+            \[
+            [0-?]*
+            [ -/]*
+            [@-~]
+        )
+    ''', re.VERBOSE)
+    cleaned = ansi_escape.sub('', text)
+    spinner_chars = ['⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏', '⠋']
+    for char in spinner_chars:
+        cleaned = cleaned.replace(char, '')
+    ollama_patterns = [
+        r'\[.*?[GK]',
+        r'\?\d+[hl]',
+        r'\x1b\[\?\d+[hl]',
+    ]
+    for pattern in ollama_patterns:
+        cleaned = re.sub(pattern, '', cleaned)
+    cleaned = re.compile(r'[\x00-\x1F\x7F-\x9F]', re.MULTILINE).sub('', cleaned)
+    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+    return cleaned
+
+
+def legacy_limpar_texto_llm(text):
+    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+    text = ansi_escape.sub('', text)
+    text = re.sub(r'[⠁-⣿]+', '', text)
+    return text.strip()
+
+
+# --- dados sintéticos ---
+
+CV_TEXT = "\n".join(
+    [
+        "C U R R Í C U L O   V I T A E",
+        "Nome: Maria Silva - Analista SAP ABAP Sênior",
+        "Experiência: 10 anos com desenvolvimento ABAP, BAPI, user exits e performance tuning.",
+        "F O R M A Ç Ã O: Bacharel em Ciência da Computação - USP (03/2008 - 12/2012)",
+        "Idiomas: Inglês avançado, Espanhol intermediário.",
+    ] * 60
+)
+
+LLM_OUTPUT = (
+    "\x1b[?25l⠙ ⠹ ⠸\x1b[2K\x1b[1G⠼ ⠴"
+    + '{"formacoes": [{"curso": "Ciência da Computação", "nivel": "graduação", '
+    '"instituicao": "USP", "ano_inicio": "03/2008", "ano_fim": "12/2012", "observacoes": null}],\n'
+    + '"habilidades": ["SAP ABAP", "BAPI", "Go", "performance tuning"]}\n' * 20
+    + "\x1b[?25h"
+)
+
+# Resposta de API HTTP: mesmo JSON, sem códigos de terminal nem spinner
+LLM_OUTPUT_HTTP = LLM_OUTPUT.replace("\x1b[?25l⠙ ⠹ ⠸\x1b[2K\x1b[1G⠼ ⠴", "").replace("\x1b[?25h", "")
+
+# Pré-processamento de um CV: limpeza do texto de entrada + 4 respostas de seção + texto semântico
+def legacy_per_cv():
+    legacy_fix_letter_spacing(CV_TEXT)
+    for _ in range(4):
+        legacy_clean_ansi_codes(LLM_OUTPUT)
+    legacy_limpar_texto_llm(LLM_OUTPUT)
+
+
+def current_per_cv():
+    fix_letter_spacing(CV_TEXT)
+    for _ in range(4):
+        clean_llm_output(LLM_OUTPUT)
+    strip_terminal_codes(LLM_OUTPUT).strip()
+
+
+def bench(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<40} {seconds * 1e6:10.1f} µs")
+    return seconds
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f"CV: {len(CV_TEXT)} chars | resposta LLM: {len(LLM_OUTPUT)} chars | {number} repetições\n")
+    bench("fix_letter_spacing (anterior)", lambda: legacy_fix_letter_spacing(CV_TEXT), number)
+    bench("fix_letter_spacing", lambda: fix_letter_spacing(CV_TEXT), number)
+    bench("_clean_ansi_codes Ollama (anterior)", lambda: legacy_clean_ansi_codes(LLM_OUTPUT), number)
+    bench("clean_llm_output", lambda: clean_llm_output(LLM_OUTPUT), number)
+    bench("limpar_texto_llm (anterior)", lambda: legacy_limpar_texto_llm(LLM_OUTPUT), number)
+    bench("strip_terminal_codes", lambda: strip_terminal_codes(LLM_OUTPUT).strip(), number)
+    bench("_clean_ansi_codes HTTP (anterior)", lambda: legacy_clean_ansi_codes(LLM_OUTPUT_HTTP), number)
+    bench("clean_llm_output HTTP", lambda: clean_llm_output(LLM_OUTPUT_HTTP), number)
+    bench("limpar_texto_llm HTTP (anterior)", lambda: legacy_limpar_texto_llm(LLM_OUTPUT_HTTP), number)
+    bench("strip_terminal_codes HTTP", lambda: strip_terminal_codes(LLM_OUTPUT_HTTP).strip(), number)
+    print()
+    before = bench("pré-processamento por CV (anterior)", legacy_per_cv, number)
+    after = bench("pré-processamento por CV", current_per_cv, number)
+    print(f"\nGanho: {before / after:.1f}x")
+
+    # A limpeza anterior apagava trechos de JSON como ["Go" (padrão \[.*?[GK])
+    print("\nJSON preservado:", '"Go"' in clean_llm_output(LLM_OUTPUT), "| anterior:", '"Go"' in legacy_clean_ansi_codes(LLM_OUTPUT))
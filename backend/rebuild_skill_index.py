@@ -0,0 +1,20 @@
+"""
+Reconstrói a tabela applicant_skills a partir do cv_pt_json de todos os candidatos.
+
+Rodar uma vez depois de criar a tabela (ou de mudar SKILL_ALIASES); a partir daí
+o índice é mantido pelo upsert dos candidatos.
+
+    python rebuild_skill_index.py
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.database import SessionLocal
+from app.repositories.applicant_skill_repository import ApplicantSkillRepository
+
+if __name__ == "__main__":
+    with SessionLocal() as db:
+        total = ApplicantSkillRepository(db).rebuild()
+    print(f"{total} candidatos indexados em applicant_skills")
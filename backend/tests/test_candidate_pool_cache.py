@@ -0,0 +1,58 @@
+"""Cache do pool de candidatos por workbook (app/services/candidate_pool_cache.py)"""
+
+import pytest
+
+from app.services.candidate_pool_cache import CandidatePool, CandidatePoolCache, narrows
+
+
+@pytest.mark.parametrize("previous, current, expected", [
+    ({"habilidades": ["python"]}, {"habilidades": ["python"], "localizacao": "São Paulo"}, True),
+    ({"habilidades": ["python"]}, {"habilidades": ["python"]}, True),
+    # Filtros vazios em previous não restringem nada
+    ({"habilidades": ["python"], "idiomas": [], "sexo": None}, {"habilidades": ["python"]}, True),
+    ({}, {"localizacao": "Recife"}, True),
+    # Restrição trocada ou removida: o resultado anterior não contém o novo
+    ({"habilidades": ["python"]}, {"habilidades": ["java"]}, False),
+    ({"habilidades": ["python"], "localizacao": "Recife"}, {"habilidades": ["python"]}, False),
+])
+def test_narrows(previous, current, expected):
+    assert narrows(previous, current) == expected
+
+
+def _pool(vaga_id=1, pool_size=100, version=frozenset()):
+    return CandidatePool(vaga_id=vaga_id, pool_size=pool_size, prospects_version=version, candidates=[])
+
+
+def test_get_checks_vaga_size_and_prospects():
+    cache = CandidatePoolCache()
+    version = frozenset({(10, True)})
+    cache.put("wb", _pool(version=version))
+    assert cache.get("wb", 1, 50, version) is not None
+    assert cache.get("wb", 1, 200, version) is None
+    cache.put("wb", _pool(version=version))
+    assert cache.get("wb", 1, 50, frozenset({(10, False)})) is None
+
+
+def test_ttl_expires_pool():
+    cache = CandidatePoolCache(ttl_seconds=-1)
+    cache.put("wb", _pool())
+    assert cache.get("wb", 1, 10, frozenset()) is None
+
+
+def test_lru_keeps_most_recent_workbooks():
+    cache = CandidatePoolCache(max_workbooks=2)
+    for key in ("a", "b"):
+        cache.put(key, _pool())
+    assert cache.get("a", 1, 10, frozenset()) is not None
+    cache.put("c", _pool())
+    assert cache.get("b", 1, 10, frozenset()) is None
+    assert cache.get("a", 1, 10, frozenset()) is not None
+
+
+def test_record_filter_copies_filters():
+    cache = CandidatePoolCache()
+    pool = _pool()
+    filters = {"habilidades": ["python"]}
+    cache.record_filter(pool, filters, [1, 2])
+    filters["habilidades"].append("java")
+    assert cache.last_filter(pool) == ({"habilidades": ["python"]}, frozenset({1, 2}))
@@ -0,0 +1,88 @@
+"""Extrator de critérios por regras e cache (app/services/criteria_extraction_service.py)"""
+
+import pytest
+
+from app.services.criteria_extraction_service import (
+    CriteriaExtractor,
+    extract_criteria_by_rules,
+    extract_limit,
+    vocabulary_signature
+)
+
+
+def test_simple_message():
+    criteria = extract_criteria_by_rules("Encontre 10 desenvolvedores Python com inglês avançado")
+    assert criteria["limite"] == 10
+    assert criteria["filtros"]["habilidades"] == ["Python"]
+    assert criteria["filtros"]["idiomas"] == [
+        {"idioma": "inglês", "nivel_minimo": "avançado", "incluir_superiores": True}
+    ]
+    assert criteria["filtros"]["localizacao"] is None
+
+
+def test_level_before_language_and_location():
+    criteria = extract_criteria_by_rules("candidatos fluente em espanhol em São Paulo")
+    assert criteria["limite"] is None
+    assert criteria["filtros"]["idiomas"] == [
+        {"idioma": "espanhol", "nivel_minimo": "fluente", "incluir_superiores": True}
+    ]
+    assert criteria["filtros"]["localizacao"] == "São Paulo"
+
+
+def test_language_without_level_is_a_plain_name():
+    criteria = extract_criteria_by_rules("traga 5 candidatos com java e inglês")
+    assert criteria["filtros"]["idiomas"] == ["inglês"]
+    assert criteria["filtros"]["habilidades"] == ["Java"]
+
+
+@pytest.mark.parametrize("text", [
+    # Palavra fora do vocabulário: fica com o LLM
+    "candidatos Python que gostem de trabalhar em equipe",
+    # Dois números
+    "10 candidatos com 5 anos de java",
+    # Duas cidades diferentes
+    "candidatos python em recife ou salvador",
+    # Nenhum critério
+    "me traga candidatos",
+    # Limite fora de 1..100
+    "encontre 500 candidatos python",
+    # Nível sem idioma
+    "candidatos avançado",
+])
+def test_falls_back_to_llm(text):
+    assert extract_criteria_by_rules(text) is None
+
+
+def test_extract_limit():
+    assert extract_limit("Me traga 6 candidatos") == 6
+    assert extract_limit("busque 300 candidatos") is None
+    assert extract_limit("candidatos com python") is None
+
+
+def test_vocabulary_signature_separates_numbers_and_terms():
+    assert vocabulary_signature("10 devs Python com inglês") == (("10",), ("idioma:inglês", "skill:Python"))
+    assert vocabulary_signature("10 devs Python com inglês") != vocabulary_signature("5 devs Python com inglês")
+
+
+def test_extractor_caches_llm_result_and_skips_invalid():
+    extractor = CriteriaExtractor(use_embeddings=False)
+    calls = []
+
+    def llm_extract(text):
+        calls.append(text)
+        return {"limite": 3, "filtros": {"outros": ["liderança"]}} if "lider" in text else None
+
+    assert extractor.extract("Candidatos com perfil de liderança", llm_extract)["limite"] == 3
+    assert extractor.extract("candidatos com perfil de LIDERANÇA!", llm_extract)["limite"] == 3
+    assert len(calls) == 1
+
+    assert extractor.extract("algo que o LLM não entende", llm_extract) is None
+    assert extractor.extract("algo que o LLM não entende", llm_extract) is None
+    assert len(calls) == 3
+
+
+def test_extractor_returns_copies():
+    extractor = CriteriaExtractor(use_embeddings=False)
+    first = extractor.extract("encontre 10 devs python", lambda text: None)
+    first["filtros"]["habilidades"].append("Java")
+    assert extractor.extract("encontre 10 devs python", lambda text: None)["filtros"]["habilidades"] == ["Python"]
@@ -0,0 +1,55 @@
+"""Reparo local do JSON devolvido pelos LLMs (app/llm/json_parser.py)"""
+
+import pytest
+
+from app.llm.json_parser import JSONParseError, extract_balanced, parse_llm_json
+
+
+def test_plain_object():
+    assert parse_llm_json('{"limite": 5}') == {"limite": 5}
+
+
+def test_code_fence_and_surrounding_text():
+    text = 'Aqui está:\n```json\n{"habilidades": ["python", "sql"]}\n```\nEspero ter ajudado.'
+    assert parse_llm_json(text) == {"habilidades": ["python", "sql"]}
+
+
+def test_first_balanced_object_only():
+    # O padrão antigo {.*} pegava do primeiro '{' ao último '}'
+    text = 'Resultado: {"a": 1} e depois {"b": 2}'
+    assert parse_llm_json(text) == {"a": 1}
+
+
+def test_braces_inside_strings_are_ignored():
+    assert extract_balanced('x {"descricao": "usa {chaves} e ]"} y') == '{"descricao": "usa {chaves} e ]"}'
+
+
+def test_single_quotes_and_python_literals():
+    text = "{'usar_similaridade': True, 'vaga_id': None, 'nome': 'D\\'Ávila'}"
+    assert parse_llm_json(text) == {"usar_similaridade": True, "vaga_id": None, "nome": "D'Ávila"}
+
+
+def test_trailing_commas():
+    assert parse_llm_json('{"idiomas": ["inglês", "espanhol",], "limite": 3,}') == {
+        "idiomas": ["inglês", "espanhol"],
+        "limite": 3
+    }
+
+
+def test_raw_newline_inside_string():
+    assert parse_llm_json('{"descricao": "linha 1\nlinha 2"}') == {"descricao": "linha 1\nlinha 2"}
+
+
+def test_truncated_object_is_closed():
+    assert parse_llm_json('{"habilidades": ["python", "sql"') == {"habilidades": ["python", "sql"]}
+
+
+def test_truncated_string_drops_last_incomplete_member():
+    text = '[{"empresa": "A", "cargo": "Dev"}, {"empresa": "B", "cargo": "Ana'
+    assert parse_llm_json(text) == [{"empresa": "A", "cargo": "Dev"}, {"empresa": "B"}]
+
+
+@pytest.mark.parametrize("text", [None, "", "   ", "sem json nenhum"])
+def test_no_json_raises(text):
+    with pytest.raises(JSONParseError):
+        parse_llm_json(text)
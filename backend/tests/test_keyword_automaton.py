@@ -0,0 +1,73 @@
+"""Autômato de palavras-chave do classificador de intenção (app/core/keyword_automaton.py)"""
+
+import re
+
+import pytest
+
+from app.core.keyword_automaton import KeywordAutomaton, fold_text
+
+
+KEYWORDS = {
+    "idioma": ["inglês", "espanhol"],
+    "local": ["sp", "rio", "são paulo"],
+    "skill": ["java", "javascript", "power bi"],
+}
+
+
+@pytest.fixture
+def automaton():
+    return KeywordAutomaton(KEYWORDS)
+
+
+def test_fold_text():
+    assert fold_text("  Inglês   AVANÇADO, São-Paulo!") == " ingles avancado sao paulo "
+
+
+def test_accents_and_case_are_ignored(automaton):
+    assert automaton.match("INGLES fluente")["idioma"] == {"inglês"}
+
+
+def test_accent_variants_count_once():
+    automaton = KeywordAutomaton({"idioma": ["inglês", "ingles", "espanhol"]})
+    assert automaton.keyword_counts["idioma"] == 2
+    assert automaton.match("ingles")["idioma"] == {"inglês"}
+    assert automaton.scores("inglês")["idioma"] == 0.5
+
+
+def test_whole_words_only(automaton):
+    found = automaton.match("falo espanhol e quero um salário maior")
+    assert found["idioma"] == {"espanhol"}
+    assert found["local"] == frozenset()
+
+
+def test_overlapping_and_multiword_keywords(automaton):
+    found = automaton.match("Java e JavaScript em São Paulo, com Power BI")
+    assert found["skill"] == {"java", "javascript", "power bi"}
+    assert found["local"] == {"são paulo"}
+
+
+def test_every_category_is_present(automaton):
+    assert automaton.match("nada aqui") == {
+        "idioma": frozenset(),
+        "local": frozenset(),
+        "skill": frozenset(),
+    }
+
+
+@pytest.mark.parametrize("text", [
+    "Preciso de devs Java no Rio com inglês",
+    "javascript, sp; espanhol!",
+    "",
+    "são paulo são paulo java",
+])
+def test_same_result_as_word_regex(automaton, text):
+    # Referência ingênua: uma regex de palavra inteira por palavra-chave
+    folded = fold_text(text)
+    expected = {
+        category: frozenset(
+            keyword for keyword in keywords
+            if re.search(re.escape(fold_text(keyword)), folded)
+        )
+        for category, keywords in KEYWORDS.items()
+    }
+    assert automaton.match(text) == expected
@@ -0,0 +1,72 @@
+"""Cursor da paginação keyset (app/core/pagination.py)"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor, paginate_keyset
+from app.models.processed_applicant import ProcessedApplicant
+
+
+@pytest.mark.parametrize("updated_at, entity_id", [
+    (datetime(2024, 5, 17, 13, 45, 10, 123456), 42),
+    (None, 7),
+    (datetime(2023, 1, 1), "6f1c2a9e-uuid"),
+])
+def test_cursor_round_trip(updated_at, entity_id):
+    cursor = encode_cursor(updated_at, entity_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (updated_at, entity_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor(None, 1)[:-3] + "!!!"])
+def test_invalid_cursor_is_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+class _Query:
+    """Query mínima: registra o filtro e devolve as linhas já ordenadas"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filtered = False
+        self.limit_value = None
+
+    def filter(self, *_):
+        self.filtered = True
+        return self
+
+    def order_by(self, *_):
+        return self
+
+    def limit(self, value):
+        self.limit_value = value
+        return self
+
+    def all(self):
+        return self.rows[:self.limit_value]
+
+
+def _rows(count):
+    return [SimpleNamespace(id=count - i, updated_at=datetime(2024, 1, 1, 0, 0, count - i)) for i in range(count)]
+
+
+def test_next_cursor_points_at_last_row_of_page():
+    query = _Query(_rows(5))
+    rows, next_cursor = paginate_keyset(query, ProcessedApplicant, limit=3)
+    assert [row.id for row in rows] == [5, 4, 3]
+    assert query.limit_value == 4
+    assert not query.filtered
+    assert decode_cursor(next_cursor) == (rows[-1].updated_at, 3)
+
+
+def test_last_page_has_no_cursor():
+    query = _Query(_rows(3))
+    rows, next_cursor = paginate_keyset(query, ProcessedApplicant, limit=3, cursor=encode_cursor(None, 10))
+    assert len(rows) == 3
+    assert next_cursor is None
+    assert query.filtered
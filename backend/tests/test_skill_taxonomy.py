@@ -0,0 +1,57 @@
+"""
+Casos de regressão da taxonomia de habilidades (app/core/skill_taxonomy.py).
+
+Se algum nome canônico mudar, rode também rebuild_skill_index.py.
+"""
+
+import pytest
+
+from app.core.skill_taxonomy import (
+    canonical_skill,
+    canonicalize_skills,
+    dedupe_skills,
+    expand_skill_terms,
+    skill_matches
+)
+
+
+def matches(required, skills):
+    return any(skill_matches(canonical_skill(required), skill) for skill in canonicalize_skills(skills))
+
+
+@pytest.mark.parametrize("required, skills, expected", [
+    # (filtro, habilidades do candidato, esperado)
+    ("SAP", ["SAP ABAP"], True),
+    ("SAP", ["ABAP"], True),
+    ("SAP", ["ABAP/4"], True),
+    ("SAP", ["FICO"], True),
+    ("ABAP", ["SAP ABAP"], True),
+    ("ABAP", ["SAP"], False),
+    ("React", ["ReactJS"], True),
+    ("Spring", ["Spring Boot"], True),
+    ("Java", ["JavaScript"], False),
+    ("Java", ["Java!"], True),
+    ("Gestão de Projetos", ["gestao de projetos"], True),
+])
+def test_skill_matches(required, skills, expected):
+    assert matches(required, skills) == expected
+
+
+def test_canonicalize_skills_drops_empty_and_repeated():
+    assert canonicalize_skills(["ReactJS", "react", "", None, 3, "  Python "]) == ["react", "python"]
+
+
+def test_dedupe_skills_keeps_original_names():
+    skills = ["Gestão de Projetos", "gestao  de projetos", "SQL Server", "MSSQL"]
+    assert dedupe_skills(skills) == ["Gestão de Projetos", "SQL Server"]
+
+
+def test_expand_skill_terms_adds_whole_word_matches_only():
+    vocabulary = ["sap abap", "sap fico", "spring boot", "javascript", "java", "python"]
+    expanded = expand_skill_terms(["sap", "java"], vocabulary)
+    assert expanded[:2] == ["sap", "java"]
+    assert set(expanded) == {"sap", "java", "sap abap", "sap fico"}
+
+
+def test_expand_skill_terms_keeps_terms_missing_from_vocabulary():
+    assert expand_skill_terms(["rust"], []) == ["rust"]
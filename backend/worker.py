@@ -0,0 +1,44 @@
+"""
+Worker da fila de processamento (tabela processing_jobs, app/services/job_queue.py).
+
+Cada processo roda --concurrency workers; para mais vazão, suba mais processos
+(em qualquer máquina com acesso ao banco). SIGINT/SIGTERM terminam o job em
+andamento e encerram.
+
+    python worker.py --concurrency 4
+    python worker.py --kinds vaga,applicant
+"""
+
+import argparse
+import signal
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.core.logging import log_info
+from app.services.job_queue import JOB_HANDLERS, start_worker_threads
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Processa os jobs de processing_jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="workers (threads) neste processo")
+    parser.add_argument("--kinds", default="", help=f"kinds separados por vírgula ({', '.join(JOB_HANDLERS)}); vazio = todos")
+    args = parser.parse_args()
+
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in JOB_HANDLERS]
+    if unknown:
+        parser.error(f"kinds desconhecidos: {', '.join(unknown)}")
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    threads = start_worker_threads(max(1, args.concurrency), stop_event, kinds=kinds or None)
+    log_info(f"[JobWorker] {len(threads)} worker(s) aguardando jobs")
+    # wait() com timeout para o processo principal continuar recebendo sinais
+    while not stop_event.wait(1):
+        pass
+    for thread in threads:
+        thread.join()
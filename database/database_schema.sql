@@ -1,5 +1,8 @@
 -- Database Schema for Datathon Decision
 
+-- Depends on match_prospects/workbook/vagas; dropped first so the tables can be recreated
+DROP MATERIALIZED VIEW IF EXISTS public.workbook_prospects_summary;
+
 -- public.applicants definition
 -- Drop table if exists
 DROP TABLE IF EXISTS public.applicants;
@@ -178,6 +181,7 @@ CREATE TABLE public.vagas (
     vaga_texto_semantico TEXT NULL,
     vaga_embedding BYTEA NULL,
     vaga_embedding_vector PUBLIC.vector NULL,
+    vaga_fingerprint TEXT NULL,
     updated_at TIMESTAMP NULL,
     status_vaga TEXT NOT NULL DEFAULT 'nao_iniciada',
     CONSTRAINT vagas_status_vaga_check CHECK
@@ -196,3 +200,159 @@ CREATE TABLE public.workbook (
     criado_por TEXT NULL,
     CONSTRAINT workbook_pkey PRIMARY KEY (id)
 );
+
+-- Keyset pagination indexes for processed_applicants listings
+-- (ORDER BY COALESCE(updated_at, '-infinity') DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_processed_applicants_keyset
+    ON public.processed_applicants ((COALESCE(updated_at, '-infinity'::timestamp)) DESC, id DESC);
+
+-- Replaced by idx_processed_applicants_formacao_norm_keyset (accent-insensitive, below)
+DROP INDEX IF EXISTS public.idx_processed_applicants_formacao_keyset;
+
+-- Accent-insensitive trigram search (typeahead by name / education level)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() is only STABLE (depends on the dictionary search_path), so it cannot be
+-- used in an index expression; this wrapper pins the dictionary and is IMMUTABLE
+CREATE OR REPLACE FUNCTION public.immutable_unaccent(TEXT)
+    RETURNS TEXT
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+
+CREATE INDEX IF NOT EXISTS idx_processed_applicants_nome_trgm
+    ON public.processed_applicants USING gin (lower(public.immutable_unaccent(nome)) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_processed_applicants_formacao_trgm
+    ON public.processed_applicants USING gin (lower(public.immutable_unaccent(nivel_maximo_formacao)) gin_trgm_ops);
+
+-- /processed-applicants/search/by-education: equality on the normalized level + keyset order
+CREATE INDEX IF NOT EXISTS idx_processed_applicants_formacao_norm_keyset
+    ON public.processed_applicants ((lower(public.immutable_unaccent(nivel_maximo_formacao))), (COALESCE(updated_at, '-infinity'::timestamp)) DESC, id DESC);
+
+-- Prospects per workbook.
+-- Lookups/aggregates by match_prospects.workbook_id use uq_workbook_match
+-- (workbook_id, applicant_id): workbook_id is its leading column, so a separate
+-- single-column index would only duplicate it.
+
+-- Optional precomputed summary for the workbook overview (PROSPECTS_SUMMARY_MATVIEW=true).
+-- Refreshed by the application whenever prospects are added to/removed from a workbook.
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.workbook_prospects_summary AS
+SELECT
+    w.id AS workbook_id,
+    w.vaga_id,
+    v.informacoes_basicas_titulo_vaga AS vaga_titulo,
+    c.total_prospects
+FROM (
+    SELECT workbook_id, COUNT(*) AS total_prospects
+    FROM public.match_prospects
+    GROUP BY workbook_id
+) c
+JOIN public.workbook w ON w.id = c.workbook_id
+JOIN public.vagas v ON v.id = w.vaga_id;
+
+-- Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_workbook_prospects_summary_workbook
+    ON public.workbook_prospects_summary (workbook_id);
+
+-- public.extraction_dead_letters definition
+-- CV section chunks that failed extraction after the retry policy gave up
+-- (see app/services/extraction_retry.py); resolved when the applicant is reprocessed.
+DROP TABLE IF EXISTS public.extraction_dead_letters;
+
+CREATE TABLE public.extraction_dead_letters (
+    id BIGSERIAL NOT NULL,
+    applicant_id BIGINT NOT NULL,
+    section TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    error_kind TEXT NOT NULL,
+    error_message TEXT NULL,
+    raw_response TEXT NULL,
+    attempts INTEGER NOT NULL,
+    created_at TIMESTAMP NULL DEFAULT NOW(),
+    resolved_at TIMESTAMP NULL,
+    CONSTRAINT extraction_dead_letters_pkey PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_extraction_dead_letters_pending
+    ON public.extraction_dead_letters (applicant_id)
+    WHERE resolved_at IS NULL;
+
+-- public.chat_sessions definition
+-- Chat sessions shared across API workers (CHAT_SESSION_STORE=sql); rows past
+-- expires_at are ignored on read and purged periodically by the application.
+DROP TABLE IF EXISTS public.chat_sessions;
+
+CREATE TABLE public.chat_sessions (
+    id TEXT NOT NULL,
+    data JSONB NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    CONSTRAINT chat_sessions_pkey PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_expires_at
+    ON public.chat_sessions (expires_at);
+
+-- public.applicant_skills definition
+-- Inverted index of canonical skills (app/core/skill_taxonomy.py) per applicant,
+-- rewritten whenever an applicant's cv_pt_json is upserted.
+DROP TABLE IF EXISTS public.applicant_skills;
+
+CREATE TABLE public.applicant_skills (
+    skill TEXT NOT NULL,
+    applicant_id BIGINT NOT NULL,
+    CONSTRAINT applicant_skills_pkey PRIMARY KEY (skill, applicant_id),
+    CONSTRAINT applicant_skills_applicant_fkey FOREIGN KEY (applicant_id)
+        REFERENCES public.processed_applicants (id) ON DELETE CASCADE
+);
+
+-- The primary key serves skill -> applicants; this one serves per-applicant rewrites
+CREATE INDEX IF NOT EXISTS idx_applicant_skills_applicant_id
+    ON public.applicant_skills (applicant_id);
+
+-- Existing databases: fingerprint of the inputs behind vaga_texto_semantico/vaga_embedding
+-- (app/services/vaga_extractor_service.py); NULL means unknown and forces the next extraction
+ALTER TABLE public.vagas ADD COLUMN IF NOT EXISTS vaga_fingerprint TEXT NULL;
+
+-- public.processing_jobs definition
+-- Durable background job queue (app/services/job_queue.py). Workers claim jobs with
+-- SELECT ... FOR UPDATE SKIP LOCKED; failed executions are retried with backoff.
+DROP TABLE IF EXISTS public.processing_jobs;
+
+CREATE TABLE public.processing_jobs (
+    id BIGSERIAL NOT NULL,
+    kind TEXT NOT NULL,
+    entity_id TEXT NULL,
+    payload JSONB NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT NOW(),
+    locked_by TEXT NULL,
+    locked_at TIMESTAMP NULL,
+    last_error TEXT NULL,
+    result JSONB NULL,
+    created_at TIMESTAMP NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NULL DEFAULT NOW(),
+    finished_at TIMESTAMP NULL,
+    CONSTRAINT processing_jobs_pkey PRIMARY KEY (id),
+    CONSTRAINT processing_jobs_status_check CHECK
+      (status IN ('pending','running','done','failed'))
+);
+
+-- Dequeue order: highest priority, then oldest due job
+CREATE INDEX IF NOT EXISTS idx_processing_jobs_dequeue
+    ON public.processing_jobs (priority DESC, run_after, id)
+    WHERE status = 'pending';
+
+-- One active job per entity (replaces the in-process ProcessingRegistry)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_processing_jobs_active_entity
+    ON public.processing_jobs (kind, entity_id)
+    WHERE status IN ('pending','running');
+
+-- Stale claim recovery
+CREATE INDEX IF NOT EXISTS idx_processing_jobs_running
+    ON public.processing_jobs (locked_at)
+    WHERE status = 'running';